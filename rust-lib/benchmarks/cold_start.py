@@ -0,0 +1,83 @@
+"""
+Benchmark for the cold start of the Python bindings, i.e. what a fresh process
+(e.g. each worker of a pre-fork server) pays before its first call.
+
+Every measurement is taken in new interpreters, RUNS times, reporting the median:
+  * importing rust_lib, which no longer loads the library,
+  * importing rust_lib and loading the library right away, as importing it used
+    to do,
+  * the first call after importing, which loads the library, and a second call,
+  * the first call in a child forked after the parent imported rust_lib, with
+    the parent having called into the library before forking or not.
+
+Build the library and copy it next to the bindings first, e.g.
+    cargo build --release
+    cp target/release/librust_lib.so bindings/libuniffi_rust_lib.so
+then run
+    python3 benchmarks/cold_start.py
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BINDINGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bindings")
+RUNS = 20
+
+# run in a new interpreter, printing the timings in seconds as JSON
+PROBE = """
+import json, os, sys, time
+sys.path.insert(0, {bindings!r})
+timings = {{}}
+
+start = time.perf_counter()
+import rust_lib
+timings["import"] = time.perf_counter() - start
+
+if {mode!r} == "eager":
+    start = time.perf_counter()
+    rust_lib._UniFFILib._load()
+    timings["import + load"] = timings["import"] + time.perf_counter() - start
+elif {mode!r} == "calls":
+    for name in ("first call", "second call"):
+        start = time.perf_counter()
+        rust_lib.simply_set_metrics_enabled(False)
+        timings[name] = time.perf_counter() - start
+else:
+    if {mode!r} == "fork, loaded":
+        rust_lib.simply_set_metrics_enabled(False)
+    read, write = os.pipe()
+    if os.fork() == 0:
+        start = time.perf_counter()
+        rust_lib.simply_set_metrics_enabled(False)
+        os.write(write, repr(time.perf_counter() - start).encode())
+        os._exit(0)
+    os.wait()
+    timings["first call in child, " + {mode!r}.split(", ")[1] + " before fork"] = float(os.read(read, 64))
+
+print(json.dumps(timings))
+"""
+
+
+def probe(mode, samples):
+    """Runs PROBE in `mode` RUNS times, adding its timings to `samples`."""
+    for _ in range(RUNS):
+        output = subprocess.run([sys.executable, "-c", PROBE.format(bindings=BINDINGS, mode=mode)],
+                                check=True, capture_output=True, text=True).stdout
+        for name, seconds in json.loads(output).items():
+            samples.setdefault(name, []).append(seconds)
+
+
+def main():
+    samples = {}
+    for mode in ("eager", "calls", "fork, not loaded", "fork, loaded"):
+        probe(mode, samples)
+    print("{:<40} {:>12}".format("step", "median"))
+    for name, seconds in samples.items():
+        print("{:<40} {:>9.3f} ms".format(name, statistics.median(seconds) * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Micro-benchmark for lifting large results out of RustBuffers, i.e. the work the
+bindings do for every value that comes back across the FFI.
+
+For each size, it reports the time per lift and the peak amount of memory the
+Python side allocates while lifting. Build the library and copy it next to the
+bindings first (cf. lowering.py), then run
+    python3 benchmarks/lifting.py
+"""
+
+import os
+import struct
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bindings"))
+
+import rust_lib  # noqa: E402
+from simplymail.columns import SummaryTable  # noqa: E402
+from simplymail.search import unpack_u32s  # noqa: E402
+
+REPETITIONS = 10
+
+
+def measure(converter, value):
+    """Returns the average seconds per lift and the peak number of bytes allocated by a single lift."""
+    total = 0.0
+    peak = 0
+    for _ in range(REPETITIONS):
+        rbuf = converter.lower(value)
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = converter.lift(rbuf)
+        total += time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del result
+    return total / REPETITIONS, peak
+
+
+def lowered_size(converter, value):
+    """Returns the number of bytes the lowered value takes up in its RustBuffer."""
+    rbuf = converter.lower(value)
+    size = rbuf.len
+    rbuf.free()
+    return size
+
+
+class _PackedUids:
+    # what lifting the result of simply_uid_search() and unpacking it with simplymail.search.unpack_u32s() costs
+    lower = rust_lib.FfiConverterSequenceUInt8.lower
+
+    @staticmethod
+    def lift(rbuf):
+        return unpack_u32s(rust_lib.FfiConverterSequenceUInt8.lift(rbuf))
+
+
+class _SummaryTable:
+    # what lifting the result of ImapSession.fetch_summary_columns() and reading all subjects from it costs
+    lower = rust_lib.FfiConverterTypeSummaryColumns.lower
+
+    @staticmethod
+    def lift(rbuf):
+        table = SummaryTable(rust_lib.FfiConverterTypeSummaryColumns.lift(rbuf))
+        return list(table.subject)
+
+
+def _summaries(count):
+    sender = [rust_lib.EmailAddress("John Doe", "john.doe", "example.com")]
+    recipients = [rust_lib.EmailAddress(None, "jane.doe", "example.com")]
+    return [
+        rust_lib.MessageSummary(i, i, 4096 + i, ["\\Seen"], 1700000000 + i, "Mon, 1 Jan 2024 12:00:00 +0000",
+                                "Subject of message {}".format(i), sender, [], recipients, [],
+                                "<{}@example.com>".format(i), None, {})
+        for i in range(1, count + 1)
+    ]
+
+
+def _string_column(values):
+    data = bytearray()
+    offsets = [0]
+    for value in values:
+        data += (value or "").encode("utf-8")
+        offsets.append(len(data))
+    return rust_lib.StringColumn(struct.pack("<{}I".format(len(offsets)), *offsets), bytes(data),
+                                 bytes(value is not None for value in values))
+
+
+def _summary_columns(summaries):
+    # the same as SummaryColumns::new() on the Rust side
+    def address(a):
+        return "{}@{}".format(a.mailbox, a.host)
+
+    def numbers(fmt, values):
+        return struct.pack("<{}{}".format(len(values), fmt), *(v or 0 for v in values)), bytes(v is not None for v in values)
+
+    return rust_lib.SummaryColumns(
+        len(summaries),
+        rust_lib.U32Column(*numbers("I", [s.message for s in summaries])),
+        rust_lib.U32Column(*numbers("I", [s.uid for s in summaries])),
+        rust_lib.U32Column(*numbers("I", [s.size for s in summaries])),
+        rust_lib.I64Column(*numbers("q", [s.internal_date for s in summaries])),
+        _string_column([" ".join(s.flags) for s in summaries]),
+        _string_column([s.date for s in summaries]),
+        _string_column([s.subject for s in summaries]),
+        _string_column([s.from_addresses[0].name if s.from_addresses else None for s in summaries]),
+        _string_column([address(s.from_addresses[0]) if s.from_addresses else None for s in summaries]),
+        _string_column([", ".join(address(a) for a in s.to_addresses) for s in summaries]),
+        _string_column([s.message_id for s in summaries]),
+        _string_column([s.in_reply_to for s in summaries]),
+        {},
+    )
+
+
+def report(name, seconds, peak, num_bytes):
+    print("{:<28} {:>10.2f} ms {:>10.1f} MB/s {:>10.1f} MB peak".format(name, seconds * 1e3, num_bytes / seconds / 1e6, peak / 1e6))
+
+
+def main():
+    print("{:<28} {:>13} {:>15} {:>18}".format("value", "per lift", "throughput", "python memory"))
+
+    for size in (1_000_000, 10_000_000, 50_000_000):
+        text = "x" * size
+        seconds, peak = measure(rust_lib.FfiConverterString, text)
+        report("string, {} bytes".format(size), seconds, peak, size)
+
+        data = b"x" * size
+        seconds, peak = measure(rust_lib.FfiConverterSequenceUInt8, data)
+        report("sequence<u8>, {} bytes".format(size), seconds, peak, size)
+
+    # search results, as a sequence<u32> and packed as by simply_search()
+    for count in (10_000, 500_000):
+        uids = list(range(1, count + 1))
+        seconds, peak = measure(rust_lib.FfiConverterSequenceUInt32, uids)
+        report("sequence<u32>, {} uids".format(count), seconds, peak, 4 * count)
+
+        packed = struct.pack("<{}I".format(count), *uids)
+        seconds, peak = measure(_PackedUids, packed)
+        report("packed uids, {} uids".format(count), seconds, peak, 4 * count)
+
+    # message summaries, as a sequence<MessageSummary> and in columns as by fetch_summary_columns()
+    for count in (10_000, 100_000):
+        summaries = _summaries(count)
+        seconds, peak = measure(rust_lib.FfiConverterSequenceTypeMessageSummary, summaries)
+        report("summaries, {} messages".format(count), seconds, peak,
+               lowered_size(rust_lib.FfiConverterSequenceTypeMessageSummary, summaries))
+
+        columns = _summary_columns(summaries)
+        seconds, peak = measure(_SummaryTable, columns)
+        report("summary columns, {} messages".format(count), seconds, peak, lowered_size(_SummaryTable, columns))
+
+
+if __name__ == "__main__":
+    main()
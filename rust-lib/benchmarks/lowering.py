@@ -0,0 +1,53 @@
+"""
+Micro-benchmark for lowering Python values into RustBuffers, i.e. the work the
+bindings do for every argument before a call crosses the FFI.
+
+Build the library and copy it next to the bindings first, e.g.
+    cargo build --release
+    cp target/release/librust_lib.so bindings/libuniffi_rust_lib.so
+then run
+    python3 benchmarks/lowering.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bindings"))
+
+import rust_lib  # noqa: E402
+
+MIN_DURATION = 0.5  # seconds per measurement
+
+
+def measure(lower, value):
+    """Returns the average number of seconds it takes to lower (and free) `value`."""
+    iterations = 0
+    start = time.perf_counter()
+    while True:
+        lower(value).free()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_DURATION:
+            return elapsed / iterations
+
+
+def report(name, seconds, num_bytes):
+    print("{:<28} {:>12.1f} us {:>12.1f} MB/s".format(name, seconds * 1e6, num_bytes / seconds / 1e6))
+
+
+def main():
+    print("{:<28} {:>15} {:>17}".format("value", "per call", "throughput"))
+
+    for size in (1_000, 64_000, 1_000_000, 10_000_000):
+        value = "x" * size
+        report("string, {} bytes".format(size), measure(rust_lib.FfiConverterString.lower, value), size)
+
+    for entries in (10, 1_000, 100_000):
+        value = {"Header-{}".format(i): "value number {}".format(i) for i in range(entries)}
+        num_bytes = sum(len(k.encode("utf-8")) + len(v.encode("utf-8")) + 8 for (k, v) in value.items()) + 4
+        report("map, {} entries".format(entries), measure(rust_lib.FfiConverterMapStringString.lower, value), num_bytes)
+
+
+if __name__ == "__main__":
+    main()
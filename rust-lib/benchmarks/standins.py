@@ -0,0 +1,370 @@
+"""
+Local stand-ins for an IMAP and an SMTP server, speaking just enough of both
+protocols over TLS for the calls of the library, so that it can be benchmarked
+reproducibly and offline.
+
+The IMAP stand-in serves the same synthetic mailbox under every name, with a
+configurable number and size of messages, and supports COMPRESS=DEFLATE. Both
+stand-ins can delay every flight of responses by a fixed latency, to simulate
+the round trips to a real server, and limit their bandwidth, to simulate a slow
+link; pipelined commands are answered in a single flight.
+"""
+
+import os
+import random
+import socket
+import ssl
+import subprocess
+import threading
+import time
+import zlib
+
+FLAGS = "\\Seen"
+INTERNALDATE = "01-Jan-2024 12:00:00 +0000"
+WORDS = ("the quick brown fox jumps over a lazy dog while our team reviews quarterly numbers and "
+         "sends an update about the meeting on friday please let me know if you have any questions").split()
+
+
+def make_certificate(directory):
+    """Creates a self-signed certificate for localhost with openssl, returning (cert_file, key_file)."""
+    cert_file = os.path.join(directory, "cert.pem")
+    key_file = os.path.join(directory, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=localhost",
+                    "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1", "-keyout", key_file, "-out", cert_file],
+                   check=True, capture_output=True)
+    return cert_file, key_file
+
+
+class _Connection:
+    """Reads lines from a client and collects the responses until the client has to wait for them."""
+
+    def __init__(self, tls, latency, bandwidth):
+        self.tls = tls
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self._buffer = b""
+        self._position = 0
+        self._responses = []
+        self._compressor = self._decompressor = None
+
+    def compress(self):
+        """Compresses everything sent and received from now on, cf. RFC 4978."""
+        self.flush()
+        self._compressor = zlib.compressobj(wbits=-15)
+        self._decompressor = zlib.decompressobj(wbits=-15)
+
+    def _receive(self):
+        """Appends what the client sent next to the buffer, returning False once it closed the connection."""
+        if not self.tls.pending():
+            self.flush()  # the client has sent all it can without our responses
+        data = self.tls.recv(65536)
+        if not data:
+            return False
+        if self._decompressor:
+            data = self._decompressor.decompress(data)
+        self._buffer = self._buffer[self._position:] + data
+        self._position = 0
+        return True
+
+    def readline(self):
+        """Returns the next line including its CRLF, or b"" once the client closed the connection."""
+        while True:
+            end = self._buffer.find(b"\n", self._position)
+            if end >= 0:
+                line = self._buffer[self._position:end + 1]
+                self._position = end + 1
+                return line
+            if not self._receive():
+                return b""
+
+    def read(self, size):
+        """Returns the next `size` bytes, or fewer once the client closed the connection."""
+        while len(self._buffer) - self._position < size and self._receive():
+            pass
+        data = self._buffer[self._position:self._position + size]
+        self._position += len(data)
+        return data
+
+    def send(self, data):
+        self._responses.append(data.encode() if isinstance(data, str) else data)
+
+    def flush(self):
+        if self._responses:
+            data = b"".join(self._responses)
+            self._responses = []
+            if self._compressor:
+                data = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            delay = self.latency + (len(data) / self.bandwidth if self.bandwidth else 0)
+            if delay:
+                time.sleep(delay)
+            self.tls.sendall(data)
+
+
+class _StandIn:
+    def __init__(self, cert_file, key_file, port=0, latency=0.0, bandwidth=None):
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.load_cert_chain(cert_file, key_file)
+        self.listener = socket.create_server(("127.0.0.1", port))
+        self.port = self.listener.getsockname()[1]
+        self.latency = latency
+        self.bandwidth = bandwidth  # in bytes per second, None for unlimited
+        self.handshakes = 0
+        self.resumed = 0  # handshakes that resumed a TLS session
+        self._lock = threading.Lock()
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def reset(self):
+        with self._lock:
+            self.handshakes = self.resumed = 0
+
+    def close(self):
+        self.listener.close()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return  # closed
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        try:
+            with self.context.wrap_socket(conn, server_side=True) as tls:
+                with self._lock:
+                    self.handshakes += 1
+                    self.resumed += tls.session_reused
+                connection = _Connection(tls, self.latency, self.bandwidth)
+                self._session(connection)
+                connection.flush()
+        except (ssl.SSLError, OSError):
+            pass
+
+
+def _sequence_set(text, count):
+    """The numbers of "1:3,5,7:*", in ascending order and limited to 1..count."""
+    numbers = set()
+    for part in text.split(","):
+        first, _, last = part.partition(":")
+        first = count if first == "*" else int(first)
+        last = first if not last else (count if last == "*" else int(last))
+        numbers.update(range(min(first, last), min(max(first, last), count) + 1))
+    return sorted(number for number in numbers if number >= 1)
+
+
+def _fetch_items(text):
+    """Splits "(UID BODY.PEEK[HEADER.FIELDS (A B)])" into ["UID", "BODY.PEEK[HEADER.FIELDS (A B)]"]."""
+    if text.startswith("(") and text.endswith(")"):
+        text = text[1:-1]
+    items, depth, start = [], 0, 0
+    for index, char in enumerate(text + " "):
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif char == " " and depth == 0:
+            if index > start:
+                items.append(text[start:index])
+            start = index + 1
+    return items
+
+
+def _literal(data):
+    return b"{%d}\r\n%s" % (len(data), data)
+
+
+class ImapStandIn(_StandIn):
+    """
+    An IMAP server with `messages` messages of about `message_size` bytes of plain
+    text in every mailbox, their UIDs being 1..messages.
+    """
+
+    def __init__(self, cert_file, key_file, port=0, latency=0.0, bandwidth=None, messages=100, message_size=4096,
+                 compress=True):
+        self.messages = messages
+        self.message_size = message_size
+        self.compress = compress
+        self.capabilities = "IMAP4rev1 AUTH=PLAIN" + (" COMPRESS=DEFLATE" if compress else "")
+        self._cache = {}
+        super().__init__(cert_file, key_file, port, latency, bandwidth)
+
+    def message(self, uid):
+        """The RFC822 bytes of message `uid`."""
+        message = self._cache.get(uid)
+        if message is None:
+            header = ("From: Sender {0} <sender{0}@example.com>\r\n"
+                      "To: recipient@example.com\r\n"
+                      "Subject: Message {0}\r\n"
+                      "Date: Mon, 1 Jan 2024 12:00:00 +0000\r\n"
+                      "Message-ID: <{0}@example.com>\r\n"
+                      "List-Unsubscribe: <mailto:unsubscribe@example.com>\r\n"
+                      "Content-Type: text/plain; charset=us-ascii\r\n"
+                      "\r\n").format(uid).encode()
+            words = random.Random(uid)  # the same text on every run
+            body = []
+            size = len(header)
+            while size < self.message_size:
+                line = " ".join(words.choice(WORDS) for _ in range(12)).encode() + b"\r\n"
+                body.append(line)
+                size += len(line)
+            message = self._cache.setdefault(uid, header + b"".join(body))
+        return message
+
+    def _envelope(self, uid):
+        address = '(("Sender {0}" NIL "sender{0}" "example.com"))'.format(uid)
+        return ('("Mon, 1 Jan 2024 12:00:00 +0000" "Message {0}" {1} {1} {1} ((NIL NIL "recipient" "example.com")) '
+                'NIL NIL NIL "<{0}@example.com>")').format(uid, address)
+
+    def _fetch_item(self, uid, item):
+        name = item.upper()
+        message = self.message(uid)
+        if name == "UID":
+            return b"UID %d" % uid
+        if name == "FLAGS":
+            return ("FLAGS (%s)" % FLAGS).encode()
+        if name == "RFC822.SIZE":
+            return b"RFC822.SIZE %d" % len(message)
+        if name == "INTERNALDATE":
+            return ('INTERNALDATE "%s"' % INTERNALDATE).encode()
+        if name == "ENVELOPE":
+            return ("ENVELOPE " + self._envelope(uid)).encode()
+        if name == "RFC822":
+            return b"RFC822 " + _literal(message)
+        if name in ("RFC822.HEADER", "BODY[HEADER]", "BODY.PEEK[HEADER]"):
+            header = message[:message.find(b"\r\n\r\n") + 4]
+            return (b"RFC822.HEADER " if name == "RFC822.HEADER" else b"BODY[HEADER] ") + _literal(header)
+        if name.startswith("BODY[") or name.startswith("BODY.PEEK["):
+            section, _, partial = item[item.index("[") + 1:].partition("]")
+            if section.upper().startswith("HEADER.FIELDS"):
+                fields = section[section.index("(") + 1:section.rindex(")")].lower().split()
+                header = message[:message.find(b"\r\n\r\n")].split(b"\r\n")
+                data = b"".join(line + b"\r\n" for line in header if line.split(b":")[0].decode().lower() in fields) + b"\r\n"
+            else:
+                data = message
+            if partial:  # e.g. <0.1024>
+                offset, _, length = partial.strip("<>").partition(".")
+                data = data[int(offset):int(offset) + int(length)]
+                section += "]<%s>" % offset
+            else:
+                section += "]"
+            return ("BODY[" + section + " ").encode() + _literal(data)
+        raise ValueError(item)
+
+    def _session(self, connection):
+        connection.send("* OK [CAPABILITY {}] IMAP4rev1 stand-in ready\r\n".format(self.capabilities))
+        compressed = False
+        while True:
+            line = connection.readline()
+            if not line:
+                return
+            tag, _, command = line.decode().strip().partition(" ")
+            name, _, arguments = command.partition(" ")
+            name = name.upper()
+            uid = name == "UID"
+            if uid:
+                name, _, arguments = arguments.partition(" ")
+                name = name.upper()
+
+            if name == "LOGOUT":
+                connection.send("* BYE\r\n{} OK LOGOUT completed\r\n".format(tag))
+                return
+            if name == "CAPABILITY":
+                connection.send("* CAPABILITY {}\r\n{} OK CAPABILITY completed\r\n".format(self.capabilities, tag))
+            elif name == "COMPRESS" and self.compress:
+                if compressed:
+                    connection.send("{} NO [COMPRESSIONACTIVE] DEFLATE active via COMPRESS\r\n".format(tag))
+                else:
+                    connection.send("{} OK DEFLATE active\r\n".format(tag))
+                    connection.compress()
+                    compressed = True
+            elif name in ("SELECT", "EXAMINE"):
+                connection.send("* {0} EXISTS\r\n* 0 RECENT\r\n* FLAGS (\\Seen \\Answered \\Flagged \\Deleted \\Draft)\r\n"
+                                "* OK [UIDVALIDITY 1] UIDs valid\r\n* OK [UIDNEXT {1}] Predicted next UID\r\n"
+                                "{2} OK [{3}] {4} completed\r\n".format(
+                                    self.messages, self.messages + 1, tag,
+                                    "READ-ONLY" if name == "EXAMINE" else "READ-WRITE", name))
+            elif name == "FETCH":
+                sequence_set, _, items = arguments.partition(" ")
+                items = _fetch_items(items)
+                if uid and "UID" not in (item.upper() for item in items):
+                    items.insert(0, "UID")
+                for number in _sequence_set(sequence_set, self.messages):
+                    parts = [self._fetch_item(number, item) for item in items]
+                    connection.send(b"* %d FETCH (%s)\r\n" % (number, b" ".join(parts)))
+                connection.send("{} OK FETCH completed\r\n".format(tag))
+            elif name == "SEARCH":  # every criterion matches every message
+                numbers = "".join(" %d" % number for number in range(1, self.messages + 1))
+                connection.send("* SEARCH{}\r\n{} OK SEARCH completed\r\n".format(numbers, tag))
+            elif name in ("LOGIN", "NOOP", "CHECK", "CLOSE"):
+                connection.send("{} OK {} completed\r\n".format(tag, name))
+            else:
+                connection.send("{} BAD unknown command\r\n".format(tag))
+
+
+class SmtpStandIn(_StandIn):
+    """
+    An SMTP server that accepts every message and discards it. The library only
+    submits to port 465, so that is the default port; binding it needs privileges.
+    """
+
+    def __init__(self, cert_file, key_file, port=465, latency=0.0, bandwidth=None, pipelining=True, chunking=True):
+        self.pipelining = pipelining
+        self.chunking = chunking
+        self.received = 0  # messages
+        self.received_bytes = 0
+        super().__init__(cert_file, key_file, port, latency, bandwidth)
+
+    def _received(self, size):
+        with self._lock:
+            self.received += 1
+            self.received_bytes += size
+
+    def _session(self, connection):
+        connection.send("220 localhost ESMTP stand-in ready\r\n")
+        chunked = False  # whether BDAT chunks of a message have been received, but not the last one
+        while True:
+            line = connection.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            name = command.split(" ")[0].upper()
+            if name == "EHLO":
+                connection.send("250-localhost\r\n" + ("250-PIPELINING\r\n" if self.pipelining else "") +
+                                ("250-CHUNKING\r\n" if self.chunking else "") +
+                                "250-8BITMIME\r\n250-SIZE 104857600\r\n250 AUTH PLAIN LOGIN\r\n")
+            elif name == "HELO":
+                connection.send("250 localhost\r\n")
+            elif name == "AUTH":
+                if command.upper().startswith("AUTH LOGIN"):
+                    connection.send("334 VXNlcm5hbWU6\r\n")
+                    connection.readline()
+                    connection.send("334 UGFzc3dvcmQ6\r\n")
+                    connection.readline()
+                connection.send("235 2.7.0 Authentication successful\r\n")
+            elif name in ("MAIL", "RCPT", "RSET", "NOOP"):
+                chunked = chunked and name != "RSET"
+                connection.send("250 2.0.0 OK\r\n")
+            elif name == "DATA":
+                connection.send("354 End data with <CR><LF>.<CR><LF>\r\n")
+                size = 0
+                while True:
+                    line = connection.readline()
+                    if line in (b".\r\n", b""):
+                        break
+                    size += len(line)
+                self._received(size)
+                connection.send("250 2.0.0 Queued\r\n")
+            elif name == "BDAT" and self.chunking:
+                arguments = command.split(" ")
+                connection.read(int(arguments[1]))
+                size = size + int(arguments[1]) if chunked else int(arguments[1])
+                chunked = arguments[-1].upper() != "LAST"
+                if not chunked:
+                    self._received(size)
+                connection.send("250 2.0.0 {} octets received\r\n".format(arguments[1]))
+            elif name == "QUIT":
+                connection.send("221 2.0.0 Bye\r\n")
+                return
+            else:
+                connection.send("500 5.5.2 Unknown command\r\n")
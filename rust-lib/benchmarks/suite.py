@@ -0,0 +1,214 @@
+"""
+Benchmark suite for the IMAP and SMTP calls of the library, run against the
+local stand-in servers of standins.py, so that results are reproducible and
+regressions show up before a release rather than in production.
+
+For every case (connection checks, fetching a single message, in one piece or in
+chunks of --chunk-size, bulk fetches with and without COMPRESS=DEFLATE,
+summaries, searching, sending, streaming a large body, attachments), the call is
+repeated --iterations times and its throughput and p50/p99 latency are reported.
+The stand-ins can add a simulated network latency per round trip (--latency-ms),
+limit their bandwidth (--bandwidth-mbit) and serve mailboxes of any size
+(--messages, --message-size). With --phases, the library's metrics are turned on
+as well and the time of every operation is broken down into its phases.
+
+Build the library and copy it next to the bindings first, e.g.
+    cargo build --release
+    cp target/release/librust_lib.so bindings/libuniffi_rust_lib.so
+then run e.g.
+    python3 benchmarks/suite.py --messages 1000 --latency-ms 20 --json results.json
+and later, to compare against those results,
+    python3 benchmarks/suite.py --messages 1000 --latency-ms 20 --baseline results.json
+which exits with status 1 if the p50 latency of a case grew by more than --tolerance.
+
+A self-signed certificate for localhost is created with openssl unless --cert
+and --key are given. The library only submits email to port 465, so the SMTP
+cases need to bind that port (as root or after
+`sysctl net.ipv4.ip_unprivileged_port_start=0`); they are skipped otherwise.
+"""
+
+import argparse
+import collections
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bindings"))
+
+import rust_lib  # noqa: E402
+from simplymail import metrics  # noqa: E402
+from simplymail.columns import fetch_summary_table  # noqa: E402
+from simplymail.download import download_into  # noqa: E402
+from simplymail.send import send_stream  # noqa: E402
+from standins import ImapStandIn, SmtpStandIn, make_certificate  # noqa: E402
+
+USERNAME = "user@example.com"
+PASSWORD = "password"
+HEADER_FIELDS = ["List-Unsubscribe"]
+BATCH_SIZE = 10
+STREAMED_CHUNKS = 16  # of 1 MB each
+ATTACHMENT_SIZE = 1024 * 1024
+
+# `messages` and `bytes` are what a single call transfers, for the throughput
+Case = collections.namedtuple("Case", "name call messages bytes")
+
+
+def imap_cases(server, bulk, chunk_size):
+    login = ("localhost", server.port, USERNAME, PASSWORD)
+    size = len(server.message(1))
+    bulk = min(bulk, server.messages)
+    buffer = bytearray(size)
+    session = rust_lib.ImapSession(*login)
+    session.select("INBOX")
+    compressed_session = rust_lib.ImapSession(*login)
+    compressed_session.enable_compression()
+    compressed_session.select("INBOX")
+    return [
+        Case("imap check", lambda: rust_lib.simply_check_imap(*login), 0, 0),
+        Case("imap fetch", lambda: rust_lib.simply_fetch_inbox_top_bytes(*login), 1, size),
+        Case("imap session fetch", lambda: session.fetch("1", "RFC822"), 1, size),
+        Case("imap session ranged download", lambda: download_into(session, 1, buffer, chunk_size=chunk_size), 1, size),
+        Case("imap bulk fetch", lambda: rust_lib.simply_fetch_messages(*login, "INBOX", "1:{}".format(bulk), "RFC822", False),
+             bulk, bulk * size),
+        Case("imap session bulk fetch", lambda: session.fetch("1:{}".format(bulk), "RFC822"), bulk, bulk * size),
+        Case("imap compressed session bulk fetch", lambda: compressed_session.fetch("1:{}".format(bulk), "RFC822"),
+             bulk, bulk * size),
+        Case("imap summaries", lambda: rust_lib.simply_fetch_summaries(*login, "INBOX", "1:*", HEADER_FIELDS, False),
+             server.messages, 0),
+        Case("imap session summary columns", lambda: fetch_summary_table(session, "1:*", HEADER_FIELDS),
+             server.messages, 0),
+        Case("imap search", lambda: rust_lib.simply_uid_search(*login, "INBOX", "ALL"), 0, 0),
+    ]
+
+
+def smtp_cases(server, directory):
+    login = ("localhost", USERNAME, PASSWORD)
+    headers = {"From": USERNAME, "To": "recipient@example.com", "Subject": "Benchmark"}
+    body = "Hello, world!\r\n" * 64
+    mailer = rust_lib.SmtpMailer(*login, 1, 60)
+    batch = [rust_lib.OutgoingEmail(headers=headers, plain_text_body=body, html_body=None)] * BATCH_SIZE
+    chunk = bytes(1024 * 1024)
+    attachment = os.path.join(directory, "attachment.pdf")
+    with open(attachment, "wb") as f:
+        f.write(os.urandom(ATTACHMENT_SIZE))
+    attachments = [rust_lib.Attachment(path=attachment, content_type="application/pdf", filename=None)]
+    return [
+        Case("smtp check", lambda: rust_lib.simply_check_smtp(*login), 0, 0),
+        Case("smtp send", lambda: rust_lib.simply_send_plain_text_email(*login, headers, body), 1, len(body)),
+        Case("smtp mailer send", lambda: mailer.send_plain_text_email(headers, body), 1, len(body)),
+        Case("smtp batch send", lambda: rust_lib.simply_send_batch(*login, batch), BATCH_SIZE, BATCH_SIZE * len(body)),
+        Case("smtp streamed send", lambda: send_stream(*login, headers, "application/octet-stream", [chunk] * STREAMED_CHUNKS),
+             1, STREAMED_CHUNKS * len(chunk)),
+        Case("smtp attachment send", lambda: rust_lib.simply_send_email_with_attachments(*login, headers, body, None, attachments),
+             1, ATTACHMENT_SIZE),
+        Case("smtp attachment batch send", lambda: rust_lib.simply_send_batch_with_attachments(*login, batch, attachments),
+             BATCH_SIZE, BATCH_SIZE * ATTACHMENT_SIZE),
+    ]
+
+
+def percentile(samples, q):
+    """The `q`th percentile (0-100) of the sorted `samples`, by the nearest-rank method."""
+    return samples[max(int(len(samples) * q / 100 + 0.5), 1) - 1]
+
+
+def run(case, iterations):
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        case.call()
+        samples.append(time.perf_counter() - call_start)
+    total = time.perf_counter() - start
+    samples.sort()
+    return {
+        "calls_per_sec": iterations / total,
+        "messages_per_sec": case.messages * iterations / total,
+        "mb_per_sec": case.bytes * iterations / total / 1e6,
+        "p50_ms": percentile(samples, 50) * 1e3,
+        "p99_ms": percentile(samples, 99) * 1e3,
+    }
+
+
+def report(name, result):
+    print("{:<32} {:>9.1f} {:>11.1f} {:>8.2f} {:>10.2f} {:>10.2f}".format(
+        name, result["calls_per_sec"], result["messages_per_sec"], result["mb_per_sec"], result["p50_ms"], result["p99_ms"]))
+
+
+def report_phases():
+    for operation, stats in metrics.snapshot(reset=True).items():
+        calls = max(stats["calls"], 1)
+        phases = ", ".join("{} {:.2f}".format(phase, latency["total_ms"] / calls) for phase, latency in stats["phases"].items())
+        print("    {:<28} ms per call: {}".format(operation, phases))
+
+
+def compare(results, baseline, tolerance):
+    """Prints the cases whose p50 latency grew by more than `tolerance` since `baseline`, returning whether there were any."""
+    regressed = False
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before and result["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            print("regression: {} p50 {:.2f} ms -> {:.2f} ms".format(name, before["p50_ms"], result["p50_ms"]))
+            regressed = True
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000, help="messages in the stand-in's mailbox")
+    parser.add_argument("--message-size", type=int, default=4096, help="bytes per message")
+    parser.add_argument("--chunk-size", type=int, default=1024, help="bytes per chunk of a ranged download")
+    parser.add_argument("--bulk", type=int, default=100, help="messages per bulk fetch")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated latency per round trip")
+    parser.add_argument("--bandwidth-mbit", type=float, help="simulated bandwidth of the stand-ins, unlimited by default")
+    parser.add_argument("--iterations", type=int, default=50, help="calls per case")
+    parser.add_argument("--cases", default="", help="only run the cases whose name contains this")
+    parser.add_argument("--phases", action="store_true", help="break every case down into the phases of its operations")
+    parser.add_argument("--cert", help="the stand-ins' certificate (PEM)")
+    parser.add_argument("--key", help="the stand-ins' private key (PEM)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against the results in this file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="relative p50 growth counted as a regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert_file, key_file = (args.cert, args.key) if args.cert else make_certificate(directory)
+        latency = args.latency_ms / 1e3
+        bandwidth = args.bandwidth_mbit * 125000 if args.bandwidth_mbit else None  # in bytes per second
+        imap_server = ImapStandIn(cert_file, key_file, latency=latency, bandwidth=bandwidth,
+                                  messages=args.messages, message_size=args.message_size)
+        try:
+            smtp_server = SmtpStandIn(cert_file, key_file, latency=latency, bandwidth=bandwidth)
+        except PermissionError:
+            smtp_server = None
+            print("skipping the SMTP cases, as port 465 cannot be bound", file=sys.stderr)
+        with open(cert_file) as f:
+            rust_lib.simply_configure_tls(rust_lib.TlsOptions(min_protocol_version=None, root_certificates_pem=[f.read()]))
+
+        cases = imap_cases(imap_server, args.bulk, args.chunk_size) + (smtp_cases(smtp_server, directory) if smtp_server else [])
+        rust_lib.simply_set_metrics_enabled(args.phases)
+
+        print("{:<32} {:>9} {:>11} {:>8} {:>10} {:>10}".format("case", "calls/s", "messages/s", "MB/s", "p50 ms", "p99 ms"))
+        results = {}
+        for case in cases:
+            if args.cases in case.name:
+                case.call()  # warms up connections, pools and caches
+                if args.phases:
+                    metrics.snapshot(reset=True)
+                results[case.name] = run(case, args.iterations)
+                report(case.name, results[case.name])
+                if args.phases:
+                    report_phases()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"parameters": vars(args), "results": results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            if compare(results, json.load(f)["results"], args.tolerance):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
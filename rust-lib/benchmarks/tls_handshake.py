@@ -0,0 +1,73 @@
+"""
+Benchmark for setting up TLS connections, i.e. the work done before the first
+IMAP command of every simply_* call and every ImapSession/SmtpMailer reconnect.
+
+It compares
+  * the library reusing its process-wide TLS connector (the default),
+  * the library building a new connector for every connection (simulated by
+    calling simply_configure_tls() before each call, as the library used to do).
+The last column counts how many of the handshakes resumed a TLS session, as seen
+by the server. native-tls does not resume sessions on the client side, so it
+stays at 0 either way.
+
+A local IMAP stand-in is started for this, so a certificate is needed, e.g.
+    openssl req -x509 -newkey rsa:2048 -nodes -days 1 -subj /CN=localhost \\
+        -keyout /tmp/key.pem -out /tmp/cert.pem
+Build the library and copy it next to the bindings first, e.g.
+    cargo build --release
+    cp target/release/librust_lib.so bindings/libuniffi_rust_lib.so
+then run
+    python3 benchmarks/tls_handshake.py /tmp/cert.pem /tmp/key.pem
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bindings"))
+
+import rust_lib  # noqa: E402
+from standins import ImapStandIn  # noqa: E402
+
+CONNECTIONS = 200
+
+
+def measure(connect):
+    """Returns the average number of seconds `connect()` takes."""
+    start = time.perf_counter()
+    for _ in range(CONNECTIONS):
+        connect()
+    return (time.perf_counter() - start) / CONNECTIONS
+
+
+def report(name, seconds, server):
+    print("{:<40} {:>10.2f} ms {:>8}/{}".format(name, seconds * 1e3, server.resumed, server.handshakes))
+    server.reset()
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    cert_file, key_file = sys.argv[1:]
+    server = ImapStandIn(cert_file, key_file)
+    with open(cert_file) as f:
+        options = rust_lib.TlsOptions(min_protocol_version=None, root_certificates_pem=[f.read()])
+
+    def check_imap():
+        rust_lib.simply_check_imap("localhost", server.port, "user", "password")
+
+    def check_imap_with_new_connector():
+        rust_lib.simply_configure_tls(options)
+        check_imap()
+
+    print("{:<40} {:>13} {:>10}".format("connection", "per call", "resumed"))
+
+    rust_lib.simply_configure_tls(options)
+    check_imap()  # warms up the server
+    server.reset()
+    report("rust_lib, shared connector", measure(check_imap), server)
+    report("rust_lib, new connector per connection", measure(check_imap_with_new_connector), server)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,7 @@ import enum
 import struct
 import contextlib
 import datetime
+import threading
 
 # Used for default argument values
 DEFAULT = object()
@@ -38,14 +39,14 @@ class RustBuffer(ctypes.Structure):
 
     @staticmethod
     def alloc(size):
-        return rust_call(_UniFFILib.ffi_rust_lib_dab3_rustbuffer_alloc, size)
+        return rust_call(_UniFFILib.ffi_rust_lib_rustbuffer_alloc, size)
 
     @staticmethod
     def reserve(rbuf, additional):
-        return rust_call(_UniFFILib.ffi_rust_lib_dab3_rustbuffer_reserve, rbuf, additional)
+        return rust_call(_UniFFILib.ffi_rust_lib_rustbuffer_reserve, rbuf, additional)
 
     def free(self):
-        return rust_call(_UniFFILib.ffi_rust_lib_dab3_rustbuffer_free, self)
+        return rust_call(_UniFFILib.ffi_rust_lib_rustbuffer_free, self)
 
     def __str__(self):
         return "RustBuffer(capacity={}, len={}, data={})".format(
@@ -55,13 +56,13 @@ class RustBuffer(ctypes.Structure):
         )
 
     @contextlib.contextmanager
-    def allocWithBuilder():
+    def allocWithBuilder(capacity=16):
         """Context-manger to allocate a buffer using a RustBufferBuilder.
 
         The allocated buffer will be automatically freed if an error occurs, ensuring that
         we don't accidentally leak it.
         """
-        builder = RustBufferBuilder()
+        builder = RustBufferBuilder(capacity)
         try:
             yield builder
         except:
@@ -75,12 +76,13 @@ class RustBuffer(ctypes.Structure):
         The RustBuffer will be freed once the context-manager exits, ensuring that we don't
         leak it even if an error occurs.
         """
+        s = RustBufferStream(self)
         try:
-            s = RustBufferStream(self)
             yield s
             if s.remaining() != 0:
                 raise RuntimeError("junk data left in buffer after consuming")
         finally:
+            s._view.release()
             self.free()
 
 
@@ -94,14 +96,29 @@ class ForeignBytes(ctypes.Structure):
         return "ForeignBytes(len={}, data={})".format(self.len, self.data[0:self.len])
 
 
+def _view_of_rust_buffer(rbuf):
+    # A memoryview of the first `rbuf.len` bytes of the Rust-owned allocation.
+    address = ctypes.cast(rbuf.data, ctypes.c_void_p).value
+    length = rbuf.len if address else 0
+    return memoryview((ctypes.c_char * length).from_address(address or 0)).cast("B")
+
+
 class RustBufferStream(object):
     """
     Helper for structured reading of bytes from a RustBuffer
+
+    Reads go through a memoryview over the Rust-owned allocation, so that
+    nothing is copied until the caller asks for a Python object. That memoryview
+    and the slices of it returned by `_readView` point into memory that is freed
+    along with the RustBuffer (see `consumeWithStream`), so they are only used
+    internally, by lifters that copy what they read right away; `read` and the
+    other public methods return bytes and numbers.
     """
 
     def __init__(self, rbuf):
         self.rbuf = rbuf
         self.offset = 0
+        self._view = _view_of_rust_buffer(rbuf)
 
     def remaining(self):
         return self.rbuf.len - self.offset
@@ -109,17 +126,22 @@ class RustBufferStream(object):
     def _unpack_from(self, size, format):
         if self.offset + size > self.rbuf.len:
             raise InternalError("read past end of rust buffer")
-        value = struct.unpack(format, self.rbuf.data[self.offset:self.offset+size])[0]
+        value = struct.unpack_from(format, self._view, self.offset)[0]
         self.offset += size
         return value
 
-    def read(self, size):
+    def _readView(self, size):
+        # Zero-copy: the returned memoryview is only valid until the RustBuffer is freed,
+        # so it must be copied (e.g. by str() or struct.unpack_from()) before then.
         if self.offset + size > self.rbuf.len:
             raise InternalError("read past end of rust buffer")
-        data = self.rbuf.data[self.offset:self.offset+size]
+        data = self._view[self.offset:self.offset+size]
         self.offset += size
         return data
 
+    def read(self, size):
+        return self._readView(size).tobytes()
+
     def readI8(self):
         return self._unpack_from(1, ">b")
 
@@ -155,15 +177,22 @@ class RustBufferStream(object):
 class RustBufferBuilder(object):
     """
     Helper for structured writing of bytes into a RustBuffer.
+
+    Values are copied in bulk straight into the Rust-owned allocation through a
+    writable memoryview, and the buffer grows geometrically, so that lowering
+    n bytes costs O(log n) calls into Rust rather than one per write.
     """
 
-    def __init__(self):
-        self.rbuf = RustBuffer.alloc(16)
-        self.rbuf.len = 0
+    def __init__(self, capacity=16):
+        self.rbuf = RustBuffer.alloc(capacity)
+        self._len = 0
+        self._update_view()
 
     def finalize(self):
         rbuf = self.rbuf
+        rbuf.len = self._len
         self.rbuf = None
+        self._view = None
         return rbuf
 
     def discard(self):
@@ -171,23 +200,32 @@ class RustBufferBuilder(object):
             rbuf = self.finalize()
             rbuf.free()
 
-    @contextlib.contextmanager
+    def _update_view(self):
+        # Has to be called whenever Rust (re)allocates the buffer.
+        address = ctypes.cast(self.rbuf.data, ctypes.c_void_p).value
+        self._capacity = self.rbuf.capacity if address else 0
+        self._view = memoryview((ctypes.c_char * self._capacity).from_address(address or 0)).cast("B")
+
     def _reserve(self, numBytes):
-        if self.rbuf.len + numBytes > self.rbuf.capacity:
-            self.rbuf = RustBuffer.reserve(self.rbuf, numBytes)
-        yield None
-        self.rbuf.len += numBytes
+        # Makes room for `numBytes` more bytes and returns the offset at which to write them.
+        offset = self._len
+        if offset + numBytes > self._capacity:
+            # At least double the capacity, so that many small writes don't each reallocate.
+            self._view = None
+            self.rbuf.len = offset
+            self.rbuf = RustBuffer.reserve(self.rbuf, max(numBytes, self._capacity))
+            self._update_view()
+        self._len = offset + numBytes
+        return offset
 
     def _pack_into(self, size, format, value):
-        with self._reserve(size):
-            # XXX TODO: I feel like I should be able to use `struct.pack_into` here but can't figure it out.
-            for i, byte in enumerate(struct.pack(format, value)):
-                self.rbuf.data[self.rbuf.len + i] = byte
+        offset = self._reserve(size)
+        struct.pack_into(format, self._view, offset, value)
 
     def write(self, value):
-        with self._reserve(len(value)):
-            for i, byte in enumerate(value):
-                self.rbuf.data[self.rbuf.len + i] = byte
+        numBytes = len(value)
+        offset = self._reserve(numBytes)
+        self._view[offset:offset + numBytes] = value
 
     def writeI8(self, v):
         self._pack_into(1, ">b", v)
@@ -285,6 +323,81 @@ def rust_call_with_error(error_ffi_converter, fn, *args):
 # A function pointer for a callback as defined by UniFFI.
 # Rust definition `fn(handle: u64, method: u32, args: RustBuffer, buf_ptr: *mut RustBuffer) -> int`
 FOREIGN_CALLBACK_T = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_ulonglong, ctypes.c_ulong, RustBuffer, ctypes.POINTER(RustBuffer))
+class ConcurrentHandleMap:
+    """
+    A map where inserting, getting and removing data is synchronized with a lock.
+    """
+
+    def __init__(self):
+        # type Handle = int
+        self._left_map = {}  # type: Dict[Handle, Any]
+        self._right_map = {}  # type: Dict[Any, Handle]
+
+        self._lock = threading.Lock()
+        self._current_handle = 0
+        self._stride = 1
+
+
+    def insert(self, obj):
+        with self._lock:
+            if obj in self._right_map:
+                return self._right_map[obj]
+            else:
+                handle = self._current_handle
+                self._current_handle += self._stride
+                self._left_map[handle] = obj
+                self._right_map[obj] = handle
+                return handle
+
+    def get(self, handle):
+        with self._lock:
+            return self._left_map.get(handle)
+
+    def remove(self, handle):
+        with self._lock:
+            if handle in self._left_map:
+                obj = self._left_map.pop(handle)
+                del self._right_map[obj]
+                return obj
+
+# Magic number for the Rust proxy to call using the same mechanism as every other method,
+# to free the callback once it's dropped by Rust.
+IDX_CALLBACK_FREE = 0
+# Return codes for callback calls
+UNIFFI_CALLBACK_SUCCESS = 0
+UNIFFI_CALLBACK_ERROR = 1
+UNIFFI_CALLBACK_UNEXPECTED_ERROR = 2
+
+class FfiConverterCallbackInterface:
+    _handle_map = ConcurrentHandleMap()
+
+    def __init__(self, cb):
+        self._foreign_callback = cb
+
+    def drop(self, handle):
+        self.__class__._handle_map.remove(handle)
+
+    @classmethod
+    def lift(cls, handle):
+        obj = cls._handle_map.get(handle)
+        if not obj:
+            raise InternalError("The object in the handle map has been dropped already")
+
+        return obj
+
+    @classmethod
+    def read(cls, buf):
+        handle = buf.readU64()
+        cls.lift(handle)
+
+    @classmethod
+    def lower(cls, cb):
+        handle = cls._handle_map.insert(cb)
+        return handle
+
+    @classmethod
+    def write(cls, cb, buf):
+        buf.writeU64(cls.lower(cb))
 # Types conforming to `FfiConverterPrimitive` pass themselves directly over the FFI.
 class FfiConverterPrimitive:
     @classmethod
@@ -318,8 +431,6 @@ class FfiConverterRustBuffer:
 # E.g. we might start by looking for the named component in `libuniffi.so` and if
 # that fails, fall back to loading it separately from `lib${componentName}.so`.
 
-from pathlib import Path
-
 def loadIndirect():
     if sys.platform == "darwin":
         libname = "lib{}.dylib"
@@ -337,76 +448,617 @@ def loadIndirect():
         libname = "lib{}.so"
 
     lib = libname.format("uniffi_rust_lib")
-    path = str(Path(__file__).parent / lib)
+    path = os.path.join(os.path.dirname(__file__), lib)
     return ctypes.cdll.LoadLibrary(path)
 
+class _NamespacedLib:
+    """
+    The loaded library, whose functions are looked up by their names without the checksum of the UDL that
+    uniffi puts into their prefix (e.g. `rust_lib_simply_check_imap` for `rust_lib_1a2b_simply_check_imap`),
+    so that these bindings don't depend on it. The library exports its prefix as `rust_lib_ffi_namespace()`.
+    """
+
+    def __init__(self, cdll):
+        cdll.rust_lib_ffi_namespace.argtypes = ()
+        cdll.rust_lib_ffi_namespace.restype = ctypes.c_char_p
+        self._cdll = cdll
+        self._namespace = cdll.rust_lib_ffi_namespace().decode()
+
+    def __getattr__(self, name):
+        if name.startswith("ffi_rust_lib_"):
+            symbol = "ffi_{}_{}".format(self._namespace, name[len("ffi_rust_lib_"):])
+        elif name.startswith("rust_lib_"):
+            symbol = "{}_{}".format(self._namespace, name[len("rust_lib_"):])
+        else:
+            raise AttributeError(name)
+        fn = getattr(self._cdll, symbol)
+        setattr(self, name, fn)
+        return fn
+
 # A ctypes library to expose the extern-C FFI definitions.
 # This is an implementation detail which will be called internally by the public API.
 
-_UniFFILib = loadIndirect()
-_UniFFILib.rust_lib_dab3_simply_check_imap.argtypes = (
-    RustBuffer,
-    ctypes.c_uint16,
-    RustBuffer,
-    RustBuffer,
-    ctypes.POINTER(RustCallStatus),
-)
-_UniFFILib.rust_lib_dab3_simply_check_imap.restype = None
-_UniFFILib.rust_lib_dab3_simply_fetch_inbox_top.argtypes = (
-    RustBuffer,
-    ctypes.c_uint16,
-    RustBuffer,
-    RustBuffer,
-    ctypes.POINTER(RustCallStatus),
-)
-_UniFFILib.rust_lib_dab3_simply_fetch_inbox_top.restype = RustBuffer
-_UniFFILib.rust_lib_dab3_simply_check_smtp.argtypes = (
-    RustBuffer,
-    RustBuffer,
-    RustBuffer,
-    ctypes.POINTER(RustCallStatus),
-)
-_UniFFILib.rust_lib_dab3_simply_check_smtp.restype = ctypes.c_int8
-_UniFFILib.rust_lib_dab3_simply_send_plain_text_email.argtypes = (
-    RustBuffer,
-    RustBuffer,
-    RustBuffer,
-    RustBuffer,
-    RustBuffer,
-    ctypes.POINTER(RustCallStatus),
-)
-_UniFFILib.rust_lib_dab3_simply_send_plain_text_email.restype = RustBuffer
-_UniFFILib.rust_lib_dab3_simply_send_html_email.argtypes = (
-    RustBuffer,
-    RustBuffer,
-    RustBuffer,
-    RustBuffer,
-    RustBuffer,
-    RustBuffer,
-    ctypes.POINTER(RustCallStatus),
-)
-_UniFFILib.rust_lib_dab3_simply_send_html_email.restype = RustBuffer
-_UniFFILib.ffi_rust_lib_dab3_rustbuffer_alloc.argtypes = (
-    ctypes.c_int32,
-    ctypes.POINTER(RustCallStatus),
-)
-_UniFFILib.ffi_rust_lib_dab3_rustbuffer_alloc.restype = RustBuffer
-_UniFFILib.ffi_rust_lib_dab3_rustbuffer_from_bytes.argtypes = (
-    ForeignBytes,
-    ctypes.POINTER(RustCallStatus),
-)
-_UniFFILib.ffi_rust_lib_dab3_rustbuffer_from_bytes.restype = RustBuffer
-_UniFFILib.ffi_rust_lib_dab3_rustbuffer_free.argtypes = (
-    RustBuffer,
-    ctypes.POINTER(RustCallStatus),
-)
-_UniFFILib.ffi_rust_lib_dab3_rustbuffer_free.restype = None
-_UniFFILib.ffi_rust_lib_dab3_rustbuffer_reserve.argtypes = (
-    RustBuffer,
-    ctypes.c_int32,
-    ctypes.POINTER(RustCallStatus),
-)
-_UniFFILib.ffi_rust_lib_dab3_rustbuffer_reserve.restype = RustBuffer
+def _declareFunctions(lib):
+    lib.ffi_rust_lib_AccountSweep_object_free.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.ffi_rust_lib_AccountSweep_object_free.restype = None
+    lib.rust_lib_AccountSweep_new.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_uint32,
+        ctypes.c_uint32,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_AccountSweep_new.restype = ctypes.c_void_p
+    lib.rust_lib_AccountSweep_wait.argtypes = (
+        ctypes.c_void_p,
+        ctypes.c_uint32,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_AccountSweep_wait.restype = RustBuffer
+    lib.rust_lib_AccountSweep_cancel.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_AccountSweep_cancel.restype = None
+    lib.ffi_rust_lib_ImapSession_object_free.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.ffi_rust_lib_ImapSession_object_free.restype = None
+    lib.rust_lib_ImapSession_new.argtypes = (
+        RustBuffer,
+        ctypes.c_uint16,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_new.restype = ctypes.c_void_p
+    lib.rust_lib_ImapSession_select.argtypes = (
+        ctypes.c_void_p,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_select.restype = RustBuffer
+    lib.rust_lib_ImapSession_fetch.argtypes = (
+        ctypes.c_void_p,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_fetch.restype = RustBuffer
+    lib.rust_lib_ImapSession_uid_fetch.argtypes = (
+        ctypes.c_void_p,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_uid_fetch.restype = RustBuffer
+    lib.rust_lib_ImapSession_fetch_summaries.argtypes = (
+        ctypes.c_void_p,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_fetch_summaries.restype = RustBuffer
+    lib.rust_lib_ImapSession_uid_fetch_summaries.argtypes = (
+        ctypes.c_void_p,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_uid_fetch_summaries.restype = RustBuffer
+    lib.rust_lib_ImapSession_fetch_summary_columns.argtypes = (
+        ctypes.c_void_p,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_fetch_summary_columns.restype = RustBuffer
+    lib.rust_lib_ImapSession_uid_fetch_summary_columns.argtypes = (
+        ctypes.c_void_p,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_uid_fetch_summary_columns.restype = RustBuffer
+    lib.rust_lib_ImapSession_sync_flags.argtypes = (
+        ctypes.c_void_p,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_sync_flags.restype = RustBuffer
+    lib.rust_lib_ImapSession_search.argtypes = (
+        ctypes.c_void_p,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_search.restype = RustBuffer
+    lib.rust_lib_ImapSession_uid_search.argtypes = (
+        ctypes.c_void_p,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_uid_search.restype = RustBuffer
+    lib.rust_lib_ImapSession_enable_compression.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_enable_compression.restype = ctypes.c_int8
+    lib.rust_lib_ImapSession_traffic.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_traffic.restype = RustBuffer
+    lib.rust_lib_ImapSession_download_message.argtypes = (
+        ctypes.c_void_p,
+        ctypes.c_uint32,
+        ctypes.c_uint64,
+        ctypes.c_uint32,
+        ctypes.c_uint64,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_download_message.restype = ctypes.c_uint64
+    lib.rust_lib_ImapSession_download_message_to_file.argtypes = (
+        ctypes.c_void_p,
+        ctypes.c_uint32,
+        RustBuffer,
+        ctypes.c_uint32,
+        ctypes.c_uint64,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_download_message_to_file.restype = ctypes.c_uint64
+    lib.rust_lib_ImapSession_logout.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ImapSession_logout.restype = None
+    lib.ffi_rust_lib_MailboxWatcher_object_free.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.ffi_rust_lib_MailboxWatcher_object_free.restype = None
+    lib.rust_lib_MailboxWatcher_new.argtypes = (
+        RustBuffer,
+        ctypes.c_uint16,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_uint64,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_MailboxWatcher_new.restype = ctypes.c_void_p
+    lib.rust_lib_MailboxWatcher_wait.argtypes = (
+        ctypes.c_void_p,
+        ctypes.c_uint32,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_MailboxWatcher_wait.restype = RustBuffer
+    lib.rust_lib_MailboxWatcher_stop.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_MailboxWatcher_stop.restype = None
+    lib.ffi_rust_lib_ParsedMessage_object_free.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.ffi_rust_lib_ParsedMessage_object_free.restype = None
+    lib.rust_lib_ParsedMessage_new.argtypes = (
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ParsedMessage_new.restype = ctypes.c_void_p
+    lib.rust_lib_ParsedMessage_headers.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ParsedMessage_headers.restype = RustBuffer
+    lib.rust_lib_ParsedMessage_parts.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ParsedMessage_parts.restype = RustBuffer
+    lib.rust_lib_ParsedMessage_attachments.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ParsedMessage_attachments.restype = RustBuffer
+    lib.rust_lib_ParsedMessage_text_body.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ParsedMessage_text_body.restype = RustBuffer
+    lib.rust_lib_ParsedMessage_html_body.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ParsedMessage_html_body.restype = RustBuffer
+    lib.rust_lib_ParsedMessage_part_content.argtypes = (
+        ctypes.c_void_p,
+        ctypes.c_uint32,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ParsedMessage_part_content.restype = RustBuffer
+    lib.rust_lib_ParsedMessage_part_text.argtypes = (
+        ctypes.c_void_p,
+        ctypes.c_uint32,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_ParsedMessage_part_text.restype = RustBuffer
+    lib.ffi_rust_lib_SmtpMailer_object_free.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.ffi_rust_lib_SmtpMailer_object_free.restype = None
+    lib.rust_lib_SmtpMailer_new.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_uint32,
+        ctypes.c_uint64,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_SmtpMailer_new.restype = ctypes.c_void_p
+    lib.rust_lib_SmtpMailer_check.argtypes = (
+        ctypes.c_void_p,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_SmtpMailer_check.restype = ctypes.c_int8
+    lib.rust_lib_SmtpMailer_send_plain_text_email.argtypes = (
+        ctypes.c_void_p,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_SmtpMailer_send_plain_text_email.restype = RustBuffer
+    lib.rust_lib_SmtpMailer_send_html_email.argtypes = (
+        ctypes.c_void_p,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_SmtpMailer_send_html_email.restype = RustBuffer
+    lib.rust_lib_simply_configure_tls.argtypes = (
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_configure_tls.restype = None
+    lib.rust_lib_simply_check_imap.argtypes = (
+        RustBuffer,
+        ctypes.c_uint16,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_check_imap.restype = None
+    lib.rust_lib_simply_fetch_inbox_top.argtypes = (
+        RustBuffer,
+        ctypes.c_uint16,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_fetch_inbox_top.restype = RustBuffer
+    lib.rust_lib_simply_fetch_inbox_top_bytes.argtypes = (
+        RustBuffer,
+        ctypes.c_uint16,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_fetch_inbox_top_bytes.restype = RustBuffer
+    lib.rust_lib_simply_fetch_messages.argtypes = (
+        RustBuffer,
+        ctypes.c_uint16,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_int8,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_fetch_messages.restype = RustBuffer
+    lib.rust_lib_simply_fetch_summaries.argtypes = (
+        RustBuffer,
+        ctypes.c_uint16,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_int8,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_fetch_summaries.restype = RustBuffer
+    lib.rust_lib_simply_search.argtypes = (
+        RustBuffer,
+        ctypes.c_uint16,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_search.restype = RustBuffer
+    lib.rust_lib_simply_uid_search.argtypes = (
+        RustBuffer,
+        ctypes.c_uint16,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_uid_search.restype = RustBuffer
+    lib.rust_lib_simply_check_smtp.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_check_smtp.restype = ctypes.c_int8
+    lib.rust_lib_simply_send_plain_text_email.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_send_plain_text_email.restype = RustBuffer
+    lib.rust_lib_simply_send_html_email.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_send_html_email.restype = RustBuffer
+    lib.rust_lib_simply_send_batch.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_send_batch.restype = RustBuffer
+    lib.rust_lib_simply_send_file_email.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_send_file_email.restype = RustBuffer
+    lib.rust_lib_simply_send_streamed_email.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_uint64,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_send_streamed_email.restype = RustBuffer
+    lib.rust_lib_simply_send_email_with_attachments.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_send_email_with_attachments.restype = RustBuffer
+    lib.rust_lib_simply_send_batch_with_attachments.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_send_batch_with_attachments.restype = RustBuffer
+    lib.ffi_rust_lib_CompletionHandler_init_callback.argtypes = (
+        FOREIGN_CALLBACK_T,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.ffi_rust_lib_CompletionHandler_init_callback.restype = None
+    lib.ffi_rust_lib_DownloadProgress_init_callback.argtypes = (
+        FOREIGN_CALLBACK_T,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.ffi_rust_lib_DownloadProgress_init_callback.restype = None
+    lib.ffi_rust_lib_MessageBodySource_init_callback.argtypes = (
+        FOREIGN_CALLBACK_T,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.ffi_rust_lib_MessageBodySource_init_callback.restype = None
+    lib.ffi_rust_lib_MessageChunkSink_init_callback.argtypes = (
+        FOREIGN_CALLBACK_T,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.ffi_rust_lib_MessageChunkSink_init_callback.restype = None
+    lib.rust_lib_simply_set_metrics_enabled.argtypes = (
+        ctypes.c_int8,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_set_metrics_enabled.restype = None
+    lib.rust_lib_simply_metrics_snapshot.argtypes = (
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_metrics_snapshot.restype = RustBuffer
+    lib.rust_lib_simply_reset_metrics.argtypes = (
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_reset_metrics.restype = None
+    lib.rust_lib_simply_set_async_worker_threads.argtypes = (
+        ctypes.c_uint32,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_set_async_worker_threads.restype = None
+    lib.rust_lib_simply_check_imap_async.argtypes = (
+        RustBuffer,
+        ctypes.c_uint16,
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_uint64,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_check_imap_async.restype = None
+    lib.rust_lib_simply_fetch_inbox_top_async.argtypes = (
+        RustBuffer,
+        ctypes.c_uint16,
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_uint64,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_fetch_inbox_top_async.restype = None
+    lib.rust_lib_simply_fetch_inbox_top_bytes_async.argtypes = (
+        RustBuffer,
+        ctypes.c_uint16,
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_uint64,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_fetch_inbox_top_bytes_async.restype = None
+    lib.rust_lib_simply_fetch_messages_async.argtypes = (
+        RustBuffer,
+        ctypes.c_uint16,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_int8,
+        ctypes.c_uint64,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_fetch_messages_async.restype = None
+    lib.rust_lib_simply_check_smtp_async.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_uint64,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_check_smtp_async.restype = None
+    lib.rust_lib_simply_send_plain_text_email_async.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_uint64,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_send_plain_text_email_async.restype = None
+    lib.rust_lib_simply_send_html_email_async.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_uint64,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_send_html_email_async.restype = None
+    lib.rust_lib_simply_send_batch_async.argtypes = (
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        RustBuffer,
+        ctypes.c_uint64,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.rust_lib_simply_send_batch_async.restype = None
+    lib.ffi_rust_lib_rustbuffer_alloc.argtypes = (
+        ctypes.c_int32,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.ffi_rust_lib_rustbuffer_alloc.restype = RustBuffer
+    lib.ffi_rust_lib_rustbuffer_from_bytes.argtypes = (
+        ForeignBytes,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.ffi_rust_lib_rustbuffer_from_bytes.restype = RustBuffer
+    lib.ffi_rust_lib_rustbuffer_free.argtypes = (
+        RustBuffer,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.ffi_rust_lib_rustbuffer_free.restype = None
+    lib.ffi_rust_lib_rustbuffer_reserve.argtypes = (
+        RustBuffer,
+        ctypes.c_int32,
+        ctypes.POINTER(RustCallStatus),
+    )
+    lib.ffi_rust_lib_rustbuffer_reserve.restype = RustBuffer
+
+class _UniFFILibLoader:
+    """
+    Loads the library, declares the signatures of its functions and registers the callback interfaces
+    on the first call into it rather than on import, so that processes which import this module but
+    never call into it (e.g. the workers of a pre-fork server that never send mail) don't pay for it.
+    A library loaded before os.fork() stays usable in the child, being mapped there as well.
+    If loading fails, e.g. because a callback interface can't be registered, the error propagates to the
+    call that triggered it and the next call tries again, resuming after the steps that succeeded.
+    """
+
+    def __init__(self):
+        self._lib = None
+        self._loading = None  # the library while its onLoad functions are being run
+        self._lock = threading.Lock()
+        self._onLoad = []
+        if hasattr(os, "register_at_fork"):
+            # the lock may have been held by another thread of the parent, which doesn't exist in the child
+            os.register_at_fork(after_in_child=self._resetLock)
+
+    def _resetLock(self):
+        self._lock = threading.Lock()
+
+    def onLoad(self, fn):
+        # fn(lib) is called once the library is loaded
+        with self._lock:
+            if self._lib is None:
+                self._onLoad.append(fn)
+                return
+        fn(self._lib)
+
+    def _load(self):
+        with self._lock:
+            if self._lib is None:
+                if self._loading is None:
+                    lib = _NamespacedLib(loadIndirect())
+                    _declareFunctions(lib)
+                    self._loading = lib
+                # each function is only dropped once it succeeded, as registering a callback interface twice fails
+                while self._onLoad:
+                    self._onLoad[0](self._loading)
+                    self._onLoad.pop(0)
+                self._lib, self._loading = self._loading, None
+            return self._lib
+
+    def __getattr__(self, name):
+        # only called on the first lookup of each function, which is then cached as an attribute of this object
+        fn = getattr(self._lib or self._load(), name)
+        setattr(self, name, fn)
+        return fn
+
+_UniFFILib = _UniFFILibLoader()
 
 # Public interface members begin here.
 
@@ -429,6 +1081,33 @@ class FfiConverterUInt16(FfiConverterPrimitive):
     def write(value, buf):
         buf.writeU16(value)
 
+class FfiConverterUInt32(FfiConverterPrimitive):
+    @staticmethod
+    def read(buf):
+        return buf.readU32()
+
+    @staticmethod
+    def write(value, buf):
+        buf.writeU32(value)
+
+class FfiConverterUInt64(FfiConverterPrimitive):
+    @staticmethod
+    def read(buf):
+        return buf.readU64()
+
+    @staticmethod
+    def write(value, buf):
+        buf.writeU64(value)
+
+class FfiConverterInt64(FfiConverterPrimitive):
+    @staticmethod
+    def read(buf):
+        return buf.readI64()
+
+    @staticmethod
+    def write(value, buf):
+        buf.writeI64(value)
+
 class FfiConverterBool:
     @classmethod
     def read(cls, buf):
@@ -452,8 +1131,7 @@ class FfiConverterString:
         size = buf.readI32()
         if size < 0:
             raise InternalError("Unexpected negative string length")
-        utf8Bytes = buf.read(size)
-        return utf8Bytes.decode("utf-8")
+        return str(buf._readView(size), "utf-8")
 
     @staticmethod
     def write(value, buf):
@@ -464,363 +1142,3623 @@ class FfiConverterString:
     @staticmethod
     def lift(buf):
         with buf.consumeWithStream() as stream:
-            return stream.read(stream.remaining()).decode("utf-8")
+            return str(stream._readView(stream.remaining()), "utf-8")
 
     @staticmethod
     def lower(value):
-        with RustBuffer.allocWithBuilder() as builder:
-            builder.write(value.encode("utf-8"))
+        utf8Bytes = value.encode("utf-8")
+        with RustBuffer.allocWithBuilder(len(utf8Bytes)) as builder:
+            builder.write(utf8Bytes)
             return builder.finalize()
 
 
-class SmtpResponse:
 
-    def __init__(self, severity, category, detail, message):
-        self.severity = severity
-        self.category = category
-        self.detail = detail
-        self.message = message
+class AccountSweep(object):
+    def __init__(self, accounts,task,max_connections = 64,max_connections_per_host = 8):
+        accounts = list(x for x in accounts)
+        
+        task = task
+        
+        max_connections = int(max_connections)
+        
+        max_connections_per_host = int(max_connections_per_host)
+        
+        self._pointer = rust_call(_UniFFILib.rust_lib_AccountSweep_new,
+        FfiConverterSequenceTypeSweepAccount.lower(accounts),
+        FfiConverterTypeSweepTask.lower(task),
+        FfiConverterUInt32.lower(max_connections),
+        FfiConverterUInt32.lower(max_connections_per_host))
+
+    def __del__(self):
+        # In case of partial initialization of instances.
+        pointer = getattr(self, "_pointer", None)
+        if pointer is not None:
+            rust_call(_UniFFILib.ffi_rust_lib_AccountSweep_object_free, pointer)
+
+    # Used by alternative constructors or any methods which return this type.
+    @classmethod
+    def _make_instance_(cls, pointer):
+        # Lightly yucky way to bypass the usual __init__ logic
+        # and just create a new instance with the required pointer.
+        inst = cls.__new__(cls)
+        inst._pointer = pointer
+        return inst
 
-    def __str__(self):
-        return "SmtpResponse(severity={}, category={}, detail={}, message={})".format(self.severity, self.category, self.detail, self.message)
+    def wait(self, timeout_secs):
+        timeout_secs = int(timeout_secs)
+        
+        return FfiConverterOptionalSequenceTypeSweepResult.lift(rust_call(_UniFFILib.rust_lib_AccountSweep_wait,self._pointer,
+        FfiConverterUInt32.lower(timeout_secs)))
 
-    def __eq__(self, other):
-        if self.severity != other.severity:
-            return False
-        if self.category != other.category:
-            return False
-        if self.detail != other.detail:
-            return False
-        if self.message != other.message:
-            return False
-        return True
+    def cancel(self):
+        rust_call(_UniFFILib.rust_lib_AccountSweep_cancel,self._pointer)
+
+
+
+class FfiConverterTypeAccountSweep:
+    @classmethod
+    def read(cls, buf):
+        ptr = buf.readU64()
+        if ptr == 0:
+            raise InternalError("Raw pointer value was null")
+        return cls.lift(ptr)
+
+    @classmethod
+    def write(cls, value, buf):
+        if not isinstance(value, AccountSweep):
+            raise TypeError("Expected AccountSweep instance, {} found".format(value.__class__.__name__))
+        buf.writeU64(cls.lower(value))
 
-class FfiConverterTypeSmtpResponse(FfiConverterRustBuffer):
     @staticmethod
-    def read(buf):
-        return SmtpResponse(
-            severity=FfiConverterUInt8.read(buf),
-            category=FfiConverterUInt8.read(buf),
-            detail=FfiConverterUInt8.read(buf),
-            message=FfiConverterString.read(buf),
-        )
+    def lift(value):
+        return AccountSweep._make_instance_(value)
 
     @staticmethod
-    def write(value, buf):
-        FfiConverterUInt8.write(value.severity, buf)
-        FfiConverterUInt8.write(value.category, buf)
-        FfiConverterUInt8.write(value.detail, buf)
-        FfiConverterString.write(value.message, buf)
+    def lower(value):
+        return value._pointer
 
 
 
-# ImapError
-# We want to define each variant as a nested class that's also a subclass,
-# which is tricky in Python.  To accomplish this we're going to create each
-# class separated, then manually add the child classes to the base class's
-# __dict__.  All of this happens in dummy class to avoid polluting the module
-# namespace.
-class UniFFIExceptionTmpNamespace:
-    class ImapError(Exception):
-        pass
-    
-    class IoError(ImapError):
-        def __str__(self):
-            return "ImapError.IoError({})".format(repr(super().__str__()))
+class ImapSession(object):
+    def __init__(self, domain,port,username,password):
+        domain = domain
+        
+        port = int(port)
+        
+        username = username
+        
+        password = password
+        
+        self._pointer = rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_new,
+        FfiConverterString.lower(domain),
+        FfiConverterUInt16.lower(port),
+        FfiConverterString.lower(username),
+        FfiConverterString.lower(password))
 
-    ImapError.IoError = IoError
-    class TlsHandshakeError(ImapError):
-        def __str__(self):
-            return "ImapError.TlsHandshakeError({})".format(repr(super().__str__()))
+    def __del__(self):
+        # In case of partial initialization of instances.
+        pointer = getattr(self, "_pointer", None)
+        if pointer is not None:
+            rust_call(_UniFFILib.ffi_rust_lib_ImapSession_object_free, pointer)
 
-    ImapError.TlsHandshakeError = TlsHandshakeError
-    class TlsError(ImapError):
-        def __str__(self):
-            return "ImapError.TlsError({})".format(repr(super().__str__()))
+    # Used by alternative constructors or any methods which return this type.
+    @classmethod
+    def _make_instance_(cls, pointer):
+        # Lightly yucky way to bypass the usual __init__ logic
+        # and just create a new instance with the required pointer.
+        inst = cls.__new__(cls)
+        inst._pointer = pointer
+        return inst
+
+
+    def select(self, mailbox):
+        mailbox = mailbox
+        
+        return FfiConverterTypeMailboxInfo.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_select,self._pointer,
+        FfiConverterString.lower(mailbox)))
+
+    def fetch(self, sequence_set,query):
+        sequence_set = sequence_set
+        
+        query = query
+        
+        return FfiConverterSequenceTypeImapMessage.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_fetch,self._pointer,
+        FfiConverterString.lower(sequence_set),
+        FfiConverterString.lower(query)))
+
+    def uid_fetch(self, uid_set,query):
+        uid_set = uid_set
+        
+        query = query
+        
+        return FfiConverterSequenceTypeImapMessage.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_uid_fetch,self._pointer,
+        FfiConverterString.lower(uid_set),
+        FfiConverterString.lower(query)))
+
+    def fetch_summaries(self, sequence_set,header_fields):
+        sequence_set = sequence_set
+        
+        header_fields = list(x for x in header_fields)
+        
+        return FfiConverterSequenceTypeMessageSummary.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_fetch_summaries,self._pointer,
+        FfiConverterString.lower(sequence_set),
+        FfiConverterSequenceString.lower(header_fields)))
+
+    def uid_fetch_summaries(self, uid_set,header_fields):
+        uid_set = uid_set
+        
+        header_fields = list(x for x in header_fields)
+        
+        return FfiConverterSequenceTypeMessageSummary.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_uid_fetch_summaries,self._pointer,
+        FfiConverterString.lower(uid_set),
+        FfiConverterSequenceString.lower(header_fields)))
+
+    def fetch_summary_columns(self, sequence_set,header_fields):
+        sequence_set = sequence_set
+        
+        header_fields = list(x for x in header_fields)
+        
+        return FfiConverterTypeSummaryColumns.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_fetch_summary_columns,self._pointer,
+        FfiConverterString.lower(sequence_set),
+        FfiConverterSequenceString.lower(header_fields)))
+
+    def uid_fetch_summary_columns(self, uid_set,header_fields):
+        uid_set = uid_set
+        
+        header_fields = list(x for x in header_fields)
+        
+        return FfiConverterTypeSummaryColumns.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_uid_fetch_summary_columns,self._pointer,
+        FfiConverterString.lower(uid_set),
+        FfiConverterSequenceString.lower(header_fields)))
+
+    def sync_flags(self, mailbox,previous):
+        mailbox = mailbox
+        
+        previous = previous
+        
+        return FfiConverterTypeFlagSync.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_sync_flags,self._pointer,
+        FfiConverterString.lower(mailbox),
+        FfiConverterOptionalTypeFlagSyncState.lower(previous)))
+
+    def search(self, query):
+        query = query
+        
+        return FfiConverterSequenceUInt32.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_search,self._pointer,
+        FfiConverterString.lower(query)))
+
+    def uid_search(self, query):
+        query = query
+        
+        return FfiConverterSequenceUInt32.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_uid_search,self._pointer,
+        FfiConverterString.lower(query)))
+
+    def enable_compression(self):
+        return FfiConverterBool.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_enable_compression,self._pointer))
+
+    def traffic(self):
+        return FfiConverterTypeImapTraffic.lift(rust_call(_UniFFILib.rust_lib_ImapSession_traffic,self._pointer))
+
+    def download_message(self, uid,offset,chunk_size,sink):
+        uid = int(uid)
+        
+        offset = int(offset)
+        
+        chunk_size = int(chunk_size)
+        
+        sink = sink
+        
+        return FfiConverterUInt64.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_download_message,self._pointer,
+        FfiConverterUInt32.lower(uid),
+        FfiConverterUInt64.lower(offset),
+        FfiConverterUInt32.lower(chunk_size),
+        FfiConverterCallbackInterfaceMessageChunkSink.lower(sink)))
+
+    def download_message_to_file(self, uid,path,chunk_size,progress):
+        uid = int(uid)
+        
+        path = path
+        
+        chunk_size = int(chunk_size)
+        
+        progress = progress
+        
+        return FfiConverterUInt64.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_download_message_to_file,self._pointer,
+        FfiConverterUInt32.lower(uid),
+        FfiConverterString.lower(path),
+        FfiConverterUInt32.lower(chunk_size),
+        FfiConverterCallbackInterfaceDownloadProgress.lower(progress)))
+
+    def logout(self):
+        rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_ImapSession_logout,self._pointer)
+
+
+
+class FfiConverterTypeImapSession:
+    @classmethod
+    def read(cls, buf):
+        ptr = buf.readU64()
+        if ptr == 0:
+            raise InternalError("Raw pointer value was null")
+        return cls.lift(ptr)
 
-    ImapError.TlsError = TlsError
-    class BadResponse(ImapError):
-        def __str__(self):
-            return "ImapError.BadResponse({})".format(repr(super().__str__()))
+    @classmethod
+    def write(cls, value, buf):
+        if not isinstance(value, ImapSession):
+            raise TypeError("Expected ImapSession instance, {} found".format(value.__class__.__name__))
+        buf.writeU64(cls.lower(value))
 
-    ImapError.BadResponse = BadResponse
-    class NoResponse(ImapError):
-        def __str__(self):
-            return "ImapError.NoResponse({})".format(repr(super().__str__()))
+    @staticmethod
+    def lift(value):
+        return ImapSession._make_instance_(value)
 
-    ImapError.NoResponse = NoResponse
-    class ConnectionLost(ImapError):
-        def __str__(self):
-            return "ImapError.ConnectionLost({})".format(repr(super().__str__()))
+    @staticmethod
+    def lower(value):
+        return value._pointer
+
+
+class MailboxWatcher(object):
+    def __init__(self, domain,port,username,password,mailbox,keepalive_secs = 1740):
+        domain = domain
+        
+        port = int(port)
+        
+        username = username
+        
+        password = password
+        
+        mailbox = mailbox
+        
+        keepalive_secs = int(keepalive_secs)
+        
+        self._pointer = rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_MailboxWatcher_new,
+        FfiConverterString.lower(domain),
+        FfiConverterUInt16.lower(port),
+        FfiConverterString.lower(username),
+        FfiConverterString.lower(password),
+        FfiConverterString.lower(mailbox),
+        FfiConverterUInt64.lower(keepalive_secs))
 
-    ImapError.ConnectionLost = ConnectionLost
-    class ParseError(ImapError):
-        def __str__(self):
-            return "ImapError.ParseError({})".format(repr(super().__str__()))
+    def __del__(self):
+        # In case of partial initialization of instances.
+        pointer = getattr(self, "_pointer", None)
+        if pointer is not None:
+            rust_call(_UniFFILib.ffi_rust_lib_MailboxWatcher_object_free, pointer)
 
-    ImapError.ParseError = ParseError
-    class ValidateError(ImapError):
-        def __str__(self):
-            return "ImapError.ValidateError({})".format(repr(super().__str__()))
+    # Used by alternative constructors or any methods which return this type.
+    @classmethod
+    def _make_instance_(cls, pointer):
+        # Lightly yucky way to bypass the usual __init__ logic
+        # and just create a new instance with the required pointer.
+        inst = cls.__new__(cls)
+        inst._pointer = pointer
+        return inst
 
-    ImapError.ValidateError = ValidateError
-    class AppendError(ImapError):
-        def __str__(self):
-            return "ImapError.AppendError({})".format(repr(super().__str__()))
+    def wait(self, timeout_secs):
+        timeout_secs = int(timeout_secs)
+        
+        return FfiConverterOptionalSequenceTypeMailboxEvent.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_MailboxWatcher_wait,self._pointer,
+        FfiConverterUInt32.lower(timeout_secs)))
 
-    ImapError.AppendError = AppendError
-    class Nonexhaustive(ImapError):
-        def __str__(self):
-            return "ImapError.Nonexhaustive({})".format(repr(super().__str__()))
+    def stop(self):
+        rust_call(_UniFFILib.rust_lib_MailboxWatcher_stop,self._pointer)
 
-    ImapError.Nonexhaustive = Nonexhaustive
-ImapError = UniFFIExceptionTmpNamespace.ImapError
-del UniFFIExceptionTmpNamespace
 
 
-class FfiConverterTypeImapError(FfiConverterRustBuffer):
+class FfiConverterTypeMailboxWatcher:
+    @classmethod
+    def read(cls, buf):
+        ptr = buf.readU64()
+        if ptr == 0:
+            raise InternalError("Raw pointer value was null")
+        return cls.lift(ptr)
+
+    @classmethod
+    def write(cls, value, buf):
+        if not isinstance(value, MailboxWatcher):
+            raise TypeError("Expected MailboxWatcher instance, {} found".format(value.__class__.__name__))
+        buf.writeU64(cls.lower(value))
+
     @staticmethod
-    def read(buf):
-        variant = buf.readI32()
-        if variant == 1:
-            return ImapError.IoError(
-                FfiConverterString.read(buf),
-            )
-        if variant == 2:
-            return ImapError.TlsHandshakeError(
-                FfiConverterString.read(buf),
-            )
-        if variant == 3:
-            return ImapError.TlsError(
-                FfiConverterString.read(buf),
-            )
-        if variant == 4:
-            return ImapError.BadResponse(
-                FfiConverterString.read(buf),
-            )
-        if variant == 5:
-            return ImapError.NoResponse(
-                FfiConverterString.read(buf),
-            )
-        if variant == 6:
-            return ImapError.ConnectionLost(
-                FfiConverterString.read(buf),
-            )
-        if variant == 7:
-            return ImapError.ParseError(
-                FfiConverterString.read(buf),
-            )
-        if variant == 8:
-            return ImapError.ValidateError(
-                FfiConverterString.read(buf),
-            )
-        if variant == 9:
-            return ImapError.AppendError(
-                FfiConverterString.read(buf),
-            )
-        if variant == 10:
-            return ImapError.Nonexhaustive(
-                FfiConverterString.read(buf),
-            )
-        raise InternalError("Raw enum value doesn't match any cases")
+    def lift(value):
+        return MailboxWatcher._make_instance_(value)
 
     @staticmethod
-    def write(value, buf):
-        if isinstance(value, ImapError.IoError):
-            buf.writeI32(1)
-        if isinstance(value, ImapError.TlsHandshakeError):
-            buf.writeI32(2)
-        if isinstance(value, ImapError.TlsError):
-            buf.writeI32(3)
-        if isinstance(value, ImapError.BadResponse):
-            buf.writeI32(4)
-        if isinstance(value, ImapError.NoResponse):
-            buf.writeI32(5)
-        if isinstance(value, ImapError.ConnectionLost):
-            buf.writeI32(6)
-        if isinstance(value, ImapError.ParseError):
-            buf.writeI32(7)
-        if isinstance(value, ImapError.ValidateError):
-            buf.writeI32(8)
-        if isinstance(value, ImapError.AppendError):
-            buf.writeI32(9)
-        if isinstance(value, ImapError.Nonexhaustive):
-            buf.writeI32(10)
+    def lower(value):
+        return value._pointer
 
 
+class ParsedMessage(object):
+    def __init__(self, raw):
+        raw = raw
+        
+        self._pointer = rust_call_with_error(FfiConverterTypeMimeError,_UniFFILib.rust_lib_ParsedMessage_new,
+        FfiConverterSequenceUInt8.lower(raw))
 
-# SmtpError
-# We want to define each variant as a nested class that's also a subclass,
-# which is tricky in Python.  To accomplish this we're going to create each
-# class separated, then manually add the child classes to the base class's
-# __dict__.  All of this happens in dummy class to avoid polluting the module
-# namespace.
-class UniFFIExceptionTmpNamespace:
-    class SmtpError(Exception):
-        pass
-    
-    class TransientSmtpError(SmtpError):
-        def __str__(self):
-            return "SmtpError.TransientSmtpError({})".format(repr(super().__str__()))
+    def __del__(self):
+        # In case of partial initialization of instances.
+        pointer = getattr(self, "_pointer", None)
+        if pointer is not None:
+            rust_call(_UniFFILib.ffi_rust_lib_ParsedMessage_object_free, pointer)
 
-    SmtpError.TransientSmtpError = TransientSmtpError
-    class PermanentSmtpError(SmtpError):
-        def __str__(self):
-            return "SmtpError.PermanentSmtpError({})".format(repr(super().__str__()))
+    # Used by alternative constructors or any methods which return this type.
+    @classmethod
+    def _make_instance_(cls, pointer):
+        # Lightly yucky way to bypass the usual __init__ logic
+        # and just create a new instance with the required pointer.
+        inst = cls.__new__(cls)
+        inst._pointer = pointer
+        return inst
+
+    def headers(self):
+        return FfiConverterSequenceTypeMimeHeader.lift(rust_call(_UniFFILib.rust_lib_ParsedMessage_headers,self._pointer))
+
+    def parts(self):
+        return FfiConverterSequenceTypeMimePart.lift(rust_call(_UniFFILib.rust_lib_ParsedMessage_parts,self._pointer))
+
+    def attachments(self):
+        return FfiConverterSequenceTypeMimePart.lift(rust_call(_UniFFILib.rust_lib_ParsedMessage_attachments,self._pointer))
+
+    def text_body(self):
+        return FfiConverterOptionalString.lift(rust_call_with_error(FfiConverterTypeMimeError,_UniFFILib.rust_lib_ParsedMessage_text_body,self._pointer))
+
+    def html_body(self):
+        return FfiConverterOptionalString.lift(rust_call_with_error(FfiConverterTypeMimeError,_UniFFILib.rust_lib_ParsedMessage_html_body,self._pointer))
+
+    def part_content(self, index):
+        index = int(index)
+        
+        return FfiConverterSequenceUInt8.lift(rust_call_with_error(FfiConverterTypeMimeError,_UniFFILib.rust_lib_ParsedMessage_part_content,self._pointer,
+        FfiConverterUInt32.lower(index)))
+
+    def part_text(self, index):
+        index = int(index)
+        
+        return FfiConverterString.lift(rust_call_with_error(FfiConverterTypeMimeError,_UniFFILib.rust_lib_ParsedMessage_part_text,self._pointer,
+        FfiConverterUInt32.lower(index)))
+
+
+
+class FfiConverterTypeParsedMessage:
+    @classmethod
+    def read(cls, buf):
+        ptr = buf.readU64()
+        if ptr == 0:
+            raise InternalError("Raw pointer value was null")
+        return cls.lift(ptr)
+
+    @classmethod
+    def write(cls, value, buf):
+        if not isinstance(value, ParsedMessage):
+            raise TypeError("Expected ParsedMessage instance, {} found".format(value.__class__.__name__))
+        buf.writeU64(cls.lower(value))
+
+    @staticmethod
+    def lift(value):
+        return ParsedMessage._make_instance_(value)
+
+    @staticmethod
+    def lower(value):
+        return value._pointer
+
+
+
+class SmtpMailer(object):
+    def __init__(self, smtp_server,smtp_username,smtp_password,pool_max_size,pool_idle_timeout_secs):
+        smtp_server = smtp_server
+        
+        smtp_username = smtp_username
+        
+        smtp_password = smtp_password
+        
+        pool_max_size = int(pool_max_size)
+        
+        pool_idle_timeout_secs = int(pool_idle_timeout_secs)
+        
+        self._pointer = rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_SmtpMailer_new,
+        FfiConverterString.lower(smtp_server),
+        FfiConverterString.lower(smtp_username),
+        FfiConverterString.lower(smtp_password),
+        FfiConverterUInt32.lower(pool_max_size),
+        FfiConverterUInt64.lower(pool_idle_timeout_secs))
+
+    def __del__(self):
+        # In case of partial initialization of instances.
+        pointer = getattr(self, "_pointer", None)
+        if pointer is not None:
+            rust_call(_UniFFILib.ffi_rust_lib_SmtpMailer_object_free, pointer)
+
+    # Used by alternative constructors or any methods which return this type.
+    @classmethod
+    def _make_instance_(cls, pointer):
+        # Lightly yucky way to bypass the usual __init__ logic
+        # and just create a new instance with the required pointer.
+        inst = cls.__new__(cls)
+        inst._pointer = pointer
+        return inst
+
+
+    def check(self):
+        return FfiConverterBool.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_SmtpMailer_check,self._pointer))
+
+    def send_plain_text_email(self, headers,body):
+        headers = dict((k, v) for (k, v) in headers.items())
+        
+        body = body
+        
+        return FfiConverterTypeSmtpResponse.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_SmtpMailer_send_plain_text_email,self._pointer,
+        FfiConverterMapStringString.lower(headers),
+        FfiConverterString.lower(body)))
+
+    def send_html_email(self, headers,plain_text_body,html_body):
+        headers = dict((k, v) for (k, v) in headers.items())
+        
+        plain_text_body = plain_text_body
+        
+        html_body = html_body
+        
+        return FfiConverterTypeSmtpResponse.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_SmtpMailer_send_html_email,self._pointer,
+        FfiConverterMapStringString.lower(headers),
+        FfiConverterString.lower(plain_text_body),
+        FfiConverterString.lower(html_body)))
+
+
+
+class FfiConverterTypeSmtpMailer:
+    @classmethod
+    def read(cls, buf):
+        ptr = buf.readU64()
+        if ptr == 0:
+            raise InternalError("Raw pointer value was null")
+        return cls.lift(ptr)
+
+    @classmethod
+    def write(cls, value, buf):
+        if not isinstance(value, SmtpMailer):
+            raise TypeError("Expected SmtpMailer instance, {} found".format(value.__class__.__name__))
+        buf.writeU64(cls.lower(value))
+
+    @staticmethod
+    def lift(value):
+        return SmtpMailer._make_instance_(value)
+
+    @staticmethod
+    def lower(value):
+        return value._pointer
+
+
+class AsyncResult:
+
+    def __init__(self, error, error_message, flag, text, data, response, messages, batch):
+        self.error = error
+        self.error_message = error_message
+        self.flag = flag
+        self.text = text
+        self.data = data
+        self.response = response
+        self.messages = messages
+        self.batch = batch
+
+    def __str__(self):
+        return "AsyncResult(error={}, error_message={}, flag={}, text={}, data={}, response={}, messages={}, batch={})".format(self.error, self.error_message, self.flag, self.text, self.data, self.response, self.messages, self.batch)
+
+    def __eq__(self, other):
+        if self.error != other.error:
+            return False
+        if self.error_message != other.error_message:
+            return False
+        if self.flag != other.flag:
+            return False
+        if self.text != other.text:
+            return False
+        if self.data != other.data:
+            return False
+        if self.response != other.response:
+            return False
+        if self.messages != other.messages:
+            return False
+        if self.batch != other.batch:
+            return False
+        return True
+
+class FfiConverterTypeAsyncResult(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return AsyncResult(
+            error=FfiConverterOptionalString.read(buf),
+            error_message=FfiConverterOptionalString.read(buf),
+            flag=FfiConverterOptionalBool.read(buf),
+            text=FfiConverterOptionalString.read(buf),
+            data=FfiConverterOptionalSequenceUInt8.read(buf),
+            response=FfiConverterOptionalTypeSmtpResponse.read(buf),
+            messages=FfiConverterOptionalSequenceTypeImapMessage.read(buf),
+            batch=FfiConverterOptionalSequenceTypeBatchSendResult.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterOptionalString.write(value.error, buf)
+        FfiConverterOptionalString.write(value.error_message, buf)
+        FfiConverterOptionalBool.write(value.flag, buf)
+        FfiConverterOptionalString.write(value.text, buf)
+        FfiConverterOptionalSequenceUInt8.write(value.data, buf)
+        FfiConverterOptionalTypeSmtpResponse.write(value.response, buf)
+        FfiConverterOptionalSequenceTypeImapMessage.write(value.messages, buf)
+        FfiConverterOptionalSequenceTypeBatchSendResult.write(value.batch, buf)
+
+
+class Attachment:
+
+    def __init__(self, path, content_type, filename):
+        self.path = path
+        self.content_type = content_type
+        self.filename = filename
+
+    def __str__(self):
+        return "Attachment(path={}, content_type={}, filename={})".format(self.path, self.content_type, self.filename)
+
+    def __eq__(self, other):
+        if self.path != other.path:
+            return False
+        if self.content_type != other.content_type:
+            return False
+        if self.filename != other.filename:
+            return False
+        return True
+
+class FfiConverterTypeAttachment(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return Attachment(
+            path=FfiConverterString.read(buf),
+            content_type=FfiConverterString.read(buf),
+            filename=FfiConverterOptionalString.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterString.write(value.path, buf)
+        FfiConverterString.write(value.content_type, buf)
+        FfiConverterOptionalString.write(value.filename, buf)
+
+
+class BatchSendResult:
+
+    def __init__(self, response, error, rejected_recipients):
+        self.response = response
+        self.error = error
+        self.rejected_recipients = rejected_recipients
+
+    def __str__(self):
+        return "BatchSendResult(response={}, error={}, rejected_recipients={})".format(self.response, self.error, self.rejected_recipients)
+
+    def __eq__(self, other):
+        if self.response != other.response:
+            return False
+        if self.error != other.error:
+            return False
+        if self.rejected_recipients != other.rejected_recipients:
+            return False
+        return True
+
+class FfiConverterTypeBatchSendResult(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return BatchSendResult(
+            response=FfiConverterOptionalTypeSmtpResponse.read(buf),
+            error=FfiConverterOptionalString.read(buf),
+            rejected_recipients=FfiConverterSequenceString.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterOptionalTypeSmtpResponse.write(value.response, buf)
+        FfiConverterOptionalString.write(value.error, buf)
+        FfiConverterSequenceString.write(value.rejected_recipients, buf)
+
+
+class EmailAddress:
+
+    def __init__(self, name, mailbox, host):
+        self.name = name
+        self.mailbox = mailbox
+        self.host = host
+
+    def __str__(self):
+        return "EmailAddress(name={}, mailbox={}, host={})".format(self.name, self.mailbox, self.host)
+
+    def __eq__(self, other):
+        if self.name != other.name:
+            return False
+        if self.mailbox != other.mailbox:
+            return False
+        if self.host != other.host:
+            return False
+        return True
+
+class FfiConverterTypeEmailAddress(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return EmailAddress(
+            name=FfiConverterOptionalString.read(buf),
+            mailbox=FfiConverterOptionalString.read(buf),
+            host=FfiConverterOptionalString.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterOptionalString.write(value.name, buf)
+        FfiConverterOptionalString.write(value.mailbox, buf)
+        FfiConverterOptionalString.write(value.host, buf)
+
+
+class FlagChange:
+
+    def __init__(self, uid, flags):
+        self.uid = uid
+        self.flags = flags
+
+    def __str__(self):
+        return "FlagChange(uid={}, flags={})".format(self.uid, self.flags)
+
+    def __eq__(self, other):
+        if self.uid != other.uid:
+            return False
+        if self.flags != other.flags:
+            return False
+        return True
+
+class FfiConverterTypeFlagChange(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return FlagChange(
+            uid=FfiConverterUInt32.read(buf),
+            flags=FfiConverterSequenceString.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterUInt32.write(value.uid, buf)
+        FfiConverterSequenceString.write(value.flags, buf)
+
+
+class FlagSync:
+
+    def __init__(self, state, full, changed, present_uids):
+        self.state = state
+        self.full = full
+        self.changed = changed
+        self.present_uids = present_uids
+
+    def __str__(self):
+        return "FlagSync(state={}, full={}, changed={}, present_uids={})".format(self.state, self.full, self.changed, self.present_uids)
+
+    def __eq__(self, other):
+        if self.state != other.state:
+            return False
+        if self.full != other.full:
+            return False
+        if self.changed != other.changed:
+            return False
+        if self.present_uids != other.present_uids:
+            return False
+        return True
+
+class FfiConverterTypeFlagSync(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return FlagSync(
+            state=FfiConverterTypeFlagSyncState.read(buf),
+            full=FfiConverterBool.read(buf),
+            changed=FfiConverterSequenceTypeFlagChange.read(buf),
+            present_uids=FfiConverterOptionalSequenceUInt32.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterTypeFlagSyncState.write(value.state, buf)
+        FfiConverterBool.write(value.full, buf)
+        FfiConverterSequenceTypeFlagChange.write(value.changed, buf)
+        FfiConverterOptionalSequenceUInt32.write(value.present_uids, buf)
+
+
+class FlagSyncState:
+
+    def __init__(self, uid_validity, uid_next, highest_mod_seq, message_count):
+        self.uid_validity = uid_validity
+        self.uid_next = uid_next
+        self.highest_mod_seq = highest_mod_seq
+        self.message_count = message_count
+
+    def __str__(self):
+        return "FlagSyncState(uid_validity={}, uid_next={}, highest_mod_seq={}, message_count={})".format(self.uid_validity, self.uid_next, self.highest_mod_seq, self.message_count)
+
+    def __eq__(self, other):
+        if self.uid_validity != other.uid_validity:
+            return False
+        if self.uid_next != other.uid_next:
+            return False
+        if self.highest_mod_seq != other.highest_mod_seq:
+            return False
+        if self.message_count != other.message_count:
+            return False
+        return True
+
+class FfiConverterTypeFlagSyncState(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return FlagSyncState(
+            uid_validity=FfiConverterUInt32.read(buf),
+            uid_next=FfiConverterUInt32.read(buf),
+            highest_mod_seq=FfiConverterUInt64.read(buf),
+            message_count=FfiConverterUInt32.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterUInt32.write(value.uid_validity, buf)
+        FfiConverterUInt32.write(value.uid_next, buf)
+        FfiConverterUInt64.write(value.highest_mod_seq, buf)
+        FfiConverterUInt32.write(value.message_count, buf)
+
+
+class I64Column:
+
+    def __init__(self, values, present):
+        self.values = values
+        self.present = present
+
+    def __str__(self):
+        return "I64Column(values={}, present={})".format(self.values, self.present)
+
+    def __eq__(self, other):
+        if self.values != other.values:
+            return False
+        if self.present != other.present:
+            return False
+        return True
+
+class FfiConverterTypeI64Column(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return I64Column(
+            values=FfiConverterSequenceUInt8.read(buf),
+            present=FfiConverterSequenceUInt8.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterSequenceUInt8.write(value.values, buf)
+        FfiConverterSequenceUInt8.write(value.present, buf)
+
+
+class ImapMessage:
+
+    def __init__(self, message, uid, size, flags, body):
+        self.message = message
+        self.uid = uid
+        self.size = size
+        self.flags = flags
+        self.body = body
+
+    def __str__(self):
+        return "ImapMessage(message={}, uid={}, size={}, flags={}, body={})".format(self.message, self.uid, self.size, self.flags, self.body)
+
+    def __eq__(self, other):
+        if self.message != other.message:
+            return False
+        if self.uid != other.uid:
+            return False
+        if self.size != other.size:
+            return False
+        if self.flags != other.flags:
+            return False
+        if self.body != other.body:
+            return False
+        return True
+
+class FfiConverterTypeImapMessage(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return ImapMessage(
+            message=FfiConverterUInt32.read(buf),
+            uid=FfiConverterOptionalUInt32.read(buf),
+            size=FfiConverterOptionalUInt32.read(buf),
+            flags=FfiConverterSequenceString.read(buf),
+            body=FfiConverterOptionalSequenceUInt8.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterUInt32.write(value.message, buf)
+        FfiConverterOptionalUInt32.write(value.uid, buf)
+        FfiConverterOptionalUInt32.write(value.size, buf)
+        FfiConverterSequenceString.write(value.flags, buf)
+        FfiConverterOptionalSequenceUInt8.write(value.body, buf)
+
+
+class ImapTraffic:
+
+    def __init__(self, compressed, raw_bytes_sent, raw_bytes_received, wire_bytes_sent, wire_bytes_received):
+        self.compressed = compressed
+        self.raw_bytes_sent = raw_bytes_sent
+        self.raw_bytes_received = raw_bytes_received
+        self.wire_bytes_sent = wire_bytes_sent
+        self.wire_bytes_received = wire_bytes_received
+
+    def __str__(self):
+        return "ImapTraffic(compressed={}, raw_bytes_sent={}, raw_bytes_received={}, wire_bytes_sent={}, wire_bytes_received={})".format(self.compressed, self.raw_bytes_sent, self.raw_bytes_received, self.wire_bytes_sent, self.wire_bytes_received)
+
+    def __eq__(self, other):
+        if self.compressed != other.compressed:
+            return False
+        if self.raw_bytes_sent != other.raw_bytes_sent:
+            return False
+        if self.raw_bytes_received != other.raw_bytes_received:
+            return False
+        if self.wire_bytes_sent != other.wire_bytes_sent:
+            return False
+        if self.wire_bytes_received != other.wire_bytes_received:
+            return False
+        return True
+
+class FfiConverterTypeImapTraffic(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return ImapTraffic(
+            compressed=FfiConverterBool.read(buf),
+            raw_bytes_sent=FfiConverterUInt64.read(buf),
+            raw_bytes_received=FfiConverterUInt64.read(buf),
+            wire_bytes_sent=FfiConverterUInt64.read(buf),
+            wire_bytes_received=FfiConverterUInt64.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterBool.write(value.compressed, buf)
+        FfiConverterUInt64.write(value.raw_bytes_sent, buf)
+        FfiConverterUInt64.write(value.raw_bytes_received, buf)
+        FfiConverterUInt64.write(value.wire_bytes_sent, buf)
+        FfiConverterUInt64.write(value.wire_bytes_received, buf)
+
+
+class LatencyHistogram:
+
+    def __init__(self, count, total_micros, buckets):
+        self.count = count
+        self.total_micros = total_micros
+        self.buckets = buckets
+
+    def __str__(self):
+        return "LatencyHistogram(count={}, total_micros={}, buckets={})".format(self.count, self.total_micros, self.buckets)
+
+    def __eq__(self, other):
+        if self.count != other.count:
+            return False
+        if self.total_micros != other.total_micros:
+            return False
+        if self.buckets != other.buckets:
+            return False
+        return True
+
+class FfiConverterTypeLatencyHistogram(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return LatencyHistogram(
+            count=FfiConverterUInt64.read(buf),
+            total_micros=FfiConverterUInt64.read(buf),
+            buckets=FfiConverterSequenceUInt64.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterUInt64.write(value.count, buf)
+        FfiConverterUInt64.write(value.total_micros, buf)
+        FfiConverterSequenceUInt64.write(value.buckets, buf)
+
+
+class MailboxInfo:
+
+    def __init__(self, exists, recent, unseen, uid_next, uid_validity, flags):
+        self.exists = exists
+        self.recent = recent
+        self.unseen = unseen
+        self.uid_next = uid_next
+        self.uid_validity = uid_validity
+        self.flags = flags
+
+    def __str__(self):
+        return "MailboxInfo(exists={}, recent={}, unseen={}, uid_next={}, uid_validity={}, flags={})".format(self.exists, self.recent, self.unseen, self.uid_next, self.uid_validity, self.flags)
+
+    def __eq__(self, other):
+        if self.exists != other.exists:
+            return False
+        if self.recent != other.recent:
+            return False
+        if self.unseen != other.unseen:
+            return False
+        if self.uid_next != other.uid_next:
+            return False
+        if self.uid_validity != other.uid_validity:
+            return False
+        if self.flags != other.flags:
+            return False
+        return True
+
+class FfiConverterTypeMailboxInfo(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return MailboxInfo(
+            exists=FfiConverterUInt32.read(buf),
+            recent=FfiConverterUInt32.read(buf),
+            unseen=FfiConverterOptionalUInt32.read(buf),
+            uid_next=FfiConverterOptionalUInt32.read(buf),
+            uid_validity=FfiConverterOptionalUInt32.read(buf),
+            flags=FfiConverterSequenceString.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterUInt32.write(value.exists, buf)
+        FfiConverterUInt32.write(value.recent, buf)
+        FfiConverterOptionalUInt32.write(value.unseen, buf)
+        FfiConverterOptionalUInt32.write(value.uid_next, buf)
+        FfiConverterOptionalUInt32.write(value.uid_validity, buf)
+        FfiConverterSequenceString.write(value.flags, buf)
+
+
+class MailboxEvent:
+
+    def __init__(self, kind, number, uid, flags):
+        self.kind = kind
+        self.number = number
+        self.uid = uid
+        self.flags = flags
+
+    def __str__(self):
+        return "MailboxEvent(kind={}, number={}, uid={}, flags={})".format(self.kind, self.number, self.uid, self.flags)
+
+    def __eq__(self, other):
+        if self.kind != other.kind:
+            return False
+        if self.number != other.number:
+            return False
+        if self.uid != other.uid:
+            return False
+        if self.flags != other.flags:
+            return False
+        return True
+
+class FfiConverterTypeMailboxEvent(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return MailboxEvent(
+            kind=FfiConverterTypeMailboxEventKind.read(buf),
+            number=FfiConverterUInt32.read(buf),
+            uid=FfiConverterOptionalUInt32.read(buf),
+            flags=FfiConverterSequenceString.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterTypeMailboxEventKind.write(value.kind, buf)
+        FfiConverterUInt32.write(value.number, buf)
+        FfiConverterOptionalUInt32.write(value.uid, buf)
+        FfiConverterSequenceString.write(value.flags, buf)
+
+
+class MessageSummary:
+
+    def __init__(self, message, uid, size, flags, internal_date, date, subject, from_addresses, reply_to_addresses, to_addresses, cc_addresses, message_id, in_reply_to, headers):
+        self.message = message
+        self.uid = uid
+        self.size = size
+        self.flags = flags
+        self.internal_date = internal_date
+        self.date = date
+        self.subject = subject
+        self.from_addresses = from_addresses
+        self.reply_to_addresses = reply_to_addresses
+        self.to_addresses = to_addresses
+        self.cc_addresses = cc_addresses
+        self.message_id = message_id
+        self.in_reply_to = in_reply_to
+        self.headers = headers
+
+    def __str__(self):
+        return "MessageSummary(message={}, uid={}, size={}, flags={}, internal_date={}, date={}, subject={}, from_addresses={}, reply_to_addresses={}, to_addresses={}, cc_addresses={}, message_id={}, in_reply_to={}, headers={})".format(self.message, self.uid, self.size, self.flags, self.internal_date, self.date, self.subject, self.from_addresses, self.reply_to_addresses, self.to_addresses, self.cc_addresses, self.message_id, self.in_reply_to, self.headers)
+
+    def __eq__(self, other):
+        if self.message != other.message:
+            return False
+        if self.uid != other.uid:
+            return False
+        if self.size != other.size:
+            return False
+        if self.flags != other.flags:
+            return False
+        if self.internal_date != other.internal_date:
+            return False
+        if self.date != other.date:
+            return False
+        if self.subject != other.subject:
+            return False
+        if self.from_addresses != other.from_addresses:
+            return False
+        if self.reply_to_addresses != other.reply_to_addresses:
+            return False
+        if self.to_addresses != other.to_addresses:
+            return False
+        if self.cc_addresses != other.cc_addresses:
+            return False
+        if self.message_id != other.message_id:
+            return False
+        if self.in_reply_to != other.in_reply_to:
+            return False
+        if self.headers != other.headers:
+            return False
+        return True
+
+class FfiConverterTypeMessageSummary(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return MessageSummary(
+            message=FfiConverterUInt32.read(buf),
+            uid=FfiConverterOptionalUInt32.read(buf),
+            size=FfiConverterOptionalUInt32.read(buf),
+            flags=FfiConverterSequenceString.read(buf),
+            internal_date=FfiConverterOptionalInt64.read(buf),
+            date=FfiConverterOptionalString.read(buf),
+            subject=FfiConverterOptionalString.read(buf),
+            from_addresses=FfiConverterSequenceTypeEmailAddress.read(buf),
+            reply_to_addresses=FfiConverterSequenceTypeEmailAddress.read(buf),
+            to_addresses=FfiConverterSequenceTypeEmailAddress.read(buf),
+            cc_addresses=FfiConverterSequenceTypeEmailAddress.read(buf),
+            message_id=FfiConverterOptionalString.read(buf),
+            in_reply_to=FfiConverterOptionalString.read(buf),
+            headers=FfiConverterMapStringString.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterUInt32.write(value.message, buf)
+        FfiConverterOptionalUInt32.write(value.uid, buf)
+        FfiConverterOptionalUInt32.write(value.size, buf)
+        FfiConverterSequenceString.write(value.flags, buf)
+        FfiConverterOptionalInt64.write(value.internal_date, buf)
+        FfiConverterOptionalString.write(value.date, buf)
+        FfiConverterOptionalString.write(value.subject, buf)
+        FfiConverterSequenceTypeEmailAddress.write(value.from_addresses, buf)
+        FfiConverterSequenceTypeEmailAddress.write(value.reply_to_addresses, buf)
+        FfiConverterSequenceTypeEmailAddress.write(value.to_addresses, buf)
+        FfiConverterSequenceTypeEmailAddress.write(value.cc_addresses, buf)
+        FfiConverterOptionalString.write(value.message_id, buf)
+        FfiConverterOptionalString.write(value.in_reply_to, buf)
+        FfiConverterMapStringString.write(value.headers, buf)
+
+
+class MimeHeader:
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def __str__(self):
+        return "MimeHeader(name={}, value={})".format(self.name, self.value)
+
+    def __eq__(self, other):
+        if self.name != other.name:
+            return False
+        if self.value != other.value:
+            return False
+        return True
+
+class FfiConverterTypeMimeHeader(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return MimeHeader(
+            name=FfiConverterString.read(buf),
+            value=FfiConverterString.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterString.write(value.name, buf)
+        FfiConverterString.write(value.value, buf)
+
+
+
+class MimePart:
+
+    def __init__(self, index, parent, headers, mime_type, charset, transfer_encoding, is_attachment, filename, offset, length):
+        self.index = index
+        self.parent = parent
+        self.headers = headers
+        self.mime_type = mime_type
+        self.charset = charset
+        self.transfer_encoding = transfer_encoding
+        self.is_attachment = is_attachment
+        self.filename = filename
+        self.offset = offset
+        self.length = length
+
+    def __str__(self):
+        return "MimePart(index={}, parent={}, headers={}, mime_type={}, charset={}, transfer_encoding={}, is_attachment={}, filename={}, offset={}, length={})".format(self.index, self.parent, self.headers, self.mime_type, self.charset, self.transfer_encoding, self.is_attachment, self.filename, self.offset, self.length)
+
+    def __eq__(self, other):
+        if self.index != other.index:
+            return False
+        if self.parent != other.parent:
+            return False
+        if self.headers != other.headers:
+            return False
+        if self.mime_type != other.mime_type:
+            return False
+        if self.charset != other.charset:
+            return False
+        if self.transfer_encoding != other.transfer_encoding:
+            return False
+        if self.is_attachment != other.is_attachment:
+            return False
+        if self.filename != other.filename:
+            return False
+        if self.offset != other.offset:
+            return False
+        if self.length != other.length:
+            return False
+        return True
+
+class FfiConverterTypeMimePart(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return MimePart(
+            index=FfiConverterUInt32.read(buf),
+            parent=FfiConverterOptionalUInt32.read(buf),
+            headers=FfiConverterSequenceTypeMimeHeader.read(buf),
+            mime_type=FfiConverterString.read(buf),
+            charset=FfiConverterString.read(buf),
+            transfer_encoding=FfiConverterString.read(buf),
+            is_attachment=FfiConverterBool.read(buf),
+            filename=FfiConverterOptionalString.read(buf),
+            offset=FfiConverterUInt64.read(buf),
+            length=FfiConverterUInt64.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterUInt32.write(value.index, buf)
+        FfiConverterOptionalUInt32.write(value.parent, buf)
+        FfiConverterSequenceTypeMimeHeader.write(value.headers, buf)
+        FfiConverterString.write(value.mime_type, buf)
+        FfiConverterString.write(value.charset, buf)
+        FfiConverterString.write(value.transfer_encoding, buf)
+        FfiConverterBool.write(value.is_attachment, buf)
+        FfiConverterOptionalString.write(value.filename, buf)
+        FfiConverterUInt64.write(value.offset, buf)
+        FfiConverterUInt64.write(value.length, buf)
+
+
+class OperationStats:
+
+    def __init__(self, operation, calls, failures, retries, bytes_sent, bytes_received, latency, phases):
+        self.operation = operation
+        self.calls = calls
+        self.failures = failures
+        self.retries = retries
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.latency = latency
+        self.phases = phases
+
+    def __str__(self):
+        return "OperationStats(operation={}, calls={}, failures={}, retries={}, bytes_sent={}, bytes_received={}, latency={}, phases={})".format(self.operation, self.calls, self.failures, self.retries, self.bytes_sent, self.bytes_received, self.latency, self.phases)
+
+    def __eq__(self, other):
+        if self.operation != other.operation:
+            return False
+        if self.calls != other.calls:
+            return False
+        if self.failures != other.failures:
+            return False
+        if self.retries != other.retries:
+            return False
+        if self.bytes_sent != other.bytes_sent:
+            return False
+        if self.bytes_received != other.bytes_received:
+            return False
+        if self.latency != other.latency:
+            return False
+        if self.phases != other.phases:
+            return False
+        return True
+
+class FfiConverterTypeOperationStats(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return OperationStats(
+            operation=FfiConverterString.read(buf),
+            calls=FfiConverterUInt64.read(buf),
+            failures=FfiConverterUInt64.read(buf),
+            retries=FfiConverterUInt64.read(buf),
+            bytes_sent=FfiConverterUInt64.read(buf),
+            bytes_received=FfiConverterUInt64.read(buf),
+            latency=FfiConverterTypeLatencyHistogram.read(buf),
+            phases=FfiConverterSequenceTypePhaseLatency.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterString.write(value.operation, buf)
+        FfiConverterUInt64.write(value.calls, buf)
+        FfiConverterUInt64.write(value.failures, buf)
+        FfiConverterUInt64.write(value.retries, buf)
+        FfiConverterUInt64.write(value.bytes_sent, buf)
+        FfiConverterUInt64.write(value.bytes_received, buf)
+        FfiConverterTypeLatencyHistogram.write(value.latency, buf)
+        FfiConverterSequenceTypePhaseLatency.write(value.phases, buf)
+
+
+class OutgoingEmail:
+
+    def __init__(self, headers, plain_text_body, html_body):
+        self.headers = headers
+        self.plain_text_body = plain_text_body
+        self.html_body = html_body
+
+    def __str__(self):
+        return "OutgoingEmail(headers={}, plain_text_body={}, html_body={})".format(self.headers, self.plain_text_body, self.html_body)
+
+    def __eq__(self, other):
+        if self.headers != other.headers:
+            return False
+        if self.plain_text_body != other.plain_text_body:
+            return False
+        if self.html_body != other.html_body:
+            return False
+        return True
+
+class FfiConverterTypeOutgoingEmail(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return OutgoingEmail(
+            headers=FfiConverterMapStringString.read(buf),
+            plain_text_body=FfiConverterString.read(buf),
+            html_body=FfiConverterOptionalString.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterMapStringString.write(value.headers, buf)
+        FfiConverterString.write(value.plain_text_body, buf)
+        FfiConverterOptionalString.write(value.html_body, buf)
+
+
+class PhaseLatency:
+
+    def __init__(self, phase, latency):
+        self.phase = phase
+        self.latency = latency
+
+    def __str__(self):
+        return "PhaseLatency(phase={}, latency={})".format(self.phase, self.latency)
+
+    def __eq__(self, other):
+        if self.phase != other.phase:
+            return False
+        if self.latency != other.latency:
+            return False
+        return True
+
+class FfiConverterTypePhaseLatency(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return PhaseLatency(
+            phase=FfiConverterTypeMetricsPhase.read(buf),
+            latency=FfiConverterTypeLatencyHistogram.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterTypeMetricsPhase.write(value.phase, buf)
+        FfiConverterTypeLatencyHistogram.write(value.latency, buf)
+
+
+class SmtpResponse:
+
+    def __init__(self, severity, category, detail, message):
+        self.severity = severity
+        self.category = category
+        self.detail = detail
+        self.message = message
+
+    def __str__(self):
+        return "SmtpResponse(severity={}, category={}, detail={}, message={})".format(self.severity, self.category, self.detail, self.message)
+
+    def __eq__(self, other):
+        if self.severity != other.severity:
+            return False
+        if self.category != other.category:
+            return False
+        if self.detail != other.detail:
+            return False
+        if self.message != other.message:
+            return False
+        return True
+
+class FfiConverterTypeSmtpResponse(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return SmtpResponse(
+            severity=FfiConverterUInt8.read(buf),
+            category=FfiConverterUInt8.read(buf),
+            detail=FfiConverterUInt8.read(buf),
+            message=FfiConverterString.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterUInt8.write(value.severity, buf)
+        FfiConverterUInt8.write(value.category, buf)
+        FfiConverterUInt8.write(value.detail, buf)
+        FfiConverterString.write(value.message, buf)
+
+
+class StringColumn:
+
+    def __init__(self, offsets, data, present):
+        self.offsets = offsets
+        self.data = data
+        self.present = present
+
+    def __str__(self):
+        return "StringColumn(offsets={}, data={}, present={})".format(self.offsets, self.data, self.present)
+
+    def __eq__(self, other):
+        if self.offsets != other.offsets:
+            return False
+        if self.data != other.data:
+            return False
+        if self.present != other.present:
+            return False
+        return True
+
+class FfiConverterTypeStringColumn(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return StringColumn(
+            offsets=FfiConverterSequenceUInt8.read(buf),
+            data=FfiConverterSequenceUInt8.read(buf),
+            present=FfiConverterSequenceUInt8.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterSequenceUInt8.write(value.offsets, buf)
+        FfiConverterSequenceUInt8.write(value.data, buf)
+        FfiConverterSequenceUInt8.write(value.present, buf)
+
+
+class SummaryColumns:
+
+    def __init__(self, count, message, uid, size, internal_date, flags, date, subject, from_name, from_address, to_addresses, message_id, in_reply_to, headers):
+        self.count = count
+        self.message = message
+        self.uid = uid
+        self.size = size
+        self.internal_date = internal_date
+        self.flags = flags
+        self.date = date
+        self.subject = subject
+        self.from_name = from_name
+        self.from_address = from_address
+        self.to_addresses = to_addresses
+        self.message_id = message_id
+        self.in_reply_to = in_reply_to
+        self.headers = headers
+
+    def __str__(self):
+        return "SummaryColumns(count={}, message={}, uid={}, size={}, internal_date={}, flags={}, date={}, subject={}, from_name={}, from_address={}, to_addresses={}, message_id={}, in_reply_to={}, headers={})".format(self.count, self.message, self.uid, self.size, self.internal_date, self.flags, self.date, self.subject, self.from_name, self.from_address, self.to_addresses, self.message_id, self.in_reply_to, self.headers)
+
+    def __eq__(self, other):
+        if self.count != other.count:
+            return False
+        if self.message != other.message:
+            return False
+        if self.uid != other.uid:
+            return False
+        if self.size != other.size:
+            return False
+        if self.internal_date != other.internal_date:
+            return False
+        if self.flags != other.flags:
+            return False
+        if self.date != other.date:
+            return False
+        if self.subject != other.subject:
+            return False
+        if self.from_name != other.from_name:
+            return False
+        if self.from_address != other.from_address:
+            return False
+        if self.to_addresses != other.to_addresses:
+            return False
+        if self.message_id != other.message_id:
+            return False
+        if self.in_reply_to != other.in_reply_to:
+            return False
+        if self.headers != other.headers:
+            return False
+        return True
+
+class FfiConverterTypeSummaryColumns(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return SummaryColumns(
+            count=FfiConverterUInt32.read(buf),
+            message=FfiConverterTypeU32Column.read(buf),
+            uid=FfiConverterTypeU32Column.read(buf),
+            size=FfiConverterTypeU32Column.read(buf),
+            internal_date=FfiConverterTypeI64Column.read(buf),
+            flags=FfiConverterTypeStringColumn.read(buf),
+            date=FfiConverterTypeStringColumn.read(buf),
+            subject=FfiConverterTypeStringColumn.read(buf),
+            from_name=FfiConverterTypeStringColumn.read(buf),
+            from_address=FfiConverterTypeStringColumn.read(buf),
+            to_addresses=FfiConverterTypeStringColumn.read(buf),
+            message_id=FfiConverterTypeStringColumn.read(buf),
+            in_reply_to=FfiConverterTypeStringColumn.read(buf),
+            headers=FfiConverterMapStringTypeStringColumn.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterUInt32.write(value.count, buf)
+        FfiConverterTypeU32Column.write(value.message, buf)
+        FfiConverterTypeU32Column.write(value.uid, buf)
+        FfiConverterTypeU32Column.write(value.size, buf)
+        FfiConverterTypeI64Column.write(value.internal_date, buf)
+        FfiConverterTypeStringColumn.write(value.flags, buf)
+        FfiConverterTypeStringColumn.write(value.date, buf)
+        FfiConverterTypeStringColumn.write(value.subject, buf)
+        FfiConverterTypeStringColumn.write(value.from_name, buf)
+        FfiConverterTypeStringColumn.write(value.from_address, buf)
+        FfiConverterTypeStringColumn.write(value.to_addresses, buf)
+        FfiConverterTypeStringColumn.write(value.message_id, buf)
+        FfiConverterTypeStringColumn.write(value.in_reply_to, buf)
+        FfiConverterMapStringTypeStringColumn.write(value.headers, buf)
+
+
+class SweepAccount:
+
+    def __init__(self, domain, port, username, password, uid_next, flag_sync_state):
+        self.domain = domain
+        self.port = port
+        self.username = username
+        self.password = password
+        self.uid_next = uid_next
+        self.flag_sync_state = flag_sync_state
+
+    def __str__(self):
+        return "SweepAccount(domain={}, port={}, username={}, password={}, uid_next={}, flag_sync_state={})".format(self.domain, self.port, self.username, self.password, self.uid_next, self.flag_sync_state)
+
+    def __eq__(self, other):
+        if self.domain != other.domain:
+            return False
+        if self.port != other.port:
+            return False
+        if self.username != other.username:
+            return False
+        if self.password != other.password:
+            return False
+        if self.uid_next != other.uid_next:
+            return False
+        if self.flag_sync_state != other.flag_sync_state:
+            return False
+        return True
+
+class FfiConverterTypeSweepAccount(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return SweepAccount(
+            domain=FfiConverterString.read(buf),
+            port=FfiConverterUInt16.read(buf),
+            username=FfiConverterString.read(buf),
+            password=FfiConverterString.read(buf),
+            uid_next=FfiConverterUInt32.read(buf),
+            flag_sync_state=FfiConverterOptionalTypeFlagSyncState.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterString.write(value.domain, buf)
+        FfiConverterUInt16.write(value.port, buf)
+        FfiConverterString.write(value.username, buf)
+        FfiConverterString.write(value.password, buf)
+        FfiConverterUInt32.write(value.uid_next, buf)
+        FfiConverterOptionalTypeFlagSyncState.write(value.flag_sync_state, buf)
+
+
+
+class SweepResult:
+
+    def __init__(self, index, error, error_message, mailbox, summaries, flag_sync):
+        self.index = index
+        self.error = error
+        self.error_message = error_message
+        self.mailbox = mailbox
+        self.summaries = summaries
+        self.flag_sync = flag_sync
+
+    def __str__(self):
+        return "SweepResult(index={}, error={}, error_message={}, mailbox={}, summaries={}, flag_sync={})".format(self.index, self.error, self.error_message, self.mailbox, self.summaries, self.flag_sync)
+
+    def __eq__(self, other):
+        if self.index != other.index:
+            return False
+        if self.error != other.error:
+            return False
+        if self.error_message != other.error_message:
+            return False
+        if self.mailbox != other.mailbox:
+            return False
+        if self.summaries != other.summaries:
+            return False
+        if self.flag_sync != other.flag_sync:
+            return False
+        return True
+
+class FfiConverterTypeSweepResult(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return SweepResult(
+            index=FfiConverterUInt32.read(buf),
+            error=FfiConverterOptionalString.read(buf),
+            error_message=FfiConverterOptionalString.read(buf),
+            mailbox=FfiConverterOptionalTypeMailboxInfo.read(buf),
+            summaries=FfiConverterOptionalSequenceTypeMessageSummary.read(buf),
+            flag_sync=FfiConverterOptionalTypeFlagSync.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterUInt32.write(value.index, buf)
+        FfiConverterOptionalString.write(value.error, buf)
+        FfiConverterOptionalString.write(value.error_message, buf)
+        FfiConverterOptionalTypeMailboxInfo.write(value.mailbox, buf)
+        FfiConverterOptionalSequenceTypeMessageSummary.write(value.summaries, buf)
+        FfiConverterOptionalTypeFlagSync.write(value.flag_sync, buf)
+
+
+
+class SweepTask:
+
+    def __init__(self, kind, mailbox, header_fields):
+        self.kind = kind
+        self.mailbox = mailbox
+        self.header_fields = header_fields
+
+    def __str__(self):
+        return "SweepTask(kind={}, mailbox={}, header_fields={})".format(self.kind, self.mailbox, self.header_fields)
+
+    def __eq__(self, other):
+        if self.kind != other.kind:
+            return False
+        if self.mailbox != other.mailbox:
+            return False
+        if self.header_fields != other.header_fields:
+            return False
+        return True
+
+class FfiConverterTypeSweepTask(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return SweepTask(
+            kind=FfiConverterTypeSweepKind.read(buf),
+            mailbox=FfiConverterString.read(buf),
+            header_fields=FfiConverterSequenceString.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterTypeSweepKind.write(value.kind, buf)
+        FfiConverterString.write(value.mailbox, buf)
+        FfiConverterSequenceString.write(value.header_fields, buf)
+
+
+class TlsOptions:
+
+    def __init__(self, min_protocol_version, root_certificates_pem):
+        self.min_protocol_version = min_protocol_version
+        self.root_certificates_pem = root_certificates_pem
+
+    def __str__(self):
+        return "TlsOptions(min_protocol_version={}, root_certificates_pem={})".format(self.min_protocol_version, self.root_certificates_pem)
+
+    def __eq__(self, other):
+        if self.min_protocol_version != other.min_protocol_version:
+            return False
+        if self.root_certificates_pem != other.root_certificates_pem:
+            return False
+        return True
+
+class FfiConverterTypeTlsOptions(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return TlsOptions(
+            min_protocol_version=FfiConverterOptionalString.read(buf),
+            root_certificates_pem=FfiConverterSequenceString.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterOptionalString.write(value.min_protocol_version, buf)
+        FfiConverterSequenceString.write(value.root_certificates_pem, buf)
+
+
+class U32Column:
+
+    def __init__(self, values, present):
+        self.values = values
+        self.present = present
+
+    def __str__(self):
+        return "U32Column(values={}, present={})".format(self.values, self.present)
+
+    def __eq__(self, other):
+        if self.values != other.values:
+            return False
+        if self.present != other.present:
+            return False
+        return True
+
+class FfiConverterTypeU32Column(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        return U32Column(
+            values=FfiConverterSequenceUInt8.read(buf),
+            present=FfiConverterSequenceUInt8.read(buf),
+        )
+
+    @staticmethod
+    def write(value, buf):
+        FfiConverterSequenceUInt8.write(value.values, buf)
+        FfiConverterSequenceUInt8.write(value.present, buf)
+
+
+
+# ImapError
+# We want to define each variant as a nested class that's also a subclass,
+# which is tricky in Python.  To accomplish this we're going to create each
+# class separated, then manually add the child classes to the base class's
+# __dict__.  All of this happens in dummy class to avoid polluting the module
+# namespace.
+class UniFFIExceptionTmpNamespace:
+    class ImapError(Exception):
+        pass
+    
+    class IoError(ImapError):
+        def __str__(self):
+            return "ImapError.IoError({})".format(repr(super().__str__()))
+
+    ImapError.IoError = IoError
+    class TlsHandshakeError(ImapError):
+        def __str__(self):
+            return "ImapError.TlsHandshakeError({})".format(repr(super().__str__()))
+
+    ImapError.TlsHandshakeError = TlsHandshakeError
+    class TlsError(ImapError):
+        def __str__(self):
+            return "ImapError.TlsError({})".format(repr(super().__str__()))
+
+    ImapError.TlsError = TlsError
+    class BadResponse(ImapError):
+        def __str__(self):
+            return "ImapError.BadResponse({})".format(repr(super().__str__()))
+
+    ImapError.BadResponse = BadResponse
+    class NoResponse(ImapError):
+        def __str__(self):
+            return "ImapError.NoResponse({})".format(repr(super().__str__()))
+
+    ImapError.NoResponse = NoResponse
+    class ConnectionLost(ImapError):
+        def __str__(self):
+            return "ImapError.ConnectionLost({})".format(repr(super().__str__()))
+
+    ImapError.ConnectionLost = ConnectionLost
+    class ParseError(ImapError):
+        def __str__(self):
+            return "ImapError.ParseError({})".format(repr(super().__str__()))
+
+    ImapError.ParseError = ParseError
+    class ValidateError(ImapError):
+        def __str__(self):
+            return "ImapError.ValidateError({})".format(repr(super().__str__()))
+
+    ImapError.ValidateError = ValidateError
+    class AppendError(ImapError):
+        def __str__(self):
+            return "ImapError.AppendError({})".format(repr(super().__str__()))
+
+    ImapError.AppendError = AppendError
+    class Nonexhaustive(ImapError):
+        def __str__(self):
+            return "ImapError.Nonexhaustive({})".format(repr(super().__str__()))
+
+    ImapError.Nonexhaustive = Nonexhaustive
+ImapError = UniFFIExceptionTmpNamespace.ImapError
+del UniFFIExceptionTmpNamespace
+
+
+class MailboxEventKind(enum.Enum):
+    EXISTS = 1
+    
+    RECENT = 2
+    
+    EXPUNGE = 3
+    
+    FETCH = 4
+    
+
+
+class FfiConverterTypeMailboxEventKind(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        variant = buf.readI32()
+        if variant == 1:
+            return MailboxEventKind.EXISTS
+        if variant == 2:
+            return MailboxEventKind.RECENT
+        if variant == 3:
+            return MailboxEventKind.EXPUNGE
+        if variant == 4:
+            return MailboxEventKind.FETCH
+        raise InternalError("Raw enum value doesn't match any cases")
+
+    def write(value, buf):
+        if value == MailboxEventKind.EXISTS:
+            buf.writeI32(1)
+        if value == MailboxEventKind.RECENT:
+            buf.writeI32(2)
+        if value == MailboxEventKind.EXPUNGE:
+            buf.writeI32(3)
+        if value == MailboxEventKind.FETCH:
+            buf.writeI32(4)
+
+
+class SweepKind(enum.Enum):
+    CHECK = 1
+    
+    FETCH_NEW = 2
+    
+    SYNC_FLAGS = 3
+    
+
+
+class FfiConverterTypeSweepKind(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        variant = buf.readI32()
+        if variant == 1:
+            return SweepKind.CHECK
+        if variant == 2:
+            return SweepKind.FETCH_NEW
+        if variant == 3:
+            return SweepKind.SYNC_FLAGS
+        raise InternalError("Raw enum value doesn't match any cases")
+
+    def write(value, buf):
+        if value == SweepKind.CHECK:
+            buf.writeI32(1)
+        if value == SweepKind.FETCH_NEW:
+            buf.writeI32(2)
+        if value == SweepKind.SYNC_FLAGS:
+            buf.writeI32(3)
+
+
+class MetricsPhase(enum.Enum):
+    DNS = 1
+    
+    TCP_CONNECT = 2
+    
+    TLS_HANDSHAKE = 3
+    
+    GREETING = 4
+    
+    AUTHENTICATE = 5
+    
+    CONNECT = 6
+    
+    SELECT = 7
+    
+    FETCH = 8
+    
+    SEARCH = 9
+    
+    SEND = 10
+    
+    LOGOUT = 11
+    
+    COMPRESS = 12
+    
+
+
+class FfiConverterTypeMetricsPhase(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        variant = buf.readI32()
+        if variant == 1:
+            return MetricsPhase.DNS
+        if variant == 2:
+            return MetricsPhase.TCP_CONNECT
+        if variant == 3:
+            return MetricsPhase.TLS_HANDSHAKE
+        if variant == 4:
+            return MetricsPhase.GREETING
+        if variant == 5:
+            return MetricsPhase.AUTHENTICATE
+        if variant == 6:
+            return MetricsPhase.CONNECT
+        if variant == 7:
+            return MetricsPhase.SELECT
+        if variant == 8:
+            return MetricsPhase.FETCH
+        if variant == 9:
+            return MetricsPhase.SEARCH
+        if variant == 10:
+            return MetricsPhase.SEND
+        if variant == 11:
+            return MetricsPhase.LOGOUT
+        if variant == 12:
+            return MetricsPhase.COMPRESS
+        raise InternalError("Raw enum value doesn't match any cases")
+
+    def write(value, buf):
+        if value == MetricsPhase.DNS:
+            buf.writeI32(1)
+        if value == MetricsPhase.TCP_CONNECT:
+            buf.writeI32(2)
+        if value == MetricsPhase.TLS_HANDSHAKE:
+            buf.writeI32(3)
+        if value == MetricsPhase.GREETING:
+            buf.writeI32(4)
+        if value == MetricsPhase.AUTHENTICATE:
+            buf.writeI32(5)
+        if value == MetricsPhase.CONNECT:
+            buf.writeI32(6)
+        if value == MetricsPhase.SELECT:
+            buf.writeI32(7)
+        if value == MetricsPhase.FETCH:
+            buf.writeI32(8)
+        if value == MetricsPhase.SEARCH:
+            buf.writeI32(9)
+        if value == MetricsPhase.SEND:
+            buf.writeI32(10)
+        if value == MetricsPhase.LOGOUT:
+            buf.writeI32(11)
+        if value == MetricsPhase.COMPRESS:
+            buf.writeI32(12)
+
+
+class FfiConverterTypeImapError(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        variant = buf.readI32()
+        if variant == 1:
+            return ImapError.IoError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 2:
+            return ImapError.TlsHandshakeError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 3:
+            return ImapError.TlsError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 4:
+            return ImapError.BadResponse(
+                FfiConverterString.read(buf),
+            )
+        if variant == 5:
+            return ImapError.NoResponse(
+                FfiConverterString.read(buf),
+            )
+        if variant == 6:
+            return ImapError.ConnectionLost(
+                FfiConverterString.read(buf),
+            )
+        if variant == 7:
+            return ImapError.ParseError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 8:
+            return ImapError.ValidateError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 9:
+            return ImapError.AppendError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 10:
+            return ImapError.Nonexhaustive(
+                FfiConverterString.read(buf),
+            )
+        raise InternalError("Raw enum value doesn't match any cases")
+
+    @staticmethod
+    def write(value, buf):
+        if isinstance(value, ImapError.IoError):
+            buf.writeI32(1)
+        if isinstance(value, ImapError.TlsHandshakeError):
+            buf.writeI32(2)
+        if isinstance(value, ImapError.TlsError):
+            buf.writeI32(3)
+        if isinstance(value, ImapError.BadResponse):
+            buf.writeI32(4)
+        if isinstance(value, ImapError.NoResponse):
+            buf.writeI32(5)
+        if isinstance(value, ImapError.ConnectionLost):
+            buf.writeI32(6)
+        if isinstance(value, ImapError.ParseError):
+            buf.writeI32(7)
+        if isinstance(value, ImapError.ValidateError):
+            buf.writeI32(8)
+        if isinstance(value, ImapError.AppendError):
+            buf.writeI32(9)
+        if isinstance(value, ImapError.Nonexhaustive):
+            buf.writeI32(10)
+
+
+
+# SmtpError
+# We want to define each variant as a nested class that's also a subclass,
+# which is tricky in Python.  To accomplish this we're going to create each
+# class separated, then manually add the child classes to the base class's
+# __dict__.  All of this happens in dummy class to avoid polluting the module
+# namespace.
+class UniFFIExceptionTmpNamespace:
+    class SmtpError(Exception):
+        pass
+    
+    class TransientSmtpError(SmtpError):
+        def __str__(self):
+            return "SmtpError.TransientSmtpError({})".format(repr(super().__str__()))
+
+    SmtpError.TransientSmtpError = TransientSmtpError
+    class PermanentSmtpError(SmtpError):
+        def __str__(self):
+            return "SmtpError.PermanentSmtpError({})".format(repr(super().__str__()))
 
     SmtpError.PermanentSmtpError = PermanentSmtpError
     class ResponseParseError(SmtpError):
         def __str__(self):
             return "SmtpError.ResponseParseError({})".format(repr(super().__str__()))
 
-    SmtpError.ResponseParseError = ResponseParseError
-    class InternalClientError(SmtpError):
-        def __str__(self):
-            return "SmtpError.InternalClientError({})".format(repr(super().__str__()))
+    SmtpError.ResponseParseError = ResponseParseError
+    class InternalClientError(SmtpError):
+        def __str__(self):
+            return "SmtpError.InternalClientError({})".format(repr(super().__str__()))
+
+    SmtpError.InternalClientError = InternalClientError
+    class ConnectionError(SmtpError):
+        def __str__(self):
+            return "SmtpError.ConnectionError({})".format(repr(super().__str__()))
+
+    SmtpError.ConnectionError = ConnectionError
+    class NetworkError(SmtpError):
+        def __str__(self):
+            return "SmtpError.NetworkError({})".format(repr(super().__str__()))
+
+    SmtpError.NetworkError = NetworkError
+    class TlsError(SmtpError):
+        def __str__(self):
+            return "SmtpError.TlsError({})".format(repr(super().__str__()))
+
+    SmtpError.TlsError = TlsError
+    class Timeout(SmtpError):
+        def __str__(self):
+            return "SmtpError.Timeout({})".format(repr(super().__str__()))
+
+    SmtpError.Timeout = Timeout
+    class OtherError(SmtpError):
+        def __str__(self):
+            return "SmtpError.OtherError({})".format(repr(super().__str__()))
+
+    SmtpError.OtherError = OtherError
+    class MessageBodyError(SmtpError):
+        def __str__(self):
+            return "SmtpError.MessageBodyError({})".format(repr(super().__str__()))
+
+    SmtpError.MessageBodyError = MessageBodyError
+    class UnsupportedAuthMechanism(SmtpError):
+        def __str__(self):
+            return "SmtpError.UnsupportedAuthMechanism({})".format(repr(super().__str__()))
+
+    SmtpError.UnsupportedAuthMechanism = UnsupportedAuthMechanism
+SmtpError = UniFFIExceptionTmpNamespace.SmtpError
+del UniFFIExceptionTmpNamespace
+
+
+class FfiConverterTypeSmtpError(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        variant = buf.readI32()
+        if variant == 1:
+            return SmtpError.TransientSmtpError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 2:
+            return SmtpError.PermanentSmtpError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 3:
+            return SmtpError.ResponseParseError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 4:
+            return SmtpError.InternalClientError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 5:
+            return SmtpError.ConnectionError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 6:
+            return SmtpError.NetworkError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 7:
+            return SmtpError.TlsError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 8:
+            return SmtpError.Timeout(
+                FfiConverterString.read(buf),
+            )
+        if variant == 9:
+            return SmtpError.OtherError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 10:
+            return SmtpError.MessageBodyError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 11:
+            return SmtpError.UnsupportedAuthMechanism(
+                FfiConverterString.read(buf),
+            )
+        raise InternalError("Raw enum value doesn't match any cases")
+
+    @staticmethod
+    def write(value, buf):
+        if isinstance(value, SmtpError.TransientSmtpError):
+            buf.writeI32(1)
+        if isinstance(value, SmtpError.PermanentSmtpError):
+            buf.writeI32(2)
+        if isinstance(value, SmtpError.ResponseParseError):
+            buf.writeI32(3)
+        if isinstance(value, SmtpError.InternalClientError):
+            buf.writeI32(4)
+        if isinstance(value, SmtpError.ConnectionError):
+            buf.writeI32(5)
+        if isinstance(value, SmtpError.NetworkError):
+            buf.writeI32(6)
+        if isinstance(value, SmtpError.TlsError):
+            buf.writeI32(7)
+        if isinstance(value, SmtpError.Timeout):
+            buf.writeI32(8)
+        if isinstance(value, SmtpError.OtherError):
+            buf.writeI32(9)
+        if isinstance(value, SmtpError.MessageBodyError):
+            buf.writeI32(10)
+        if isinstance(value, SmtpError.UnsupportedAuthMechanism):
+            buf.writeI32(11)
+
+
+
+# TlsConfigError
+# We want to define each variant as a nested class that's also a subclass,
+# which is tricky in Python.  To accomplish this we're going to create each
+# class separated, then manually add the child classes to the base class's
+# __dict__.  All of this happens in dummy class to avoid polluting the module
+# namespace.
+class UniFFIExceptionTmpNamespace:
+    class TlsConfigError(Exception):
+        pass
+    
+    class InvalidProtocolVersion(TlsConfigError):
+        def __str__(self):
+            return "TlsConfigError.InvalidProtocolVersion({})".format(repr(super().__str__()))
+
+    TlsConfigError.InvalidProtocolVersion = InvalidProtocolVersion
+    class InvalidCertificate(TlsConfigError):
+        def __str__(self):
+            return "TlsConfigError.InvalidCertificate({})".format(repr(super().__str__()))
+
+    TlsConfigError.InvalidCertificate = InvalidCertificate
+    class BackendError(TlsConfigError):
+        def __str__(self):
+            return "TlsConfigError.BackendError({})".format(repr(super().__str__()))
+
+    TlsConfigError.BackendError = BackendError
+TlsConfigError = UniFFIExceptionTmpNamespace.TlsConfigError
+del UniFFIExceptionTmpNamespace
+
+
+class FfiConverterTypeTlsConfigError(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        variant = buf.readI32()
+        if variant == 1:
+            return TlsConfigError.InvalidProtocolVersion(
+                FfiConverterString.read(buf),
+            )
+        if variant == 2:
+            return TlsConfigError.InvalidCertificate(
+                FfiConverterString.read(buf),
+            )
+        if variant == 3:
+            return TlsConfigError.BackendError(
+                FfiConverterString.read(buf),
+            )
+        raise InternalError("Raw enum value doesn't match any cases")
+
+    @staticmethod
+    def write(value, buf):
+        if isinstance(value, TlsConfigError.InvalidProtocolVersion):
+            buf.writeI32(1)
+        if isinstance(value, TlsConfigError.InvalidCertificate):
+            buf.writeI32(2)
+        if isinstance(value, TlsConfigError.BackendError):
+            buf.writeI32(3)
+
+
+
+# MimeError
+# We want to define each variant as a nested class that's also a subclass,
+# which is tricky in Python.  To accomplish this we're going to create each
+# class separated, then manually add the child classes to the base class's
+# __dict__.  All of this happens in dummy class to avoid polluting the module
+# namespace.
+class UniFFIExceptionTmpNamespace:
+    class MimeError(Exception):
+        pass
+    
+    class ParseError(MimeError):
+        def __str__(self):
+            return "MimeError.ParseError({})".format(repr(super().__str__()))
+
+    MimeError.ParseError = ParseError
+    class NoSuchPart(MimeError):
+        def __str__(self):
+            return "MimeError.NoSuchPart({})".format(repr(super().__str__()))
+
+    MimeError.NoSuchPart = NoSuchPart
+MimeError = UniFFIExceptionTmpNamespace.MimeError
+del UniFFIExceptionTmpNamespace
+
+
+class FfiConverterTypeMimeError(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        variant = buf.readI32()
+        if variant == 1:
+            return MimeError.ParseError(
+                FfiConverterString.read(buf),
+            )
+        if variant == 2:
+            return MimeError.NoSuchPart(
+                FfiConverterString.read(buf),
+            )
+        raise InternalError("Raw enum value doesn't match any cases")
+
+    @staticmethod
+    def write(value, buf):
+        if isinstance(value, MimeError.ParseError):
+            buf.writeI32(1)
+        if isinstance(value, MimeError.NoSuchPart):
+            buf.writeI32(2)
+
+
+
+# MessageBodySourceError
+# We want to define each variant as a nested class that's also a subclass,
+# which is tricky in Python.  To accomplish this we're going to create each
+# class separated, then manually add the child classes to the base class's
+# __dict__.  All of this happens in dummy class to avoid polluting the module
+# namespace.
+class UniFFIExceptionTmpNamespace:
+    class MessageBodySourceError(Exception):
+        pass
+    
+    class ReadError(MessageBodySourceError):
+        def __init__(self, message):
+            super().__init__(", ".join([
+                "message={!r}".format(message),
+            ]))
+            self.message = message
+
+        def __str__(self):
+            return "MessageBodySourceError.ReadError({})".format(super().__str__())
+
+    MessageBodySourceError.ReadError = ReadError
+MessageBodySourceError = UniFFIExceptionTmpNamespace.MessageBodySourceError
+del UniFFIExceptionTmpNamespace
+
+
+class FfiConverterTypeMessageBodySourceError(FfiConverterRustBuffer):
+    @staticmethod
+    def read(buf):
+        variant = buf.readI32()
+        if variant == 1:
+            return MessageBodySourceError.ReadError(
+                message=FfiConverterString.read(buf),
+            )
+        raise InternalError("Raw enum value doesn't match any cases")
+
+    @staticmethod
+    def write(value, buf):
+        if isinstance(value, MessageBodySourceError.ReadError):
+            buf.writeI32(1)
+            FfiConverterString.write(value.message, buf)
+
+
+
+
+# Declaration and FfiConverters for CompletionHandler Callback Interface
+
+class CompletionHandler:
+    def on_complete(self, result):
+        raise NotImplementedError
+
+
+
+def py_foreignCallbackCallbackInterfaceCompletionHandler(handle, method, args, buf_ptr):
+    
+    def invoke_on_complete(python_callback, args):
+        def makeCall():return python_callback.on_complete(
+                FfiConverterTypeAsyncResult.read(args)
+                )
+
+        def makeCallAndHandleReturn():
+            makeCall()
+            return UNIFFI_CALLBACK_SUCCESS
+        return makeCallAndHandleReturn()
+    
+
+    cb = FfiConverterCallbackInterfaceCompletionHandler.lift(handle)
+    if not cb:
+        raise InternalError("No callback in handlemap; this is a Uniffi bug")
+
+    if method == IDX_CALLBACK_FREE:
+        FfiConverterCallbackInterfaceCompletionHandler.drop(handle)
+        # Successfull return
+        # See docs of ForeignCallback in `uniffi/src/ffi/foreigncallbacks.rs`
+        return UNIFFI_CALLBACK_SUCCESS
+
+    if method == 1:
+        # Call the method and handle any errors
+        # See docs of ForeignCallback in `uniffi/src/ffi/foreigncallbacks.rs` for details
+        try:
+            with args.consumeWithStream() as buf:
+                return invoke_on_complete(cb, buf)
+        except BaseException as e:
+            # Catch unexpected errors
+            try:
+                # Try to serialize the exception into a String
+                buf_ptr[0] = FfiConverterString.lower(repr(e))
+            except:
+                # If that fails, just give up
+                pass
+            return UNIFFI_CALLBACK_UNEXPECTED_ERROR
+    
+
+    # This should never happen, because an out of bounds method index won't
+    # ever be used. Once we can catch errors, we should return an InternalException.
+    # https://github.com/mozilla/uniffi-rs/issues/351
+
+    # An unexpected error happened.
+    # See docs of ForeignCallback in `uniffi/src/ffi/foreigncallbacks.rs`
+    return UNIFFI_CALLBACK_UNEXPECTED_ERROR
+
+# We need to keep this function reference alive:
+# if they get GC'd while in use then UniFFI internals could attempt to call a function
+# that is in freed memory.
+# That would be...uh...bad. Yeah, that's the word. Bad.
+foreignCallbackCallbackInterfaceCompletionHandler = FOREIGN_CALLBACK_T(py_foreignCallbackCallbackInterfaceCompletionHandler)
+_UniFFILib.onLoad(lambda lib: rust_call(lambda err: lib.ffi_rust_lib_CompletionHandler_init_callback(foreignCallbackCallbackInterfaceCompletionHandler, err)))
+
+# The FfiConverter which transforms the Callbacks in to Handles to pass to Rust.
+FfiConverterCallbackInterfaceCompletionHandler = FfiConverterCallbackInterface(foreignCallbackCallbackInterfaceCompletionHandler)
+
+
+
+# Declaration and FfiConverters for DownloadProgress Callback Interface
+
+class DownloadProgress:
+    def on_progress(self, downloaded, size):
+        raise NotImplementedError
+
+
+
+def py_foreignCallbackCallbackInterfaceDownloadProgress(handle, method, args, buf_ptr):
+    
+    def invoke_on_progress(python_callback, args):
+        def makeCall():return python_callback.on_progress(
+                FfiConverterUInt64.read(args), 
+                FfiConverterUInt64.read(args)
+                )
+
+        def makeCallAndHandleReturn():
+            makeCall()
+            return UNIFFI_CALLBACK_SUCCESS
+        return makeCallAndHandleReturn()
+    
+
+    cb = FfiConverterCallbackInterfaceDownloadProgress.lift(handle)
+    if not cb:
+        raise InternalError("No callback in handlemap; this is a Uniffi bug")
+
+    if method == IDX_CALLBACK_FREE:
+        FfiConverterCallbackInterfaceDownloadProgress.drop(handle)
+        # Successfull return
+        # See docs of ForeignCallback in `uniffi/src/ffi/foreigncallbacks.rs`
+        return UNIFFI_CALLBACK_SUCCESS
+
+    if method == 1:
+        # Call the method and handle any errors
+        # See docs of ForeignCallback in `uniffi/src/ffi/foreigncallbacks.rs` for details
+        try:
+            with args.consumeWithStream() as buf:
+                return invoke_on_progress(cb, buf)
+        except BaseException as e:
+            # Catch unexpected errors
+            try:
+                # Try to serialize the exception into a String
+                buf_ptr[0] = FfiConverterString.lower(repr(e))
+            except:
+                # If that fails, just give up
+                pass
+            return UNIFFI_CALLBACK_UNEXPECTED_ERROR
+    
+
+    # This should never happen, because an out of bounds method index won't
+    # ever be used. Once we can catch errors, we should return an InternalException.
+    # https://github.com/mozilla/uniffi-rs/issues/351
+
+    # An unexpected error happened.
+    # See docs of ForeignCallback in `uniffi/src/ffi/foreigncallbacks.rs`
+    return UNIFFI_CALLBACK_UNEXPECTED_ERROR
+
+# We need to keep this function reference alive:
+# if they get GC'd while in use then UniFFI internals could attempt to call a function
+# that is in freed memory.
+# That would be...uh...bad. Yeah, that's the word. Bad.
+foreignCallbackCallbackInterfaceDownloadProgress = FOREIGN_CALLBACK_T(py_foreignCallbackCallbackInterfaceDownloadProgress)
+_UniFFILib.onLoad(lambda lib: rust_call(lambda err: lib.ffi_rust_lib_DownloadProgress_init_callback(foreignCallbackCallbackInterfaceDownloadProgress, err)))
+
+# The FfiConverter which transforms the Callbacks in to Handles to pass to Rust.
+FfiConverterCallbackInterfaceDownloadProgress = FfiConverterCallbackInterface(foreignCallbackCallbackInterfaceDownloadProgress)
+
+
+
+# Declaration and FfiConverters for MessageBodySource Callback Interface
+
+class MessageBodySource:
+    def read_chunk(self):
+        raise NotImplementedError
+
+
+
+def py_foreignCallbackCallbackInterfaceMessageBodySource(handle, method, args, buf_ptr):
+    
+    def invoke_read_chunk(python_callback, args):
+        def makeCall():return python_callback.read_chunk(
+                )
+
+        def makeCallAndHandleReturn():
+            rval = makeCall()
+            with RustBuffer.allocWithBuilder() as builder:
+                FfiConverterOptionalSequenceUInt8.write(rval, builder)
+                buf_ptr[0] = builder.finalize()
+            return UNIFFI_CALLBACK_SUCCESS
+        def makeCallAndHandleError():
+            try:
+                return makeCallAndHandleReturn()
+            except MessageBodySourceError as e:
+                # Catch errors declared in the UDL file
+                with RustBuffer.allocWithBuilder() as builder:
+                    FfiConverterTypeMessageBodySourceError.write(e, builder)
+                    buf_ptr[0] = builder.finalize()
+                return UNIFFI_CALLBACK_ERROR
+        return makeCallAndHandleError()
+    
+
+    cb = FfiConverterCallbackInterfaceMessageBodySource.lift(handle)
+    if not cb:
+        raise InternalError("No callback in handlemap; this is a Uniffi bug")
+
+    if method == IDX_CALLBACK_FREE:
+        FfiConverterCallbackInterfaceMessageBodySource.drop(handle)
+        # Successfull return
+        # See docs of ForeignCallback in `uniffi/src/ffi/foreigncallbacks.rs`
+        return UNIFFI_CALLBACK_SUCCESS
+
+    if method == 1:
+        # Call the method and handle any errors
+        # See docs of ForeignCallback in `uniffi/src/ffi/foreigncallbacks.rs` for details
+        try:
+            with args.consumeWithStream() as buf:
+                return invoke_read_chunk(cb, buf)
+        except BaseException as e:
+            # Catch unexpected errors
+            try:
+                # Try to serialize the exception into a String
+                buf_ptr[0] = FfiConverterString.lower(repr(e))
+            except:
+                # If that fails, just give up
+                pass
+            return UNIFFI_CALLBACK_UNEXPECTED_ERROR
+    
+
+    # This should never happen, because an out of bounds method index won't
+    # ever be used. Once we can catch errors, we should return an InternalException.
+    # https://github.com/mozilla/uniffi-rs/issues/351
+
+    # An unexpected error happened.
+    # See docs of ForeignCallback in `uniffi/src/ffi/foreigncallbacks.rs`
+    return UNIFFI_CALLBACK_UNEXPECTED_ERROR
+
+# We need to keep this function reference alive:
+# if they get GC'd while in use then UniFFI internals could attempt to call a function
+# that is in freed memory.
+# That would be...uh...bad. Yeah, that's the word. Bad.
+foreignCallbackCallbackInterfaceMessageBodySource = FOREIGN_CALLBACK_T(py_foreignCallbackCallbackInterfaceMessageBodySource)
+_UniFFILib.onLoad(lambda lib: rust_call(lambda err: lib.ffi_rust_lib_MessageBodySource_init_callback(foreignCallbackCallbackInterfaceMessageBodySource, err)))
+
+# The FfiConverter which transforms the Callbacks in to Handles to pass to Rust.
+FfiConverterCallbackInterfaceMessageBodySource = FfiConverterCallbackInterface(foreignCallbackCallbackInterfaceMessageBodySource)
+
+
+
+# Declaration and FfiConverters for MessageChunkSink Callback Interface
+
+class MessageChunkSink:
+    def write_chunk(self, offset, chunk, size):
+        raise NotImplementedError
+
+
+
+def py_foreignCallbackCallbackInterfaceMessageChunkSink(handle, method, args, buf_ptr):
+    
+    def invoke_write_chunk(python_callback, args):
+        def makeCall():return python_callback.write_chunk(
+                FfiConverterUInt64.read(args), 
+                FfiConverterSequenceUInt8.read(args), 
+                FfiConverterUInt64.read(args)
+                )
+
+        def makeCallAndHandleReturn():
+            makeCall()
+            return UNIFFI_CALLBACK_SUCCESS
+        return makeCallAndHandleReturn()
+    
+
+    cb = FfiConverterCallbackInterfaceMessageChunkSink.lift(handle)
+    if not cb:
+        raise InternalError("No callback in handlemap; this is a Uniffi bug")
+
+    if method == IDX_CALLBACK_FREE:
+        FfiConverterCallbackInterfaceMessageChunkSink.drop(handle)
+        # Successfull return
+        # See docs of ForeignCallback in `uniffi/src/ffi/foreigncallbacks.rs`
+        return UNIFFI_CALLBACK_SUCCESS
+
+    if method == 1:
+        # Call the method and handle any errors
+        # See docs of ForeignCallback in `uniffi/src/ffi/foreigncallbacks.rs` for details
+        try:
+            with args.consumeWithStream() as buf:
+                return invoke_write_chunk(cb, buf)
+        except BaseException as e:
+            # Catch unexpected errors
+            try:
+                # Try to serialize the exception into a String
+                buf_ptr[0] = FfiConverterString.lower(repr(e))
+            except:
+                # If that fails, just give up
+                pass
+            return UNIFFI_CALLBACK_UNEXPECTED_ERROR
+    
+
+    # This should never happen, because an out of bounds method index won't
+    # ever be used. Once we can catch errors, we should return an InternalException.
+    # https://github.com/mozilla/uniffi-rs/issues/351
+
+    # An unexpected error happened.
+    # See docs of ForeignCallback in `uniffi/src/ffi/foreigncallbacks.rs`
+    return UNIFFI_CALLBACK_UNEXPECTED_ERROR
+
+# We need to keep this function reference alive:
+# if they get GC'd while in use then UniFFI internals could attempt to call a function
+# that is in freed memory.
+# That would be...uh...bad. Yeah, that's the word. Bad.
+foreignCallbackCallbackInterfaceMessageChunkSink = FOREIGN_CALLBACK_T(py_foreignCallbackCallbackInterfaceMessageChunkSink)
+_UniFFILib.onLoad(lambda lib: rust_call(lambda err: lib.ffi_rust_lib_MessageChunkSink_init_callback(foreignCallbackCallbackInterfaceMessageChunkSink, err)))
+
+# The FfiConverter which transforms the Callbacks in to Handles to pass to Rust.
+FfiConverterCallbackInterfaceMessageChunkSink = FfiConverterCallbackInterface(foreignCallbackCallbackInterfaceMessageChunkSink)
+
+
+class FfiConverterOptionalUInt32(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterUInt32.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterUInt32.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+
+class FfiConverterOptionalInt64(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterInt64.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterInt64.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+
+class FfiConverterOptionalBool(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterBool.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterBool.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+
+class FfiConverterOptionalString(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterString.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterString.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+
+class FfiConverterOptionalTypeSmtpResponse(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterTypeSmtpResponse.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterTypeSmtpResponse.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+
+class FfiConverterOptionalTypeFlagSyncState(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterTypeFlagSyncState.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterTypeFlagSyncState.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+
+class FfiConverterOptionalTypeMailboxInfo(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterTypeMailboxInfo.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterTypeMailboxInfo.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+class FfiConverterOptionalTypeFlagSync(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterTypeFlagSync.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterTypeFlagSync.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+class FfiConverterOptionalSequenceUInt8(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterSequenceUInt8.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterSequenceUInt8.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+
+class FfiConverterOptionalSequenceUInt32(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterSequenceUInt32.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterSequenceUInt32.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+
+class FfiConverterOptionalSequenceTypeBatchSendResult(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterSequenceTypeBatchSendResult.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterSequenceTypeBatchSendResult.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+
+class FfiConverterOptionalSequenceTypeMailboxEvent(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterSequenceTypeMailboxEvent.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterSequenceTypeMailboxEvent.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+
+class FfiConverterOptionalSequenceTypeImapMessage(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterSequenceTypeImapMessage.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterSequenceTypeImapMessage.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+
+class FfiConverterOptionalSequenceTypeMessageSummary(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterSequenceTypeMessageSummary.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterSequenceTypeMessageSummary.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+class FfiConverterOptionalSequenceTypeSweepResult(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        if value is None:
+            buf.writeU8(0)
+            return
+
+        buf.writeU8(1)
+        FfiConverterSequenceTypeSweepResult.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        flag = buf.readU8()
+        if flag == 0:
+            return None
+        elif flag == 1:
+            return FfiConverterSequenceTypeSweepResult.read(buf)
+        else:
+            raise InternalError("Unexpected flag byte for optional type")
+
+
+class FfiConverterSequenceUInt8(FfiConverterRustBuffer):
+    # A sequence<u8> has the same layout as a bytes object, so it is copied in bulk
+    # rather than element by element, and lifted as `bytes`.
+    @classmethod
+    def write(cls, value, buf):
+        if not isinstance(value, (bytes, bytearray, memoryview)):
+            value = bytes(value)
+        buf.writeI32(len(value))
+        buf.write(value)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return buf.read(count)
+
+
+
+class FfiConverterSequenceUInt32(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterUInt32.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        # unpacked all at once rather than element by element
+        return list(struct.unpack_from(">{}I".format(count), buf._readView(4 * count)))
+
+
+class FfiConverterSequenceUInt64(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterUInt64.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        # unpacked all at once rather than element by element
+        return list(struct.unpack_from(">{}Q".format(count), buf._readView(8 * count)))
+
+
+
+class FfiConverterSequenceString(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterString.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterString.read(buf) for i in range(count)
+        ]
+
+
+
+class FfiConverterSequenceTypeEmailAddress(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypeEmailAddress.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypeEmailAddress.read(buf) for i in range(count)
+        ]
+
+
+
+class FfiConverterSequenceTypeFlagChange(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypeFlagChange.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypeFlagChange.read(buf) for i in range(count)
+        ]
+
+
+
+class FfiConverterSequenceTypeImapMessage(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypeImapMessage.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypeImapMessage.read(buf) for i in range(count)
+        ]
+
+
+
+class FfiConverterSequenceTypeBatchSendResult(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypeBatchSendResult.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypeBatchSendResult.read(buf) for i in range(count)
+        ]
+
+
+
+class FfiConverterSequenceTypeMailboxEvent(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypeMailboxEvent.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypeMailboxEvent.read(buf) for i in range(count)
+        ]
+
+
+
+class FfiConverterSequenceTypeMessageSummary(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypeMessageSummary.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypeMessageSummary.read(buf) for i in range(count)
+        ]
+
+
+
+class FfiConverterSequenceTypeMimeHeader(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypeMimeHeader.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypeMimeHeader.read(buf) for i in range(count)
+        ]
+
+class FfiConverterSequenceTypeMimePart(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypeMimePart.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypeMimePart.read(buf) for i in range(count)
+        ]
+
+
+class FfiConverterSequenceTypeOutgoingEmail(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypeOutgoingEmail.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypeOutgoingEmail.read(buf) for i in range(count)
+        ]
+
+
+
+class FfiConverterSequenceTypeAttachment(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypeAttachment.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypeAttachment.read(buf) for i in range(count)
+        ]
+
+
+
+class FfiConverterSequenceTypeSweepAccount(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypeSweepAccount.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypeSweepAccount.read(buf) for i in range(count)
+        ]
+
+class FfiConverterSequenceTypeSweepResult(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypeSweepResult.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypeSweepResult.read(buf) for i in range(count)
+        ]
+
+
+class FfiConverterSequenceTypeOperationStats(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypeOperationStats.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypeOperationStats.read(buf) for i in range(count)
+        ]
+
+
+class FfiConverterSequenceTypePhaseLatency(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, value, buf):
+        items = len(value)
+        buf.writeI32(items)
+        for item in value:
+            FfiConverterTypePhaseLatency.write(item, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative sequence length")
+
+        return [
+            FfiConverterTypePhaseLatency.read(buf) for i in range(count)
+        ]
+
+
+class FfiConverterMapStringString(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, items, buf):
+        buf.writeI32(len(items))
+        for (key, value) in items.items():
+            FfiConverterString.write(key, buf)
+            FfiConverterString.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative map size")
+
+        # It would be nice to use a dict comprehension,
+        # but in Python 3.7 and before the evaluation order is not according to spec,
+        # so we we're reading the value before the key.
+        # This loop makes the order explicit: first reading the key, then the value.
+        d = {}
+        for i in range(count):
+            key = FfiConverterString.read(buf)
+            val = FfiConverterString.read(buf)
+            d[key] = val
+        return d
+
+class FfiConverterMapStringTypeStringColumn(FfiConverterRustBuffer):
+    @classmethod
+    def write(cls, items, buf):
+        buf.writeI32(len(items))
+        for (key, value) in items.items():
+            FfiConverterString.write(key, buf)
+            FfiConverterTypeStringColumn.write(value, buf)
+
+    @classmethod
+    def read(cls, buf):
+        count = buf.readI32()
+        if count < 0:
+            raise InternalError("Unexpected negative map size")
+
+        # It would be nice to use a dict comprehension,
+        # but in Python 3.7 and before the evaluation order is not according to spec,
+        # so we we're reading the value before the key.
+        # This loop makes the order explicit: first reading the key, then the value.
+        d = {}
+        for i in range(count):
+            key = FfiConverterString.read(buf)
+            val = FfiConverterTypeStringColumn.read(buf)
+            d[key] = val
+        return d
+
+def simply_configure_tls(options):
+    options = options
+    
+    rust_call_with_error(FfiConverterTypeTlsConfigError,_UniFFILib.rust_lib_simply_configure_tls,
+        FfiConverterTypeTlsOptions.lower(options))
+
+
+def simply_check_imap(domain,port,username,password):
+    domain = domain
+    
+    port = int(port)
+    
+    username = username
+    
+    password = password
+    
+    rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_simply_check_imap,
+        FfiConverterString.lower(domain),
+        FfiConverterUInt16.lower(port),
+        FfiConverterString.lower(username),
+        FfiConverterString.lower(password))
+
+
+def simply_fetch_inbox_top(domain,port,username,password):
+    domain = domain
+    
+    port = int(port)
+    
+    username = username
+    
+    password = password
+    
+    return FfiConverterOptionalString.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_simply_fetch_inbox_top,
+        FfiConverterString.lower(domain),
+        FfiConverterUInt16.lower(port),
+        FfiConverterString.lower(username),
+        FfiConverterString.lower(password)))
+
+
+def simply_fetch_inbox_top_bytes(domain,port,username,password):
+    domain = domain
+    
+    port = int(port)
+    
+    username = username
+    
+    password = password
+    
+    return FfiConverterOptionalSequenceUInt8.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_simply_fetch_inbox_top_bytes,
+        FfiConverterString.lower(domain),
+        FfiConverterUInt16.lower(port),
+        FfiConverterString.lower(username),
+        FfiConverterString.lower(password)))
+
+
+def simply_fetch_messages(domain,port,username,password,mailbox,sequence_set,items,uid):
+    domain = domain
+    
+    port = int(port)
+    
+    username = username
+    
+    password = password
+    
+    mailbox = mailbox
+    
+    sequence_set = sequence_set
+    
+    items = items
+    
+    uid = bool(uid)
+    
+    return FfiConverterSequenceTypeImapMessage.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_simply_fetch_messages,
+        FfiConverterString.lower(domain),
+        FfiConverterUInt16.lower(port),
+        FfiConverterString.lower(username),
+        FfiConverterString.lower(password),
+        FfiConverterString.lower(mailbox),
+        FfiConverterString.lower(sequence_set),
+        FfiConverterString.lower(items),
+        FfiConverterBool.lower(uid)))
+
+
+
+def simply_fetch_summaries(domain,port,username,password,mailbox,sequence_set,header_fields,uid):
+    domain = domain
+    
+    port = int(port)
+    
+    username = username
+    
+    password = password
+    
+    mailbox = mailbox
+    
+    sequence_set = sequence_set
+    
+    header_fields = list(x for x in header_fields)
+    
+    uid = bool(uid)
+    
+    return FfiConverterSequenceTypeMessageSummary.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_simply_fetch_summaries,
+        FfiConverterString.lower(domain),
+        FfiConverterUInt16.lower(port),
+        FfiConverterString.lower(username),
+        FfiConverterString.lower(password),
+        FfiConverterString.lower(mailbox),
+        FfiConverterString.lower(sequence_set),
+        FfiConverterSequenceString.lower(header_fields),
+        FfiConverterBool.lower(uid)))
+
+
+def simply_search(domain,port,username,password,mailbox,criteria):
+    domain = domain
+    
+    port = int(port)
+    
+    username = username
+    
+    password = password
+    
+    mailbox = mailbox
+    
+    criteria = criteria
+    
+    return FfiConverterSequenceUInt8.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_simply_search,
+        FfiConverterString.lower(domain),
+        FfiConverterUInt16.lower(port),
+        FfiConverterString.lower(username),
+        FfiConverterString.lower(password),
+        FfiConverterString.lower(mailbox),
+        FfiConverterString.lower(criteria)))
+
+
+def simply_uid_search(domain,port,username,password,mailbox,criteria):
+    domain = domain
+    
+    port = int(port)
+    
+    username = username
+    
+    password = password
+    
+    mailbox = mailbox
+    
+    criteria = criteria
+    
+    return FfiConverterSequenceUInt8.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_simply_uid_search,
+        FfiConverterString.lower(domain),
+        FfiConverterUInt16.lower(port),
+        FfiConverterString.lower(username),
+        FfiConverterString.lower(password),
+        FfiConverterString.lower(mailbox),
+        FfiConverterString.lower(criteria)))
+
+
+def simply_check_smtp(smtp_server,smtp_username,smtp_password):
+    smtp_server = smtp_server
+    
+    smtp_username = smtp_username
+    
+    smtp_password = smtp_password
+    
+    return FfiConverterBool.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_simply_check_smtp,
+        FfiConverterString.lower(smtp_server),
+        FfiConverterString.lower(smtp_username),
+        FfiConverterString.lower(smtp_password)))
+
+
+
+def simply_send_plain_text_email(smtp_server,smtp_username,smtp_password,headers,body):
+    smtp_server = smtp_server
+    
+    smtp_username = smtp_username
+    
+    smtp_password = smtp_password
+    
+    headers = dict((k, v) for (k, v) in headers.items())
+    
+    body = body
+    
+    return FfiConverterTypeSmtpResponse.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_simply_send_plain_text_email,
+        FfiConverterString.lower(smtp_server),
+        FfiConverterString.lower(smtp_username),
+        FfiConverterString.lower(smtp_password),
+        FfiConverterMapStringString.lower(headers),
+        FfiConverterString.lower(body)))
+
+
+
+def simply_send_html_email(smtp_server,smtp_username,smtp_password,headers,plain_text_body,html_body):
+    smtp_server = smtp_server
+    
+    smtp_username = smtp_username
+    
+    smtp_password = smtp_password
+    
+    headers = dict((k, v) for (k, v) in headers.items())
+    
+    plain_text_body = plain_text_body
+    
+    html_body = html_body
+    
+    return FfiConverterTypeSmtpResponse.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_simply_send_html_email,
+        FfiConverterString.lower(smtp_server),
+        FfiConverterString.lower(smtp_username),
+        FfiConverterString.lower(smtp_password),
+        FfiConverterMapStringString.lower(headers),
+        FfiConverterString.lower(plain_text_body),
+        FfiConverterString.lower(html_body)))
+
+
+
+def simply_send_batch(smtp_server,smtp_username,smtp_password,emails):
+    smtp_server = smtp_server
+    
+    smtp_username = smtp_username
+    
+    smtp_password = smtp_password
+    
+    emails = list(x for x in emails)
+    
+    return FfiConverterSequenceTypeBatchSendResult.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_simply_send_batch,
+        FfiConverterString.lower(smtp_server),
+        FfiConverterString.lower(smtp_username),
+        FfiConverterString.lower(smtp_password),
+        FfiConverterSequenceTypeOutgoingEmail.lower(emails)))
+
 
-    SmtpError.InternalClientError = InternalClientError
-    class ConnectionError(SmtpError):
-        def __str__(self):
-            return "SmtpError.ConnectionError({})".format(repr(super().__str__()))
+def simply_send_file_email(smtp_server,smtp_username,smtp_password,headers,content_type,path):
+    smtp_server = smtp_server
+    
+    smtp_username = smtp_username
+    
+    smtp_password = smtp_password
+    
+    headers = dict((k, v) for (k, v) in headers.items())
+    
+    content_type = content_type
+    
+    path = path
+    
+    return FfiConverterTypeSmtpResponse.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_simply_send_file_email,
+        FfiConverterString.lower(smtp_server),
+        FfiConverterString.lower(smtp_username),
+        FfiConverterString.lower(smtp_password),
+        FfiConverterMapStringString.lower(headers),
+        FfiConverterString.lower(content_type),
+        FfiConverterString.lower(path)))
 
-    SmtpError.ConnectionError = ConnectionError
-    class NetworkError(SmtpError):
-        def __str__(self):
-            return "SmtpError.NetworkError({})".format(repr(super().__str__()))
 
-    SmtpError.NetworkError = NetworkError
-    class TlsError(SmtpError):
-        def __str__(self):
-            return "SmtpError.TlsError({})".format(repr(super().__str__()))
 
-    SmtpError.TlsError = TlsError
-    class Timeout(SmtpError):
-        def __str__(self):
-            return "SmtpError.Timeout({})".format(repr(super().__str__()))
+def simply_send_streamed_email(smtp_server,smtp_username,smtp_password,headers,content_type,body):
+    smtp_server = smtp_server
+    
+    smtp_username = smtp_username
+    
+    smtp_password = smtp_password
+    
+    headers = dict((k, v) for (k, v) in headers.items())
+    
+    content_type = content_type
+    
+    body = body
+    
+    return FfiConverterTypeSmtpResponse.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_simply_send_streamed_email,
+        FfiConverterString.lower(smtp_server),
+        FfiConverterString.lower(smtp_username),
+        FfiConverterString.lower(smtp_password),
+        FfiConverterMapStringString.lower(headers),
+        FfiConverterString.lower(content_type),
+        FfiConverterCallbackInterfaceMessageBodySource.lower(body)))
 
-    SmtpError.Timeout = Timeout
-    class OtherError(SmtpError):
-        def __str__(self):
-            return "SmtpError.OtherError({})".format(repr(super().__str__()))
 
-    SmtpError.OtherError = OtherError
-SmtpError = UniFFIExceptionTmpNamespace.SmtpError
-del UniFFIExceptionTmpNamespace
 
+def simply_send_email_with_attachments(smtp_server,smtp_username,smtp_password,headers,plain_text_body,html_body,attachments):
+    smtp_server = smtp_server
+    
+    smtp_username = smtp_username
+    
+    smtp_password = smtp_password
+    
+    headers = dict((k, v) for (k, v) in headers.items())
+    
+    plain_text_body = plain_text_body
+    
+    html_body = html_body
+    
+    attachments = list(x for x in attachments)
+    
+    return FfiConverterTypeSmtpResponse.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_simply_send_email_with_attachments,
+        FfiConverterString.lower(smtp_server),
+        FfiConverterString.lower(smtp_username),
+        FfiConverterString.lower(smtp_password),
+        FfiConverterMapStringString.lower(headers),
+        FfiConverterString.lower(plain_text_body),
+        FfiConverterOptionalString.lower(html_body),
+        FfiConverterSequenceTypeAttachment.lower(attachments)))
 
-class FfiConverterTypeSmtpError(FfiConverterRustBuffer):
-    @staticmethod
-    def read(buf):
-        variant = buf.readI32()
-        if variant == 1:
-            return SmtpError.TransientSmtpError(
-                FfiConverterString.read(buf),
-            )
-        if variant == 2:
-            return SmtpError.PermanentSmtpError(
-                FfiConverterString.read(buf),
-            )
-        if variant == 3:
-            return SmtpError.ResponseParseError(
-                FfiConverterString.read(buf),
-            )
-        if variant == 4:
-            return SmtpError.InternalClientError(
-                FfiConverterString.read(buf),
-            )
-        if variant == 5:
-            return SmtpError.ConnectionError(
-                FfiConverterString.read(buf),
-            )
-        if variant == 6:
-            return SmtpError.NetworkError(
-                FfiConverterString.read(buf),
-            )
-        if variant == 7:
-            return SmtpError.TlsError(
-                FfiConverterString.read(buf),
-            )
-        if variant == 8:
-            return SmtpError.Timeout(
-                FfiConverterString.read(buf),
-            )
-        if variant == 9:
-            return SmtpError.OtherError(
-                FfiConverterString.read(buf),
-            )
-        raise InternalError("Raw enum value doesn't match any cases")
 
-    @staticmethod
-    def write(value, buf):
-        if isinstance(value, SmtpError.TransientSmtpError):
-            buf.writeI32(1)
-        if isinstance(value, SmtpError.PermanentSmtpError):
-            buf.writeI32(2)
-        if isinstance(value, SmtpError.ResponseParseError):
-            buf.writeI32(3)
-        if isinstance(value, SmtpError.InternalClientError):
-            buf.writeI32(4)
-        if isinstance(value, SmtpError.ConnectionError):
-            buf.writeI32(5)
-        if isinstance(value, SmtpError.NetworkError):
-            buf.writeI32(6)
-        if isinstance(value, SmtpError.TlsError):
-            buf.writeI32(7)
-        if isinstance(value, SmtpError.Timeout):
-            buf.writeI32(8)
-        if isinstance(value, SmtpError.OtherError):
-            buf.writeI32(9)
 
+def simply_send_batch_with_attachments(smtp_server,smtp_username,smtp_password,emails,attachments):
+    smtp_server = smtp_server
+    
+    smtp_username = smtp_username
+    
+    smtp_password = smtp_password
+    
+    emails = list(x for x in emails)
+    
+    attachments = list(x for x in attachments)
+    
+    return FfiConverterSequenceTypeBatchSendResult.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_simply_send_batch_with_attachments,
+        FfiConverterString.lower(smtp_server),
+        FfiConverterString.lower(smtp_username),
+        FfiConverterString.lower(smtp_password),
+        FfiConverterSequenceTypeOutgoingEmail.lower(emails),
+        FfiConverterSequenceTypeAttachment.lower(attachments)))
 
 
-class FfiConverterOptionalString(FfiConverterRustBuffer):
-    @classmethod
-    def write(cls, value, buf):
-        if value is None:
-            buf.writeU8(0)
-            return
 
-        buf.writeU8(1)
-        FfiConverterString.write(value, buf)
+def simply_set_metrics_enabled(enabled):
+    enabled = bool(enabled)
+    
+    rust_call(_UniFFILib.rust_lib_simply_set_metrics_enabled,
+        FfiConverterBool.lower(enabled))
 
-    @classmethod
-    def read(cls, buf):
-        flag = buf.readU8()
-        if flag == 0:
-            return None
-        elif flag == 1:
-            return FfiConverterString.read(buf)
-        else:
-            raise InternalError("Unexpected flag byte for optional type")
 
+def simply_metrics_snapshot():
+    return FfiConverterSequenceTypeOperationStats.lift(rust_call(_UniFFILib.rust_lib_simply_metrics_snapshot))
 
 
-class FfiConverterMapStringString(FfiConverterRustBuffer):
-    @classmethod
-    def write(cls, items, buf):
-        buf.writeI32(len(items))
-        for (key, value) in items.items():
-            FfiConverterString.write(key, buf)
-            FfiConverterString.write(value, buf)
+def simply_reset_metrics():
+    rust_call(_UniFFILib.rust_lib_simply_reset_metrics)
 
-    @classmethod
-    def read(cls, buf):
-        count = buf.readI32()
-        if count < 0:
-            raise InternalError("Unexpected negative map size")
 
-        # It would be nice to use a dict comprehension,
-        # but in Python 3.7 and before the evaluation order is not according to spec,
-        # so we we're reading the value before the key.
-        # This loop makes the order explicit: first reading the key, then the value.
-        d = {}
-        for i in range(count):
-            key = FfiConverterString.read(buf)
-            val = FfiConverterString.read(buf)
-            d[key] = val
-        return d
+def simply_set_async_worker_threads(threads):
+    threads = int(threads)
+    
+    rust_call(_UniFFILib.rust_lib_simply_set_async_worker_threads,
+        FfiConverterUInt32.lower(threads))
 
-def simply_check_imap(domain,port,username,password):
+
+def simply_check_imap_async(domain,port,username,password,handler):
     domain = domain
     
     port = int(port)
@@ -829,14 +4767,17 @@ def simply_check_imap(domain,port,username,password):
     
     password = password
     
-    rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_dab3_simply_check_imap,
+    handler = handler
+    
+    rust_call(_UniFFILib.rust_lib_simply_check_imap_async,
         FfiConverterString.lower(domain),
         FfiConverterUInt16.lower(port),
         FfiConverterString.lower(username),
-        FfiConverterString.lower(password))
+        FfiConverterString.lower(password),
+        FfiConverterCallbackInterfaceCompletionHandler.lower(handler))
 
 
-def simply_fetch_inbox_top(domain,port,username,password):
+def simply_fetch_inbox_top_async(domain,port,username,password,handler):
     domain = domain
     
     port = int(port)
@@ -845,29 +4786,83 @@ def simply_fetch_inbox_top(domain,port,username,password):
     
     password = password
     
-    return FfiConverterOptionalString.lift(rust_call_with_error(FfiConverterTypeImapError,_UniFFILib.rust_lib_dab3_simply_fetch_inbox_top,
+    handler = handler
+    
+    rust_call(_UniFFILib.rust_lib_simply_fetch_inbox_top_async,
         FfiConverterString.lower(domain),
         FfiConverterUInt16.lower(port),
         FfiConverterString.lower(username),
-        FfiConverterString.lower(password)))
+        FfiConverterString.lower(password),
+        FfiConverterCallbackInterfaceCompletionHandler.lower(handler))
+
 
+def simply_fetch_inbox_top_bytes_async(domain,port,username,password,handler):
+    domain = domain
+    
+    port = int(port)
+    
+    username = username
+    
+    password = password
+    
+    handler = handler
+    
+    rust_call(_UniFFILib.rust_lib_simply_fetch_inbox_top_bytes_async,
+        FfiConverterString.lower(domain),
+        FfiConverterUInt16.lower(port),
+        FfiConverterString.lower(username),
+        FfiConverterString.lower(password),
+        FfiConverterCallbackInterfaceCompletionHandler.lower(handler))
 
 
-def simply_check_smtp(smtp_server,smtp_username,smtp_password):
+def simply_fetch_messages_async(domain,port,username,password,mailbox,sequence_set,items,uid,handler):
+    domain = domain
+    
+    port = int(port)
+    
+    username = username
+    
+    password = password
+    
+    mailbox = mailbox
+    
+    sequence_set = sequence_set
+    
+    items = items
+    
+    uid = bool(uid)
+    
+    handler = handler
+    
+    rust_call(_UniFFILib.rust_lib_simply_fetch_messages_async,
+        FfiConverterString.lower(domain),
+        FfiConverterUInt16.lower(port),
+        FfiConverterString.lower(username),
+        FfiConverterString.lower(password),
+        FfiConverterString.lower(mailbox),
+        FfiConverterString.lower(sequence_set),
+        FfiConverterString.lower(items),
+        FfiConverterBool.lower(uid),
+        FfiConverterCallbackInterfaceCompletionHandler.lower(handler))
+
+
+def simply_check_smtp_async(smtp_server,smtp_username,smtp_password,handler):
     smtp_server = smtp_server
     
     smtp_username = smtp_username
     
     smtp_password = smtp_password
     
-    return FfiConverterBool.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_dab3_simply_check_smtp,
+    handler = handler
+    
+    rust_call(_UniFFILib.rust_lib_simply_check_smtp_async,
         FfiConverterString.lower(smtp_server),
         FfiConverterString.lower(smtp_username),
-        FfiConverterString.lower(smtp_password)))
-
+        FfiConverterString.lower(smtp_password),
+        FfiConverterCallbackInterfaceCompletionHandler.lower(handler))
 
 
-def simply_send_plain_text_email(smtp_server,smtp_username,smtp_password,headers,body):
+def simply_send_plain_text_email_async(smtp_server,smtp_username,smtp_password,headers,body,handler):
     smtp_server = smtp_server
     
     smtp_username = smtp_username
@@ -878,16 +4873,18 @@ def simply_send_plain_text_email(smtp_server,smtp_username,smtp_password,headers
     
     body = body
     
-    return FfiConverterTypeSmtpResponse.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_dab3_simply_send_plain_text_email,
+    handler = handler
+    
+    rust_call(_UniFFILib.rust_lib_simply_send_plain_text_email_async,
         FfiConverterString.lower(smtp_server),
         FfiConverterString.lower(smtp_username),
         FfiConverterString.lower(smtp_password),
         FfiConverterMapStringString.lower(headers),
-        FfiConverterString.lower(body)))
+        FfiConverterString.lower(body),
+        FfiConverterCallbackInterfaceCompletionHandler.lower(handler))
 
 
-
-def simply_send_html_email(smtp_server,smtp_username,smtp_password,headers,plain_text_body,html_body):
+def simply_send_html_email_async(smtp_server,smtp_username,smtp_password,headers,plain_text_body,html_body,handler):
     smtp_server = smtp_server
     
     smtp_username = smtp_username
@@ -900,25 +4897,112 @@ def simply_send_html_email(smtp_server,smtp_username,smtp_password,headers,plain
     
     html_body = html_body
     
-    return FfiConverterTypeSmtpResponse.lift(rust_call_with_error(FfiConverterTypeSmtpError,_UniFFILib.rust_lib_dab3_simply_send_html_email,
+    handler = handler
+    
+    rust_call(_UniFFILib.rust_lib_simply_send_html_email_async,
         FfiConverterString.lower(smtp_server),
         FfiConverterString.lower(smtp_username),
         FfiConverterString.lower(smtp_password),
         FfiConverterMapStringString.lower(headers),
         FfiConverterString.lower(plain_text_body),
-        FfiConverterString.lower(html_body)))
+        FfiConverterString.lower(html_body),
+        FfiConverterCallbackInterfaceCompletionHandler.lower(handler))
+
+
+def simply_send_batch_async(smtp_server,smtp_username,smtp_password,emails,handler):
+    smtp_server = smtp_server
+    
+    smtp_username = smtp_username
+    
+    smtp_password = smtp_password
+    
+    emails = list(x for x in emails)
+    
+    handler = handler
+    
+    rust_call(_UniFFILib.rust_lib_simply_send_batch_async,
+        FfiConverterString.lower(smtp_server),
+        FfiConverterString.lower(smtp_username),
+        FfiConverterString.lower(smtp_password),
+        FfiConverterSequenceTypeOutgoingEmail.lower(emails),
+        FfiConverterCallbackInterfaceCompletionHandler.lower(handler))
+
 
 
 
 __all__ = [
     "InternalError",
+    "MailboxEventKind",
+    "MetricsPhase",
+    "SweepKind",
+    "AsyncResult",
+    "Attachment",
+    "BatchSendResult",
+    "EmailAddress",
+    "FlagChange",
+    "FlagSync",
+    "FlagSyncState",
+    "I64Column",
+    "ImapMessage",
+    "ImapTraffic",
+    "LatencyHistogram",
+    "MailboxInfo",
+    "MailboxEvent",
+    "MessageSummary",
+    "MimeHeader",
+    "MimePart",
+    "OperationStats",
+    "OutgoingEmail",
+    "PhaseLatency",
     "SmtpResponse",
+    "StringColumn",
+    "SummaryColumns",
+    "SweepAccount",
+    "SweepResult",
+    "SweepTask",
+    "TlsOptions",
+    "U32Column",
+    "simply_configure_tls",
     "simply_check_imap",
     "simply_fetch_inbox_top",
+    "simply_fetch_inbox_top_bytes",
+    "simply_fetch_messages",
+    "simply_fetch_summaries",
+    "simply_search",
+    "simply_uid_search",
     "simply_check_smtp",
     "simply_send_plain_text_email",
     "simply_send_html_email",
+    "simply_send_batch",
+    "simply_send_file_email",
+    "simply_send_streamed_email",
+    "simply_send_email_with_attachments",
+    "simply_send_batch_with_attachments",
+    "simply_set_metrics_enabled",
+    "simply_metrics_snapshot",
+    "simply_reset_metrics",
+    "simply_set_async_worker_threads",
+    "simply_check_imap_async",
+    "simply_fetch_inbox_top_async",
+    "simply_fetch_inbox_top_bytes_async",
+    "simply_fetch_messages_async",
+    "simply_check_smtp_async",
+    "simply_send_plain_text_email_async",
+    "simply_send_html_email_async",
+    "simply_send_batch_async",
     "ImapError",
     "SmtpError",
+    "TlsConfigError",
+    "MimeError",
+    "MessageBodySourceError",
+    "AccountSweep",
+    "ImapSession",
+    "MailboxWatcher",
+    "ParsedMessage",
+    "SmtpMailer",
+    "CompletionHandler",
+    "DownloadProgress",
+    "MessageBodySource",
+    "MessageChunkSink",
 ]
 
@@ -0,0 +1,6 @@
+"""
+Hand-written Python helpers built on top of the generated `rust_lib` bindings.
+
+`rust_lib` has to be importable, i.e. the directory containing `rust_lib.py` and
+the compiled library has to be on `sys.path`.
+"""
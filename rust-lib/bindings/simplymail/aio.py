@@ -0,0 +1,100 @@
+"""
+asyncio versions of the blocking `rust_lib` functions.
+
+The blocking calls run on a bounded pool of Rust worker threads (see
+`rust_lib.simply_set_async_worker_threads`), which report back through a
+`rust_lib.CompletionHandler`, so awaiting them does not block the event loop.
+The I/O itself is still blocking: each call in progress occupies one OS thread
+of the pool until it has finished, so no more calls are in progress at the same
+time than there are worker threads (64 by default, at least 1); the others wait
+for one to become free.
+"""
+
+import asyncio
+
+import rust_lib
+
+
+class _FutureCompletionHandler(rust_lib.CompletionHandler):
+    # Resolves `future` on its event loop; on_complete() is called from a Rust worker thread.
+
+    def __init__(self, future, error_type, into_value):
+        self._future = future
+        self._error_type = error_type
+        self._into_value = into_value
+
+    def on_complete(self, result):
+        try:
+            self._future.get_loop().call_soon_threadsafe(self._resolve, result)
+        except RuntimeError:  # the event loop has been closed, nobody is waiting anymore
+            pass
+
+    def _resolve(self, result):
+        if self._future.done():  # cancelled
+            return
+        if result.error is None:
+            self._future.set_result(self._into_value(result))
+        else:
+            self._future.set_exception(_exception(self._error_type, result))
+
+
+def _exception(error_type, result):
+    # result.error is the name of an error variant, e.g. "ConnectionError"; "__Nonexhaustive" is called "Nonexhaustive" here
+    variant = getattr(error_type, result.error.lstrip("_"), None)
+    if variant is None:  # "Panic"
+        return rust_lib.InternalError(result.error_message)
+    return variant(result.error_message)
+
+
+def _call(function, error_type, into_value, *args):
+    future = asyncio.get_running_loop().create_future()
+    function(*args, _FutureCompletionHandler(future, error_type, into_value))
+    return future
+
+
+async def check_imap(domain, port, username, password):
+    """Like `rust_lib.simply_check_imap`."""
+    await _call(rust_lib.simply_check_imap_async, rust_lib.ImapError, lambda result: None,
+                domain, port, username, password)
+
+
+async def fetch_inbox_top(domain, port, username, password):
+    """Like `rust_lib.simply_fetch_inbox_top`."""
+    return await _call(rust_lib.simply_fetch_inbox_top_async, rust_lib.ImapError, lambda result: result.text,
+                       domain, port, username, password)
+
+
+async def fetch_inbox_top_bytes(domain, port, username, password):
+    """Like `rust_lib.simply_fetch_inbox_top_bytes`."""
+    return await _call(rust_lib.simply_fetch_inbox_top_bytes_async, rust_lib.ImapError, lambda result: result.data,
+                       domain, port, username, password)
+
+
+async def fetch_messages(domain, port, username, password, mailbox, sequence_set, items, uid=False):
+    """Like `rust_lib.simply_fetch_messages`."""
+    return await _call(rust_lib.simply_fetch_messages_async, rust_lib.ImapError, lambda result: result.messages,
+                       domain, port, username, password, mailbox, sequence_set, items, uid)
+
+
+async def check_smtp(smtp_server, smtp_username, smtp_password):
+    """Like `rust_lib.simply_check_smtp`."""
+    return await _call(rust_lib.simply_check_smtp_async, rust_lib.SmtpError, lambda result: result.flag,
+                       smtp_server, smtp_username, smtp_password)
+
+
+async def send_plain_text_email(smtp_server, smtp_username, smtp_password, headers, body):
+    """Like `rust_lib.simply_send_plain_text_email`."""
+    return await _call(rust_lib.simply_send_plain_text_email_async, rust_lib.SmtpError, lambda result: result.response,
+                       smtp_server, smtp_username, smtp_password, headers, body)
+
+
+async def send_html_email(smtp_server, smtp_username, smtp_password, headers, plain_text_body, html_body):
+    """Like `rust_lib.simply_send_html_email`."""
+    return await _call(rust_lib.simply_send_html_email_async, rust_lib.SmtpError, lambda result: result.response,
+                       smtp_server, smtp_username, smtp_password, headers, plain_text_body, html_body)
+
+
+async def send_batch(smtp_server, smtp_username, smtp_password, emails):
+    """Like `rust_lib.simply_send_batch`."""
+    return await _call(rust_lib.simply_send_batch_async, rust_lib.SmtpError, lambda result: result.batch,
+                       smtp_server, smtp_username, smtp_password, emails)
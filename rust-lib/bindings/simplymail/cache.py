@@ -0,0 +1,257 @@
+"""
+A local SQLite cache of downloaded messages, so that they are only ever downloaded once.
+"""
+
+import collections
+import sqlite3
+import threading
+import time
+
+import rust_lib
+from simplymail.stream import uid_set
+
+CachedMessage = collections.namedtuple("CachedMessage", ["uid", "flags", "size", "body"])
+SyncResult = collections.namedtuple("SyncResult", ["uids", "new_uids", "expunged_uids"])
+FlagSyncResult = collections.namedtuple("FlagSyncResult", ["changed", "expunged_uids"])
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+FETCH_CHUNK_SIZE = 100
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mailboxes (
+    account TEXT NOT NULL,
+    mailbox TEXT NOT NULL,
+    uid_validity INTEGER NOT NULL,
+    highest_uid INTEGER NOT NULL,
+    PRIMARY KEY (account, mailbox)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    account TEXT NOT NULL,
+    mailbox TEXT NOT NULL,
+    uid_validity INTEGER NOT NULL,
+    uid INTEGER NOT NULL,
+    flags TEXT NOT NULL,
+    size INTEGER,
+    header BLOB NOT NULL,
+    body BLOB NOT NULL,
+    stored_bytes INTEGER NOT NULL, -- of the header and the body
+    last_used REAL NOT NULL,
+    PRIMARY KEY (account, mailbox, uid_validity, uid)
+);
+CREATE INDEX IF NOT EXISTS messages_last_used ON messages (last_used);
+CREATE TABLE IF NOT EXISTS flag_sync_states (
+    account TEXT NOT NULL,
+    mailbox TEXT NOT NULL,
+    uid_validity INTEGER NOT NULL,
+    uid_next INTEGER NOT NULL,
+    highest_mod_seq INTEGER NOT NULL,
+    message_count INTEGER NOT NULL,
+    PRIMARY KEY (account, mailbox)
+);
+"""
+
+
+def _split_header(body):
+    # the header ends at the first empty line, cf. https://datatracker.ietf.org/doc/html/rfc5322#section-2.1
+    end = body.find(b"\r\n\r\n")
+    return body if end < 0 else body[:end + 4]
+
+
+class MessageCache:
+    """
+    Caches the messages of one account in the SQLite file at `path`.
+
+    Messages are keyed by (account, mailbox, UIDVALIDITY, UID). The file may be
+    shared by several accounts; when all their messages together take up more than
+    `max_bytes`, the least recently used messages are evicted and the file shrinks
+    accordingly. Evicted messages are not downloaded again by `sync`, which only
+    downloads messages newer than the ones synced before. Flags are stored as they
+    were when a message was downloaded, until `sync_flags` updates them.
+    """
+
+    def __init__(self, path, account, max_bytes=DEFAULT_MAX_BYTES):
+        self.account = account
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # only takes effect before the tables are created; files created before are converted by _migrate()
+        self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        with self._db:
+            self._db.executescript(_SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        (version,) = self._db.execute("PRAGMA user_version").fetchone()
+        if version >= _SCHEMA_VERSION:
+            return
+        # version 0 only counted the bodies in stored_bytes and never gave the space of evicted messages back
+        with self._db:
+            self._db.execute("UPDATE messages SET stored_bytes = LENGTH(header) + LENGTH(body)")
+        (auto_vacuum,) = self._db.execute("PRAGMA auto_vacuum").fetchone()
+        if auto_vacuum != 2:  # INCREMENTAL
+            self._db.execute("VACUUM")
+        self._db.execute("PRAGMA user_version = {}".format(_SCHEMA_VERSION))
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def sync(self, session, mailbox):
+        """
+        Brings the cache of `mailbox` up to date and returns a SyncResult.
+
+        `session` is an `rust_lib.ImapSession`; `mailbox` is selected on it. Only
+        messages with a UID above the highest one synced before are downloaded, so a warm
+        sync is a single UID SEARCH plus a UID FETCH of the messages that arrived
+        since. If the UIDVALIDITY of the mailbox changed, its cache is discarded.
+        Messages evicted from the cache are not downloaded again.
+
+        The UIDs of all messages in the mailbox are searched at once and returned in
+        `SyncResult.uids`, which takes a few dozen bytes per message; the messages
+        themselves are downloaded FETCH_CHUNK_SIZE at a time.
+        """
+        uid_validity = session.select(mailbox).uid_validity or 0
+        uids = session.uid_search("ALL")
+
+        with self._lock, self._db:
+            highest_uid = self._highest_uid(mailbox, uid_validity)
+            present = set(uids)
+            expunged_uids = [uid for (uid,) in self._db.execute(
+                "SELECT uid FROM messages WHERE account = ? AND mailbox = ? ORDER BY uid", (self.account, mailbox))
+                if uid not in present]
+            self._db.executemany("DELETE FROM messages WHERE account = ? AND mailbox = ? AND uid = ?",
+                                 [(self.account, mailbox, uid) for uid in expunged_uids])
+
+        new_uids = [uid for uid in uids if uid > highest_uid]
+        for start in range(0, len(new_uids), FETCH_CHUNK_SIZE):
+            chunk = new_uids[start:start + FETCH_CHUNK_SIZE]
+            # BODY.PEEK[] rather than RFC822, so that caching a message doesn't mark it as \Seen
+            messages = session.uid_fetch(uid_set(chunk), "(UID FLAGS RFC822.SIZE BODY.PEEK[])")
+            self._store(mailbox, uid_validity, messages, chunk[-1])
+
+        with self._lock:
+            with self._db:
+                evicted = self._evict()
+            if evicted:
+                self._vacuum()
+        return SyncResult(uids, new_uids, expunged_uids)
+
+    def sync_flags(self, session, mailbox):
+        """
+        Brings the flags of the cached messages of `mailbox` up to date and returns a FlagSyncResult.
+
+        `changed` maps the UIDs of cached messages whose flags changed to their new flags;
+        `expunged_uids` lists the cached messages that no longer exist, which are removed.
+        On servers supporting CONDSTORE, only what changed since the previous call is
+        transferred, cf. `rust_lib.ImapSession.sync_flags`.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT uid_validity, uid_next, highest_mod_seq, message_count FROM flag_sync_states "
+                "WHERE account = ? AND mailbox = ?", (self.account, mailbox)).fetchone()
+        previous = rust_lib.FlagSyncState(*row) if row is not None else None
+        sync = session.sync_flags(mailbox, previous)
+
+        with self._lock, self._db:
+            self._highest_uid(mailbox, sync.state.uid_validity)  # discards the cache if the UIDVALIDITY changed
+            key = (self.account, mailbox)
+            if sync.full:
+                cached = dict(self._db.execute("SELECT uid, flags FROM messages WHERE account = ? AND mailbox = ?", key))
+                present = {change.uid for change in sync.changed}
+                expunged_uids = sorted(uid for uid in cached if uid not in present)
+            else:
+                cached = {}
+                for change in sync.changed:
+                    row = self._db.execute("SELECT flags FROM messages WHERE account = ? AND mailbox = ? AND uid = ?",
+                                           key + (change.uid,)).fetchone()
+                    if row is not None:
+                        cached[change.uid] = row[0]
+                expunged_uids = []
+                if sync.present_uids is not None:
+                    present = set(sync.present_uids)
+                    expunged_uids = [uid for (uid,) in self._db.execute(
+                        "SELECT uid FROM messages WHERE account = ? AND mailbox = ? AND uid < ? ORDER BY uid",
+                        key + (previous.uid_next,)) if uid not in present]
+
+            changed = {change.uid: change.flags for change in sync.changed
+                       if change.uid in cached and cached[change.uid] != " ".join(change.flags)}
+            self._db.executemany("UPDATE messages SET flags = ? WHERE account = ? AND mailbox = ? AND uid = ?",
+                                 [(" ".join(flags),) + key + (uid,) for (uid, flags) in changed.items()])
+            self._db.executemany("DELETE FROM messages WHERE account = ? AND mailbox = ? AND uid = ?",
+                                 [key + (uid,) for uid in expunged_uids])
+            state = sync.state
+            self._db.execute("INSERT OR REPLACE INTO flag_sync_states VALUES (?, ?, ?, ?, ?, ?)",
+                             key + (state.uid_validity, state.uid_next, state.highest_mod_seq, state.message_count))
+        return FlagSyncResult(changed, expunged_uids)
+
+    def get(self, mailbox, uid):
+        """Returns the cached message as a CachedMessage, or None if it isn't cached."""
+        return self._get("flags, size, body", mailbox, uid,
+                         lambda row: CachedMessage(uid, row[0].split(), row[1], row[2]))
+
+    def get_header(self, mailbox, uid):
+        """Returns just the cached header of a message as bytes, or None if it isn't cached."""
+        return self._get("header", mailbox, uid, lambda row: row[0])
+
+    def _get(self, columns, mailbox, uid, from_row):
+        with self._lock, self._db:
+            key = (self.account, mailbox, uid)
+            row = self._db.execute(
+                "SELECT {} FROM messages JOIN mailboxes USING (account, mailbox, uid_validity) "
+                "WHERE account = ? AND mailbox = ? AND uid = ?".format(columns), key).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE messages SET last_used = ? WHERE account = ? AND mailbox = ? AND uid = ?",
+                             (time.time(),) + key)
+            return from_row(row)
+
+    def _highest_uid(self, mailbox, uid_validity):
+        # Returns the highest UID synced so far; messages evicted since are not downloaded again.
+        # UIDs are only meaningful together with the UIDVALIDITY, cf. https://datatracker.ietf.org/doc/html/rfc3501#section-2.3.1.1
+        row = self._db.execute("SELECT uid_validity, highest_uid FROM mailboxes WHERE account = ? AND mailbox = ?",
+                               (self.account, mailbox)).fetchone()
+        if row is not None and row[0] == uid_validity:
+            return row[1]
+        self._db.execute("DELETE FROM messages WHERE account = ? AND mailbox = ?", (self.account, mailbox))
+        self._db.execute("INSERT OR REPLACE INTO mailboxes VALUES (?, ?, ?, 0)", (self.account, mailbox, uid_validity))
+        return 0
+
+    def _store(self, mailbox, uid_validity, messages, highest_uid):
+        now = time.time()
+        rows = []
+        for message in messages:
+            if message.uid is None or message.body is None:
+                continue
+            header = _split_header(message.body)
+            rows.append((self.account, mailbox, uid_validity, message.uid, " ".join(message.flags), message.size,
+                         header, message.body, len(header) + len(message.body), now))
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.execute("UPDATE mailboxes SET highest_uid = ? WHERE account = ? AND mailbox = ? AND uid_validity = ?",
+                             (highest_uid, self.account, mailbox, uid_validity))
+
+    def _evict(self):
+        # Deletes the least recently used messages until the rest fit into `max_bytes`; returns whether any were deleted.
+        (total,) = self._db.execute("SELECT COALESCE(SUM(stored_bytes), 0) FROM messages").fetchone()
+        if total <= self.max_bytes:
+            return False
+        evicted = []
+        for (rowid, stored_bytes) in self._db.execute("SELECT rowid, stored_bytes FROM messages ORDER BY last_used, uid"):
+            evicted.append((rowid,))
+            total -= stored_bytes
+            if total <= self.max_bytes:
+                break
+        self._db.executemany("DELETE FROM messages WHERE rowid = ?", evicted)
+        return True
+
+    def _vacuum(self):
+        # Gives the pages freed by _evict() back to the file system. Must run outside of a transaction, as
+        # executescript() commits any pending one first; unlike execute(), it runs the pragma to completion
+        # rather than freeing a single page.
+        self._db.executescript("PRAGMA incremental_vacuum")
@@ -0,0 +1,134 @@
+"""
+Views onto the columnar message summaries returned by
+`rust_lib.ImapSession.fetch_summary_columns`, which only decode a value when it
+is accessed. Listing 100k messages thereby costs a few bulk copies instead of
+one Python object per field and message.
+"""
+
+import array
+import collections
+import collections.abc
+import sys
+
+from simplymail.search import unpack_u32s
+
+_U32_FIELDS = ("message", "uid", "size")
+_I64_FIELDS = ("internal_date",)
+_STRING_FIELDS = ("flags", "date", "subject", "from_name", "from_address", "to_addresses", "message_id", "in_reply_to")
+
+SummaryRow = collections.namedtuple("SummaryRow", _U32_FIELDS + _I64_FIELDS + _STRING_FIELDS + ("headers",))
+
+
+def _unpack_i64s(packed):
+    numbers = array.array("q")
+    numbers.frombytes(packed)
+    if sys.byteorder == "big":
+        numbers.byteswap()
+    return numbers
+
+
+class _ColumnView(collections.abc.Sequence):
+    def __init__(self, present):
+        self._present = present
+
+    def __len__(self):
+        return len(self._present)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("column index out of range")
+        return self._get(index) if self._present[index] else None
+
+    def is_present(self, index):
+        """Whether the value at `index` is not None, without decoding it."""
+        return bool(self._present[index])
+
+
+class NumberColumnView(_ColumnView):
+    """A `U32Column` or `I64Column`, None where the value is missing."""
+
+    def __init__(self, column, unpack):
+        super().__init__(column.present)
+        self.values = unpack(column.values)  # all values as an array.array, 0 where the value is missing
+
+    def _get(self, index):
+        return self.values[index]
+
+    def __iter__(self):
+        for value, present in zip(self.values, self._present):
+            yield value if present else None
+
+
+class StringColumnView(_ColumnView):
+    """A `StringColumn`, None where the value is missing. Values are decoded from UTF-8 on access."""
+
+    def __init__(self, column):
+        super().__init__(column.present)
+        self._offsets = unpack_u32s(column.offsets)
+        self._data = memoryview(column.data)
+
+    def _get(self, index):
+        return str(self._data[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def __iter__(self):
+        data, offsets = self._data, self._offsets
+        for index, present in enumerate(self._present):
+            yield str(data[offsets[index]:offsets[index + 1]], "utf-8") if present else None
+
+
+class SummaryTable(collections.abc.Sequence):
+    """
+    A `rust_lib.SummaryColumns`, accessible by column, e.g. `table.subject[i]`,
+    or by row, e.g. `table[i].subject`. Columns are unpacked on first access.
+    """
+
+    def __init__(self, columns):
+        self._columns = columns
+        self._views = {}
+
+    def __len__(self):
+        return self._columns.count
+
+    def __getattr__(self, name):
+        if name in SummaryRow._fields and name != "headers":
+            return self._view(name, lambda: getattr(self._columns, name))
+        raise AttributeError(name)
+
+    def header(self, name):
+        """The column of an additional header field that was fetched, e.g. table.header("List-Unsubscribe")."""
+        key = name.lower()
+        return self._view("header " + key, lambda: self._columns.headers[key])
+
+    def _view(self, key, column):
+        view = self._views.get(key)
+        if view is None:
+            name = key.split(" ")[0]
+            if name in _U32_FIELDS:
+                view = NumberColumnView(column(), unpack_u32s)
+            elif name in _I64_FIELDS:
+                view = NumberColumnView(column(), _unpack_i64s)
+            else:
+                view = StringColumnView(column())
+            self._views[key] = view
+        return view
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        values = [getattr(self, name)[index] for name in SummaryRow._fields[:-1]]
+        headers = {key: self.header(key)[index] for key in self._columns.headers}
+        return SummaryRow(*values, {key: value for key, value in headers.items() if value is not None})
+
+
+def fetch_summary_table(session, sequence_set, header_fields=()):
+    """Like `session.fetch_summaries(sequence_set, header_fields)`, as a `SummaryTable`."""
+    return SummaryTable(session.fetch_summary_columns(sequence_set, list(header_fields)))
+
+
+def uid_fetch_summary_table(session, uid_set, header_fields=()):
+    """Like `session.uid_fetch_summaries(uid_set, header_fields)`, as a `SummaryTable`."""
+    return SummaryTable(session.uid_fetch_summary_columns(uid_set, list(header_fields)))
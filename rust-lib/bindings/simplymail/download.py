@@ -0,0 +1,85 @@
+"""
+Downloading large messages chunk by chunk with `rust_lib.ImapSession.download_message`
+and `download_message_to_file`, which resume where an interrupted download stopped.
+"""
+
+import rust_lib
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class BufferSink(rust_lib.MessageChunkSink):
+    """
+    A `rust_lib.MessageChunkSink` writing every chunk into the writable buffer
+    `buffer` (e.g. a bytearray or mmap) at its offset. `received` is the offset
+    after the last chunk, from which an interrupted download can be resumed. An
+    exception, e.g. because the message doesn't fit, aborts the download and is
+    kept in `error`.
+    """
+
+    def __init__(self, buffer, offset=0, on_progress=None):
+        self._buffer = memoryview(buffer).cast("B")
+        self._on_progress = on_progress
+        self.received = offset
+        self.error = None
+
+    def write_chunk(self, offset, chunk, size):
+        try:
+            self._buffer[offset:offset + len(chunk)] = bytes(chunk)
+            self.received = offset + len(chunk)
+            if self._on_progress is not None:
+                self._on_progress(self.received, size)
+        except BaseException as error:
+            self.error = error
+            raise
+
+
+class CallbackProgress(rust_lib.DownloadProgress):
+    """A `rust_lib.DownloadProgress` calling `on_progress(downloaded, size)`, if given."""
+
+    def __init__(self, on_progress=None):
+        self._on_progress = on_progress
+        self.error = None
+
+    def on_progress(self, downloaded, size):
+        if self._on_progress is None:
+            return
+        try:
+            self._on_progress(downloaded, size)
+        except BaseException as error:
+            self.error = error
+            raise
+
+
+def _reraise(callback):
+    """Re-raises the exception that made `callback` abort a download, if any."""
+    if callback.error is not None:
+        raise callback.error
+
+
+def download_into(session, uid, buffer, offset=0, chunk_size=CHUNK_SIZE, on_progress=None):
+    """
+    Downloads message `uid` of the mailbox selected in `session` into `buffer`,
+    from byte `offset` on (e.g. the `received` of an earlier, interrupted call's
+    sink), and returns the size of the message.
+    """
+    sink = BufferSink(buffer, offset, on_progress)
+    try:
+        return session.download_message(uid, offset, chunk_size, sink)
+    except rust_lib.InternalError:
+        _reraise(sink)
+        raise
+
+
+def download_to_file(session, uid, path, chunk_size=CHUNK_SIZE, on_progress=None):
+    """
+    Downloads message `uid` of the mailbox selected in `session` into the file at
+    `path`, continuing after whatever an earlier call left there, and returns the
+    size of the message. `on_progress(downloaded, size)` is called after every chunk.
+    """
+    progress = CallbackProgress(on_progress)
+    try:
+        return session.download_message_to_file(uid, path, chunk_size, progress)
+    except rust_lib.InternalError:
+        _reraise(progress)
+        raise
@@ -0,0 +1,51 @@
+"""
+Noticing new mail as it arrives, using IMAP IDLE instead of polling.
+
+All helpers take a `rust_lib.MailboxWatcher`, which keeps one connection per
+mailbox idling, and end once `watcher.stop()` was called.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+# how long a single MailboxWatcher.wait() may block; the watcher keeps idling in between
+DEFAULT_WAIT_SECS = 60
+
+
+def watch(watcher, wait_secs=DEFAULT_WAIT_SECS):
+    """Yields every `rust_lib.MailboxEvent` of `watcher` as it arrives."""
+    while True:
+        events = watcher.wait(wait_secs)
+        if events is None:
+            return
+        yield from events
+
+
+async def awatch(watcher, wait_secs=DEFAULT_WAIT_SECS):
+    """Like `watch`, as an asynchronous iterator. Waiting occupies one thread per watcher, not one of the event loop."""
+    loop = asyncio.get_running_loop()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        while True:
+            events = await loop.run_in_executor(executor, watcher.wait, wait_secs)
+            if events is None:
+                return
+            for event in events:
+                yield event
+
+
+def subscribe(watcher, callback, wait_secs=DEFAULT_WAIT_SECS):
+    """
+    Calls `callback(event)` for every `rust_lib.MailboxEvent` of `watcher` on a background thread, which is returned.
+    If waiting fails, e.g. because the credentials were revoked, `callback(error)` is called with the `rust_lib.ImapError`.
+    """
+    def run():
+        try:
+            for event in watch(watcher, wait_secs):
+                callback(event)
+        except Exception as error:
+            callback(error)
+
+    thread = threading.Thread(target=run, name="simplymail-idle", daemon=True)
+    thread.start()
+    return thread
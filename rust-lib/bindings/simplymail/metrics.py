@@ -0,0 +1,70 @@
+"""
+Turns the metrics recorded by `rust_lib` (after calling
+`rust_lib.simply_set_metrics_enabled(True)`) into plain dicts of counters and
+latency percentiles, e.g. to feed them into a monitoring system.
+"""
+
+import rust_lib
+
+PERCENTILES = (50, 90, 99)
+
+# the number of buckets of every LatencyHistogram, cf. HISTOGRAM_BUCKETS in metrics.rs
+HISTOGRAM_BUCKETS = 28
+
+
+def bucket_bounds(index):
+    """The durations in microseconds counted by bucket `index` of a `rust_lib.LatencyHistogram`, as (low, high)."""
+    if index == 0:
+        return 0, 1
+    high = float("inf") if index == HISTOGRAM_BUCKETS - 1 else 2 ** index
+    return 2 ** (index - 1), high
+
+
+def percentile(histogram, q):
+    """
+    An upper bound of the `q`th percentile (0-100) of `histogram` in microseconds,
+    i.e. the upper end of the bucket it falls into; None if the histogram is empty.
+    The overflow bucket is reported by its lower end.
+    """
+    if histogram.count == 0:
+        return None
+    rank = histogram.count * q / 100
+    seen = 0
+    for index, count in enumerate(histogram.buckets):
+        seen += count
+        if count and seen >= rank:
+            low, high = bucket_bounds(index)
+            return low if high == float("inf") else high
+    return bucket_bounds(len(histogram.buckets) - 1)[0]
+
+
+def _latency(histogram):
+    latency = {"count": histogram.count, "total_ms": histogram.total_micros / 1e3}
+    for q in PERCENTILES:
+        micros = percentile(histogram, q)
+        latency["p{}_ms".format(q)] = None if micros is None else micros / 1e3
+    return latency
+
+
+def snapshot(reset=False):
+    """
+    The current metrics as {operation: {"calls": ..., "failures": ..., "retries": ...,
+    "bytes_sent": ..., "bytes_received": ..., "latency": {...}, "phases": {phase: {...}}}},
+    phases being named like "tls_handshake". With `reset`, the metrics start over afterwards;
+    operations finishing in between the two calls are lost.
+    """
+    stats = rust_lib.simply_metrics_snapshot()
+    if reset:
+        rust_lib.simply_reset_metrics()
+    return {
+        operation.operation: {
+            "calls": operation.calls,
+            "failures": operation.failures,
+            "retries": operation.retries,
+            "bytes_sent": operation.bytes_sent,
+            "bytes_received": operation.bytes_received,
+            "latency": _latency(operation.latency),
+            "phases": {phase.phase.name.lower(): _latency(phase.latency) for phase in operation.phases},
+        }
+        for operation in stats
+    }
@@ -0,0 +1,34 @@
+"""
+Server-side SEARCH, with the matching numbers unpacked into an `array.array`
+instead of a list of ints.
+"""
+
+import array
+import sys
+
+import rust_lib
+
+# the array type code for unsigned 32-bit integers, "I" on all common platforms
+_U32 = "I" if array.array("I").itemsize == 4 else "L"
+
+
+def unpack_u32s(packed):
+    """
+    Turns the little-endian u32s returned by `rust_lib.simply_search` and
+    `rust_lib.simply_uid_search` into an `array.array` of ints, with a single copy.
+    """
+    numbers = array.array(_U32)
+    numbers.frombytes(packed)
+    if sys.byteorder == "big":
+        numbers.byteswap()
+    return numbers
+
+
+def search(domain, port, username, password, mailbox, criteria):
+    """Like `rust_lib.simply_search`, e.g. search(..., "INBOX", "UNSEEN"), returning an array of sequence numbers."""
+    return unpack_u32s(rust_lib.simply_search(domain, port, username, password, mailbox, criteria))
+
+
+def uid_search(domain, port, username, password, mailbox, criteria):
+    """Like `rust_lib.simply_uid_search`, returning an array of UIDs."""
+    return unpack_u32s(rust_lib.simply_uid_search(domain, port, username, password, mailbox, criteria))
@@ -0,0 +1,53 @@
+"""
+Sending email bodies too large to hold in memory, chunk by chunk, through
+`rust_lib.simply_send_streamed_email`.
+"""
+
+import rust_lib
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class IterableBody(rust_lib.MessageBodySource):
+    """
+    A `rust_lib.MessageBodySource` handing over the chunks of any iterable of
+    bytes (or str, sent as UTF-8). An exception raised by the iterable aborts the
+    send with `rust_lib.SmtpError.MessageBodyError` and is kept in `error`.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.error = None
+
+    def read_chunk(self):
+        try:
+            chunk = next(self._chunks, None)
+        except BaseException as error:
+            self.error = error
+            raise rust_lib.MessageBodySourceError.ReadError(repr(error)) from error
+        return chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+def file_chunks(f, chunk_size=CHUNK_SIZE):
+    """Yields the contents of the binary file object `f`, `chunk_size` bytes at a time."""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def send_stream(smtp_server, smtp_username, smtp_password, headers, content_type, chunks):
+    """
+    Sends an email whose body (of type `content_type`) is the concatenation of
+    `chunks`, e.g. `file_chunks(f)` or a generator producing a report, only
+    holding about one chunk in memory at a time. Returns the `rust_lib.SmtpResponse`.
+    An exception raised while producing the chunks is re-raised as is.
+    """
+    body = IterableBody(chunks)
+    try:
+        return rust_lib.simply_send_streamed_email(smtp_server, smtp_username, smtp_password, headers, content_type, body)
+    except rust_lib.SmtpError.MessageBodyError:
+        if body.error is not None:
+            raise body.error
+        raise
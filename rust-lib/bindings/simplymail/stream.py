@@ -0,0 +1,107 @@
+"""
+Iterating over whole mailboxes with bounded memory, e.g. for backups.
+"""
+
+import collections
+import concurrent.futures
+import itertools
+
+StreamedMessage = collections.namedtuple("StreamedMessage", ["uid", "flags", "size", "body"])
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_WINDOW = 1000
+
+
+def uid_set(uids):
+    """Formats ascending UIDs as a compact IMAP sequence set, e.g. [1, 2, 3, 7] -> "1:3,7"."""
+    ranges = []
+    for uid in uids:
+        if ranges and ranges[-1][1] + 1 == uid:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    return ",".join(str(first) if first == last else "{}:{}".format(first, last) for (first, last) in ranges)
+
+
+def _iter_uids(session, uid_next, window):
+    # Yields the UIDs below `uid_next` of the selected mailbox in ascending order, searching "UID first:last" a range
+    # at a time rather than all UIDs at once. The range doubles while it holds fewer than `window // 2` messages and
+    # is halved while it holds more than `window`, so that sparse UIDs take few searches and dense ones little memory.
+    first, step = 1, window
+    while first < uid_next:
+        last = min(first + step, uid_next) - 1
+        uids = session.uid_search("UID {}:{}".format(first, last))
+        yield from uids
+        first = last + 1
+        if len(uids) < window // 2:
+            step *= 2
+        elif len(uids) > window:
+            step = max(step // 2, 1)
+
+
+def _plan_chunks(session, uids, budget, window):
+    # Groups the UIDs into chunks whose bodies add up to at most `budget` bytes.
+    # Sizes are looked up `window` UIDs at a time, so planning doesn't need memory proportional to the mailbox either.
+    uids = iter(uids)
+    while True:
+        window_uids = list(itertools.islice(uids, window))
+        if not window_uids:
+            return
+        sizes = {message.uid: message.size or 0 for message in session.uid_fetch(uid_set(window_uids), "(UID RFC822.SIZE)")}
+        chunk, chunk_bytes = [], 0
+        for uid in window_uids:
+            if uid not in sizes:  # expunged in the meantime
+                continue
+            if chunk and chunk_bytes + sizes[uid] > budget:
+                yield chunk
+                chunk, chunk_bytes = [], 0
+            chunk.append(uid)
+            chunk_bytes += sizes[uid]
+        if chunk:
+            yield chunk
+
+
+def _fetch_next_chunk(session, chunks):
+    chunk = next(chunks, None)
+    if chunk is None:
+        return None
+    # BODY.PEEK[] rather than RFC822, so that backing up a mailbox doesn't mark its messages as \Seen
+    messages = session.uid_fetch(uid_set(chunk), "(UID FLAGS RFC822.SIZE BODY.PEEK[])")
+    messages.sort(key=lambda message: message.uid)
+    return [StreamedMessage(message.uid, message.flags, message.size, message.body) for message in messages]
+
+
+def iter_mailbox(session, mailbox, max_bytes=DEFAULT_MAX_BYTES, window=DEFAULT_WINDOW):
+    """
+    Yields every message of `mailbox` as a StreamedMessage, in ascending UID order.
+
+    `session` is an `rust_lib.ImapSession`; `mailbox` is selected on it. Messages are
+    fetched in chunks, and the next chunk is fetched in the background while the
+    caller works through the current one. Each chunk holds at most `max_bytes // 3`
+    bytes of message bodies. The chunk being worked through and the one being
+    fetched are held at the same time, and while a fetched chunk is handed over from
+    Rust to Python its bodies briefly exist twice, so at most `max_bytes` bytes of
+    bodies are held at a time regardless of the size of the mailbox. Not counted are
+    messages the caller keeps a reference to, and a single message larger than
+    `max_bytes // 3`, which is fetched as a chunk of its own and may then take up
+    three times its size.
+
+    Neither are the UIDs of all messages held at once: they are searched a range
+    of UIDs at a time, each search returning about `window` of them. Messages that
+    arrive after `mailbox` was selected are not yielded. Only if the server does not
+    report the UIDNEXT of `mailbox` are all its UIDs searched at once, taking a few
+    dozen bytes per message.
+    """
+    uid_next = session.select(mailbox).uid_next
+    uids = session.uid_search("ALL") if uid_next is None else _iter_uids(session, uid_next, window)
+    chunks = _plan_chunks(session, uids, max_bytes // 3, window)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(_fetch_next_chunk, session, chunks)
+        while True:
+            messages = pending.result()
+            if messages is None:
+                return
+            pending = executor.submit(_fetch_next_chunk, session, chunks)
+            yield from messages
+            del messages
@@ -0,0 +1,52 @@
+"""
+Running the same IMAP task for many accounts at once, e.g. to poll thousands of
+mailboxes spread across a few providers.
+
+The work is done by a `rust_lib.AccountSweep` on threads of its own; these
+helpers only hand out its results as the accounts finish.
+"""
+
+import asyncio
+import concurrent.futures
+
+import rust_lib
+
+# how long a single AccountSweep.wait() may block
+DEFAULT_WAIT_SECS = 1
+
+
+def sweep(accounts, task, max_connections=64, max_connections_per_host=8, wait_secs=DEFAULT_WAIT_SECS):
+    """
+    Yields `(account, result)` for every `rust_lib.SweepAccount` in `accounts` as soon as its
+    `rust_lib.SweepResult` is available, i.e. in no particular order.
+
+    Closing the generator early cancels the accounts not started yet.
+    """
+    accounts = list(accounts)
+    account_sweep = rust_lib.AccountSweep(accounts, task, max_connections, max_connections_per_host)
+    try:
+        while True:
+            results = account_sweep.wait(wait_secs)
+            if results is None:
+                return
+            for result in results:
+                yield accounts[result.index], result
+    finally:
+        account_sweep.cancel()
+
+
+async def asweep(accounts, task, max_connections=64, max_connections_per_host=8, wait_secs=DEFAULT_WAIT_SECS):
+    """Like `sweep`, as an asynchronous iterator. Waiting occupies one thread per sweep, not one of the event loop."""
+    accounts = list(accounts)
+    loop = asyncio.get_running_loop()
+    account_sweep = rust_lib.AccountSweep(accounts, task, max_connections, max_connections_per_host)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            while True:
+                results = await loop.run_in_executor(executor, account_sweep.wait, wait_secs)
+                if results is None:
+                    return
+                for result in results:
+                    yield accounts[result.index], result
+    finally:
+        account_sweep.cancel()
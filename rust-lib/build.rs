@@ -1,3 +1,6 @@
+use std::env;
+use std::fs;
+use std::path::Path;
 use std::process::Command;
 
 use uniffi_bindgen::generate_bindings;
@@ -6,12 +9,26 @@ fn main() {
     let udl_file = "./src/rust-lib.udl";
     let out_dir = "./bindings/";
     uniffi_build::generate_scaffolding(udl_file).unwrap();
+    write_ffi_namespace();
+    // The Python bindings (bindings/rust_lib.py) are maintained by hand and must not be overwritten:
     generate_bindings(udl_file.into(), 
         None, 
-        vec!["swift", "python", "kotlin"], 
+        vec!["swift", "kotlin"], 
         Some(out_dir.into()), 
         None, 
         true).unwrap(); 
 
     Command::new("uniffi-bindgen-cs").arg("--out-dir").arg(out_dir).arg(udl_file).output().expect("Failed when generating C# bindings");
-}
\ No newline at end of file
+}
+
+/// Writes the prefix uniffi gives the names of the FFI functions (e.g. `rust_lib_1a2b`, the suffix
+/// being a checksum of the UDL) as a C string to `$OUT_DIR/ffi_namespace`, from where the library
+/// exports it for the hand-maintained Python bindings (see `rust_lib_ffi_namespace` in lib.rs).
+fn write_ffi_namespace() {
+    let out_dir = env::var("OUT_DIR").unwrap();
+    let scaffolding = fs::read_to_string(Path::new(&out_dir).join("rust-lib.uniffi.rs")).unwrap();
+    // e.g. "pub extern "C" fn ffi_rust_lib_1a2b_rustbuffer_alloc(":
+    let end = scaffolding.find("_rustbuffer_alloc(").expect("No rustbuffer_alloc in the scaffolding");
+    let start = scaffolding[..end].rfind("fn ffi_").expect("No rustbuffer_alloc in the scaffolding") + "fn ffi_".len();
+    fs::write(Path::new(&out_dir).join("ffi_namespace"), format!("{}\0", &scaffolding[start..end])).unwrap();
+}
@@ -0,0 +1,182 @@
+// Runs the same IMAP task for many accounts at once, e.g. to poll thousands of mailboxes spread across a few providers.
+// At most `max_connections` accounts are worked on at the same time, and at most `max_connections_per_host` of them
+// on the same server, so that no provider rate-limits us. Results are handed out as the accounts finish.
+
+use std::collections::{HashMap, VecDeque};
+use std::panic::{self, AssertUnwindSafe};
+use std::sync::mpsc::{channel, Receiver, RecvTimeoutError, Sender};
+use std::sync::{Arc, Mutex};
+use std::time::Duration;
+
+use crate::worker_pool::WorkerPool;
+use crate::{FlagSync, FlagSyncState, ImapError, ImapSession, MailboxInfo, MessageSummary};
+
+pub enum SweepKind {
+    Check, // log in and out again, cf. simply_check_imap()
+    FetchNew, // the summaries of the messages in `mailbox` with a UID of at least SweepAccount::uid_next
+    SyncFlags, // cf. ImapSession::sync_flags()
+}
+
+pub struct SweepTask {
+    pub kind: SweepKind,
+    pub mailbox: String, // ignored by SweepKind::Check
+    pub header_fields: Vec<String>, // cf. simply_fetch_summaries(), only used by SweepKind::FetchNew
+}
+
+pub struct SweepAccount {
+    pub domain: String,
+    pub port: u16,
+    pub username: String,
+    pub password: String,
+    pub uid_next: u32, // SweepKind::FetchNew: the MailboxInfo::uid_next of the previous sweep, 1 to fetch all messages
+    pub flag_sync_state: Option<FlagSyncState>, // SweepKind::SyncFlags: the FlagSync::state of the previous sweep
+}
+
+// The outcome of a SweepTask for one account.
+// If it failed, `error` is the name of the ImapError variant and `error_message` its description, like in AsyncResult.
+pub struct SweepResult {
+    pub index: u32, // of the account in the list given to AccountSweep::new()
+    pub error: Option<String>,
+    pub error_message: Option<String>,
+    pub mailbox: Option<MailboxInfo>, // SweepKind::FetchNew
+    pub summaries: Option<Vec<MessageSummary>>, // SweepKind::FetchNew
+    pub flag_sync: Option<FlagSync>, // SweepKind::SyncFlags
+}
+
+impl SweepResult {
+    fn new(index: u32) -> Self {
+        SweepResult { index, error: None, error_message: None, mailbox: None, summaries: None, flag_sync: None }
+    }
+
+    fn failed(index: u32, error: String, error_message: String) -> Self {
+        SweepResult { error: Some(error), error_message: Some(error_message), ..SweepResult::new(index) }
+    }
+}
+
+fn run_task(task: &SweepTask, account: SweepAccount, result: &mut SweepResult) -> Result<(), ImapError> {
+    let session = ImapSession::new(account.domain, account.port, account.username, account.password)?;
+    match task.kind {
+        SweepKind::Check => {},
+        SweepKind::FetchNew => {
+            let mailbox = session.select(&task.mailbox)?;
+            // "n:*" always matches the message with the highest UID, even if that is below n, so only fetch if something is new
+            let summaries = if mailbox.uid_next.map_or(true, |uid_next| uid_next > account.uid_next) {
+                let uid_set = format!("{}:*", account.uid_next.max(1));
+                session.uid_fetch_summaries(&uid_set, task.header_fields.clone())?
+                    .into_iter()
+                    .filter(|summary| summary.uid.map_or(false, |uid| uid >= account.uid_next))
+                    .collect()
+            } else {
+                Vec::new()
+            };
+            result.mailbox = Some(mailbox);
+            result.summaries = Some(summaries);
+        },
+        SweepKind::SyncFlags => {
+            result.flag_sync = Some(session.sync_flags(&task.mailbox, account.flag_sync_state)?);
+        },
+    }
+    session.logout()
+}
+
+struct Scheduler {
+    pending: VecDeque<(String, VecDeque<(u32, SweepAccount)>)>, // the accounts not started yet, grouped by host
+    running: HashMap<String, u32>, // the number of accounts started but not finished yet, per host
+    sender: Option<Sender<SweepResult>>, // dropped once no account is pending, so that the receiver notices the end
+}
+
+struct Sweep {
+    task: SweepTask,
+    max_connections_per_host: u32,
+    pool: WorkerPool,
+    scheduler: Mutex<Scheduler>,
+}
+
+impl Sweep {
+    // Starts as many pending accounts as the per-host limits allow.
+    // The pool's thread count is the global limit, so workers never wait for a host to become available.
+    fn dispatch(self: &Arc<Self>) {
+        let mut scheduler = self.scheduler.lock().unwrap();
+        let scheduler = &mut *scheduler;
+        for (host, accounts) in scheduler.pending.iter_mut() {
+            let running = scheduler.running.entry(host.clone()).or_insert(0);
+            while *running < self.max_connections_per_host {
+                let Some((index, account)) = accounts.pop_front() else { break };
+                *running += 1;
+
+                let sweep = Arc::clone(self);
+                let sender = scheduler.sender.clone().expect("accounts are pending");
+                let host = host.clone();
+                self.pool.execute(move || {
+                    let result = panic::catch_unwind(AssertUnwindSafe(|| {
+                        let mut result = SweepResult::new(index);
+                        if let Err(err) = run_task(&sweep.task, account, &mut result) {
+                            return SweepResult::failed(index, format!("{err:?}"), err.to_string());
+                        }
+                        result
+                    })).unwrap_or_else(|_| SweepResult::failed(index, String::from("Panic"), String::from("Unknown rust panic")));
+                    let _ = sender.send(result); // the AccountSweep may have been dropped already
+                    drop(sender);
+
+                    *sweep.scheduler.lock().unwrap().running.get_mut(&host).unwrap() -= 1;
+                    sweep.dispatch();
+                });
+            }
+        }
+        scheduler.pending.retain(|(_, accounts)| !accounts.is_empty());
+        if scheduler.pending.is_empty() {
+            scheduler.sender = None;
+        }
+    }
+}
+
+// A running sweep over many accounts, which hands out one SweepResult per account.
+pub struct AccountSweep {
+    sweep: Arc<Sweep>,
+    results: Mutex<Receiver<SweepResult>>,
+}
+
+impl AccountSweep {
+    pub fn new(accounts: Vec<SweepAccount>, task: SweepTask, max_connections: u32, max_connections_per_host: u32) -> Self {
+        let (sender, receiver) = channel();
+        let threads = (max_connections as usize).min(accounts.len()).max(1);
+
+        let mut pending: VecDeque<(String, VecDeque<(u32, SweepAccount)>)> = VecDeque::new();
+        for (index, account) in accounts.into_iter().enumerate() {
+            let host = account.domain.to_lowercase();
+            match pending.iter_mut().find(|(pending_host, _)| *pending_host == host) {
+                Some((_, accounts)) => accounts.push_back((index as u32, account)),
+                None => pending.push_back((host, VecDeque::from([(index as u32, account)]))),
+            }
+        }
+
+        let sweep = Arc::new(Sweep {
+            task,
+            max_connections_per_host: max_connections_per_host.max(1),
+            pool: WorkerPool::new("simply-sweep", threads),
+            scheduler: Mutex::new(Scheduler { pending, running: HashMap::new(), sender: Some(sender) }),
+        });
+        sweep.dispatch();
+        AccountSweep { sweep, results: Mutex::new(receiver) }
+    }
+
+    // Blocks until at least one account finished, or for at most `timeout_secs`, and returns the results available by then
+    // (an empty list on timeout). Returns None once the results of all accounts were returned, or all were cancelled.
+    pub fn wait(&self, timeout_secs: u32) -> Option<Vec<SweepResult>> {
+        let results = self.results.lock().unwrap();
+        let mut batch = match results.recv_timeout(Duration::from_secs(timeout_secs as u64)) {
+            Ok(result) => vec![result],
+            Err(RecvTimeoutError::Timeout) => return Some(Vec::new()),
+            Err(RecvTimeoutError::Disconnected) => return None,
+        };
+        batch.extend(results.try_iter());
+        Some(batch)
+    }
+
+    // Starts no further accounts; the results of those already started are still returned by wait().
+    pub fn cancel(&self) {
+        let mut scheduler = self.sweep.scheduler.lock().unwrap();
+        scheduler.pending.clear();
+        scheduler.sender = None;
+    }
+}
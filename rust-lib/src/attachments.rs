@@ -0,0 +1,90 @@
+// Attachments sent straight from files: each large file is memory-mapped and base64-encoded onto the wire a block at a time,
+// so that neither the file nor its encoding is ever copied into memory as a whole.
+// A mapped file must not be truncated while it is being sent: reading the missing pages faults (SIGBUS), ending the process.
+// cf. https://datatracker.ietf.org/doc/html/rfc2183
+
+use std::fs::File;
+use std::io::Read;
+use std::path::Path;
+
+use lettre::message::{Attachment as MimeAttachment, Body};
+use lettre::message::header::{ContentTransferEncoding, ContentType};
+use memmap2::Mmap;
+
+use crate::message_body::{encode_lines, encoded_length, Base64Slice};
+use crate::{header_section, SmtpError};
+
+// Smaller files are read and encoded right away instead of being mapped: this takes little memory,
+// and unlike a mapping, cannot fault if the file is truncated while the email is being sent.
+const MAP_MIN_LENGTH: u64 = 1024 * 1024;
+
+// A file to attach to an email, cf. simply_send_email_with_attachments()
+pub struct Attachment {
+    pub path: String,
+    pub content_type: String, // e.g. "application/pdf"
+    pub filename: Option<String>, // the name shown to the recipient, by default the file name of `path`
+}
+
+// An attachment ready to be written into any number of emails
+pub struct AttachmentPart {
+    headers: Vec<u8>,
+    content: Content,
+}
+
+enum Content {
+    Mapped(Mmap),
+    Encoded(Vec<u8>),
+}
+
+impl AttachmentPart {
+    pub fn open(attachment: &Attachment) -> Result<Self, SmtpError> {
+        let filename = match &attachment.filename {
+            Some(filename) => filename.clone(),
+            None => Path::new(&attachment.path).file_name().map(|name| name.to_string_lossy().into_owned()).unwrap_or_default(),
+        };
+        let content_type = ContentType::parse(&attachment.content_type).map_err(|_| SmtpError::InternalClientError)?;
+        // lettre formats the headers (and encodes the filename if need be), the body being left empty
+        let empty_body = Body::new_with_encoding(Vec::new(), ContentTransferEncoding::Base64).map_err(|_| SmtpError::InternalClientError)?;
+        let headers = header_section(&MimeAttachment::new(filename).body(empty_body, content_type).formatted()).to_vec();
+
+        let mut file = File::open(&attachment.path).map_err(|_| SmtpError::MessageBodyError)?;
+        let length = file.metadata().map_err(|_| SmtpError::MessageBodyError)?.len();
+        let content = if length < MAP_MIN_LENGTH {
+            let mut input = Vec::with_capacity(length as usize);
+            file.read_to_end(&mut input).map_err(|_| SmtpError::MessageBodyError)?;
+            Content::Encoded(encoded(&input))
+        } else {
+            // Safety: the file must not be truncated while it is being sent, or reading the mapping faults.
+            // This is documented for the callers of simply_send_email_with_attachments() and simply_send_batch_with_attachments().
+            let mapped = unsafe { Mmap::map(&file) }.map_err(|_| SmtpError::MessageBodyError)?;
+            #[cfg(unix)]
+            let _ = mapped.advise(memmap2::Advice::Sequential); // a hint for the kernel to read ahead, so failing is fine
+            Content::Mapped(mapped)
+        };
+        Ok(AttachmentPart { headers, content })
+    }
+
+    // Encodes the file once, so that attaching it to many emails doesn't encode it again for every one of them.
+    // Takes about 4/3 of the file's size in memory.
+    pub fn encode(&mut self) {
+        if let Content::Mapped(mapped) = &self.content {
+            self.content = Content::Encoded(encoded(mapped));
+        }
+    }
+
+    // The part as written into a multipart body: its headers, its base64-encoded content and the CRLF before the next delimiter
+    pub fn reader(&self) -> Box<dyn Read + '_> {
+        let content: Box<dyn Read + '_> = match &self.content {
+            Content::Mapped(mapped) => Box::new(Base64Slice::new(mapped)),
+            Content::Encoded(encoded) => Box::new(encoded.as_slice()),
+        };
+        Box::new(self.headers.as_slice().chain(content).chain(&b"\r\n"[..]))
+    }
+}
+
+// `input` encoded as base64 in CRLF-terminated lines
+fn encoded(input: &[u8]) -> Vec<u8> {
+    let mut encoded = String::with_capacity(encoded_length(input.len()));
+    encode_lines(input, &mut encoded);
+    encoded.into_bytes()
+}
@@ -0,0 +1,135 @@
+// A columnar layout for results with many records, e.g. the summaries of 100k messages.
+// Each field of all records is stored in a few contiguous buffers, so that the bindings lift a result with a handful
+// of bulk copies instead of one call per field and record, and can decode single values lazily.
+// All numbers are packed little-endian, like in pack_u32s().
+
+use std::collections::HashMap;
+
+use crate::{EmailAddress, MessageSummary};
+
+// One string-valued field of all records.
+pub struct StringColumn {
+    pub offsets: Vec<u8>, // count + 1 u32s; value i is data[offsets[i]..offsets[i + 1]]
+    pub data: Vec<u8>, // the UTF-8 encoded values one after another
+    pub present: Vec<u8>, // one byte per value, 0 if the value is None (its data being empty then)
+}
+
+impl StringColumn {
+    fn with_capacity(count: usize) -> Self {
+        let mut offsets = Vec::with_capacity((count + 1) * 4);
+        offsets.extend_from_slice(&0u32.to_le_bytes());
+        StringColumn { offsets, data: Vec::new(), present: Vec::with_capacity(count) }
+    }
+
+    fn push(&mut self, value: Option<&str>) {
+        self.data.extend_from_slice(value.unwrap_or_default().as_bytes());
+        self.offsets.extend_from_slice(&(self.data.len() as u32).to_le_bytes());
+        self.present.push(value.is_some() as u8);
+    }
+}
+
+// One u32-valued field of all records.
+pub struct U32Column {
+    pub values: Vec<u8>, // count u32s, 0 where the value is None
+    pub present: Vec<u8>,
+}
+
+impl U32Column {
+    fn with_capacity(count: usize) -> Self {
+        U32Column { values: Vec::with_capacity(count * 4), present: Vec::with_capacity(count) }
+    }
+
+    fn push(&mut self, value: Option<u32>) {
+        self.values.extend_from_slice(&value.unwrap_or_default().to_le_bytes());
+        self.present.push(value.is_some() as u8);
+    }
+}
+
+// One i64-valued field of all records.
+pub struct I64Column {
+    pub values: Vec<u8>, // count i64s, 0 where the value is None
+    pub present: Vec<u8>,
+}
+
+impl I64Column {
+    fn with_capacity(count: usize) -> Self {
+        I64Column { values: Vec::with_capacity(count * 8), present: Vec::with_capacity(count) }
+    }
+
+    fn push(&mut self, value: Option<i64>) {
+        self.values.extend_from_slice(&value.unwrap_or_default().to_le_bytes());
+        self.present.push(value.is_some() as u8);
+    }
+}
+
+// The same as a sequence<MessageSummary>, one column per field.
+// Address lists are flattened to what a message list shows: the name and address of the first sender,
+// and the addresses of all recipients, joined by ", ".
+pub struct SummaryColumns {
+    pub count: u32,
+    pub message: U32Column,
+    pub uid: U32Column,
+    pub size: U32Column,
+    pub internal_date: I64Column,
+    pub flags: StringColumn, // joined by " "
+    pub date: StringColumn,
+    pub subject: StringColumn,
+    pub from_name: StringColumn,
+    pub from_address: StringColumn,
+    pub to_addresses: StringColumn,
+    pub message_id: StringColumn,
+    pub in_reply_to: StringColumn,
+    pub headers: HashMap<String, StringColumn>, // the requested header_fields, keyed by their lower-cased name like MessageSummary::headers
+}
+
+fn address(address: &EmailAddress) -> String {
+    match (&address.mailbox, &address.host) {
+        (Some(mailbox), Some(host)) => format!("{mailbox}@{host}"),
+        (Some(mailbox), None) => mailbox.clone(),
+        (None, _) => String::new(),
+    }
+}
+
+impl SummaryColumns {
+    pub fn new(summaries: &[MessageSummary], header_fields: &[String]) -> Self {
+        let count = summaries.len();
+        let mut columns = SummaryColumns {
+            count: count as u32,
+            message: U32Column::with_capacity(count),
+            uid: U32Column::with_capacity(count),
+            size: U32Column::with_capacity(count),
+            internal_date: I64Column::with_capacity(count),
+            flags: StringColumn::with_capacity(count),
+            date: StringColumn::with_capacity(count),
+            subject: StringColumn::with_capacity(count),
+            from_name: StringColumn::with_capacity(count),
+            from_address: StringColumn::with_capacity(count),
+            to_addresses: StringColumn::with_capacity(count),
+            message_id: StringColumn::with_capacity(count),
+            in_reply_to: StringColumn::with_capacity(count),
+            headers: header_fields.iter().map(|field| (field.to_lowercase(), StringColumn::with_capacity(count))).collect(),
+        };
+
+        for summary in summaries {
+            let sender = summary.from_addresses.first();
+            let recipients: Vec<String> = summary.to_addresses.iter().map(address).collect();
+
+            columns.message.push(Some(summary.message));
+            columns.uid.push(summary.uid);
+            columns.size.push(summary.size);
+            columns.internal_date.push(summary.internal_date);
+            columns.flags.push(Some(summary.flags.join(" ").as_str()));
+            columns.date.push(summary.date.as_deref());
+            columns.subject.push(summary.subject.as_deref());
+            columns.from_name.push(sender.and_then(|sender| sender.name.as_deref()));
+            columns.from_address.push(sender.map(address).as_deref());
+            columns.to_addresses.push(Some(recipients.join(", ").as_str()));
+            columns.message_id.push(summary.message_id.as_deref());
+            columns.in_reply_to.push(summary.in_reply_to.as_deref());
+            for (field, column) in columns.headers.iter_mut() {
+                column.push(summary.headers.get(field).map(String::as_str));
+            }
+        }
+        columns
+    }
+}
@@ -0,0 +1,354 @@
+// COMPRESS=DEFLATE for IMAP connections [RFC 4978]: once the server has accepted the COMPRESS command,
+// both directions of the connection are a raw deflate stream, flushed after every command and every flight of responses.
+// Bulk fetches of text-heavy mail thereby move a fraction of the bytes over the network.
+// cf. https://datatracker.ietf.org/doc/html/rfc4978
+
+use std::io::{self, ErrorKind, Read, Write};
+use std::sync::Arc;
+use std::sync::atomic::{AtomicBool, AtomicU64, Ordering};
+
+use flate2::{Compress, Compression, Decompress, FlushCompress, FlushDecompress, Status};
+
+// how much compressed data is read, or collected before it is written, at a time
+const BUFFER_SIZE: usize = 64 * 1024;
+
+// The bytes sent and received over the connections of an ImapSession, before ("raw") and after ("wire") compression.
+// Without compression, both are the same.
+pub struct ImapTraffic {
+    pub compressed: bool, // whether the current connection is compressed
+    pub raw_bytes_sent: u64,
+    pub raw_bytes_received: u64,
+    pub wire_bytes_sent: u64,
+    pub wire_bytes_received: u64,
+}
+
+#[derive(Default)]
+pub(crate) struct TrafficCounters {
+    raw_sent: AtomicU64,
+    raw_received: AtomicU64,
+    wire_sent: AtomicU64,
+    wire_received: AtomicU64,
+}
+
+impl TrafficCounters {
+    pub(crate) fn to_imap_traffic(&self, compressed: bool) -> ImapTraffic {
+        ImapTraffic {
+            compressed,
+            raw_bytes_sent: self.raw_sent.load(Ordering::Relaxed),
+            raw_bytes_received: self.raw_received.load(Ordering::Relaxed),
+            wire_bytes_sent: self.wire_sent.load(Ordering::Relaxed),
+            wire_bytes_received: self.wire_received.load(Ordering::Relaxed),
+        }
+    }
+}
+
+// Turns on the compression of a CompressibleStream from outside, as imap::Client owns the stream.
+pub(crate) struct StreamControl {
+    compressed: AtomicBool,
+    counters: Arc<TrafficCounters>,
+}
+
+impl StreamControl {
+    pub(crate) fn new(counters: Arc<TrafficCounters>) -> Arc<Self> {
+        Arc::new(StreamControl { compressed: AtomicBool::new(false), counters })
+    }
+
+    // To be called once the server has accepted COMPRESS DEFLATE: everything sent or received afterwards is compressed.
+    pub(crate) fn start_compression(&self) {
+        self.compressed.store(true, Ordering::Release);
+    }
+
+    pub(crate) fn is_compressed(&self) -> bool {
+        self.compressed.load(Ordering::Acquire)
+    }
+}
+
+struct Deflate {
+    compress: Compress,
+    decompress: Decompress,
+    input: Vec<u8>, // received from the server
+    position: usize, // in `input`, up to which it has been decompressed
+    length: usize, // of the data in `input`
+    output: Vec<u8>, // compressed, but not yet written to the server
+}
+
+impl Deflate {
+    fn new() -> Box<Self> {
+        Box::new(Deflate {
+            // "raw" deflate without a zlib header, as RFC 4978 requires
+            compress: Compress::new(Compression::default(), false),
+            decompress: Decompress::new(false),
+            input: vec![0; BUFFER_SIZE],
+            position: 0,
+            length: 0,
+            output: Vec::with_capacity(BUFFER_SIZE),
+        })
+    }
+
+    // Compresses all of `input` into `output`.
+    fn compress(&mut self, mut input: &[u8], flush: FlushCompress) -> io::Result<()> {
+        loop {
+            if self.output.capacity() - self.output.len() < 64 {
+                self.output.reserve(BUFFER_SIZE);
+            }
+            let total_in = self.compress.total_in();
+            self.compress.compress_vec(input, &mut self.output, flush)
+                .map_err(|error| io::Error::new(ErrorKind::Other, error))?;
+            input = &input[(self.compress.total_in() - total_in) as usize..];
+            // the compressor is done (including any flush) once it leaves room in `output`
+            if input.is_empty() && self.output.len() < self.output.capacity() {
+                return Ok(());
+            }
+        }
+    }
+}
+
+// The stream of an IMAP connection, which starts out uncompressed and switches to deflate when told to by its StreamControl.
+pub(crate) struct CompressibleStream<S> {
+    inner: S,
+    control: Arc<StreamControl>,
+    deflate: Option<Box<Deflate>>,
+}
+
+impl<S> CompressibleStream<S> {
+    pub(crate) fn new(inner: S, control: Arc<StreamControl>) -> Self {
+        CompressibleStream { inner, control, deflate: None }
+    }
+
+    fn start_deflate(&mut self) {
+        if self.deflate.is_none() && self.control.is_compressed() {
+            self.deflate = Some(Deflate::new());
+        }
+    }
+}
+
+impl<S: Read> Read for CompressibleStream<S> {
+    fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+        self.start_deflate();
+        let counters = &self.control.counters;
+        let deflate = match self.deflate.as_mut() {
+            Some(deflate) if !buf.is_empty() => deflate,
+            _ => {
+                let read = self.inner.read(buf)?;
+                counters.wire_received.fetch_add(read as u64, Ordering::Relaxed);
+                counters.raw_received.fetch_add(read as u64, Ordering::Relaxed);
+                return Ok(read);
+            },
+        };
+
+        loop {
+            // the decompressor may hold back output that didn't fit into `buf` even after it took all of `input`
+            let (total_in, total_out) = (deflate.decompress.total_in(), deflate.decompress.total_out());
+            let status = deflate.decompress.decompress(&deflate.input[deflate.position..deflate.length], buf, FlushDecompress::None)
+                .map_err(|error| io::Error::new(ErrorKind::InvalidData, error))?;
+            deflate.position += (deflate.decompress.total_in() - total_in) as usize;
+            let decompressed = (deflate.decompress.total_out() - total_out) as usize;
+            if decompressed > 0 || status == Status::StreamEnd {
+                counters.raw_received.fetch_add(decompressed as u64, Ordering::Relaxed);
+                return Ok(decompressed);
+            }
+
+            // so we only wait for more data from the server once nothing is left to decompress
+            if deflate.position == deflate.length {
+                let read = self.inner.read(&mut deflate.input)?;
+                if read == 0 {
+                    return Ok(0);
+                }
+                counters.wire_received.fetch_add(read as u64, Ordering::Relaxed);
+                deflate.position = 0;
+                deflate.length = read;
+            }
+        }
+    }
+}
+
+impl<S: Write> Write for CompressibleStream<S> {
+    fn write(&mut self, buf: &[u8]) -> io::Result<usize> {
+        self.start_deflate();
+        let counters = &self.control.counters;
+        match self.deflate.as_mut() {
+            None => {
+                let written = self.inner.write(buf)?;
+                counters.wire_sent.fetch_add(written as u64, Ordering::Relaxed);
+                counters.raw_sent.fetch_add(written as u64, Ordering::Relaxed);
+                Ok(written)
+            },
+            Some(deflate) => {
+                deflate.compress(buf, FlushCompress::None)?;
+                counters.raw_sent.fetch_add(buf.len() as u64, Ordering::Relaxed);
+                if deflate.output.len() >= BUFFER_SIZE {
+                    self.inner.write_all(&deflate.output)?;
+                    counters.wire_sent.fetch_add(deflate.output.len() as u64, Ordering::Relaxed);
+                    deflate.output.clear();
+                }
+                Ok(buf.len())
+            },
+        }
+    }
+
+    // imap flushes after every command, which is when the server has to be able to decompress all of it
+    fn flush(&mut self) -> io::Result<()> {
+        if let Some(deflate) = self.deflate.as_mut() {
+            deflate.compress(&[], FlushCompress::Sync)?;
+            self.inner.write_all(&deflate.output)?;
+            self.control.counters.wire_sent.fetch_add(deflate.output.len() as u64, Ordering::Relaxed);
+            deflate.output.clear();
+        }
+        self.inner.flush()
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use std::io::Cursor;
+
+    use super::*;
+
+    // An in-memory connection: reads come from `incoming`, writes go to `outgoing`.
+    struct Pipe {
+        incoming: Cursor<Vec<u8>>,
+        outgoing: Vec<u8>,
+    }
+
+    impl Read for Pipe {
+        fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+            self.incoming.read(buf)
+        }
+    }
+
+    impl Write for Pipe {
+        fn write(&mut self, buf: &[u8]) -> io::Result<usize> {
+            self.outgoing.extend_from_slice(buf);
+            Ok(buf.len())
+        }
+
+        fn flush(&mut self) -> io::Result<()> {
+            Ok(())
+        }
+    }
+
+    fn compressed_stream(incoming: Vec<u8>) -> CompressibleStream<Pipe> {
+        let control = StreamControl::new(Arc::new(TrafficCounters::default()));
+        control.start_compression();
+        CompressibleStream::new(Pipe { incoming: Cursor::new(incoming), outgoing: Vec::new() }, control)
+    }
+
+    // Text that compresses well, interspersed with bytes that hardly compress at all
+    fn message(length: usize) -> Vec<u8> {
+        let mut state: u32 = 12345;
+        (0..length).map(|index| {
+            state = state.wrapping_mul(1103515245).wrapping_add(12345);
+            if index % 100 < 50 { b"Lorem ipsum dolor sit amet\r\n"[index % 28] } else { (state >> 16) as u8 }
+        }).collect()
+    }
+
+    // What a server sends for `responses`: a raw deflate stream, flushed after each of them
+    fn deflated(responses: &[&[u8]]) -> Vec<u8> {
+        let mut compress = Compress::new(Compression::default(), false);
+        let mut output = Vec::new();
+        for response in responses {
+            let mut input = *response;
+            loop {
+                output.reserve(BUFFER_SIZE);
+                let total_in = compress.total_in();
+                compress.compress_vec(input, &mut output, FlushCompress::Sync).unwrap();
+                input = &input[(compress.total_in() - total_in) as usize..];
+                if input.is_empty() && output.len() < output.capacity() {
+                    break;
+                }
+            }
+        }
+        output
+    }
+
+    // Decompresses all of `input`, which must leave nothing pending
+    fn inflate(decompress: &mut Decompress, mut input: &[u8]) -> Vec<u8> {
+        let mut output = Vec::new();
+        loop {
+            output.reserve(BUFFER_SIZE);
+            let total_in = decompress.total_in();
+            decompress.decompress_vec(input, &mut output, FlushDecompress::None).unwrap();
+            input = &input[(decompress.total_in() - total_in) as usize..];
+            if input.is_empty() && output.len() < output.capacity() {
+                return output;
+            }
+        }
+    }
+
+    fn read_to_end(stream: &mut CompressibleStream<Pipe>, buffer_size: usize) -> Vec<u8> {
+        let mut buffer = vec![0; buffer_size];
+        let mut all = Vec::new();
+        loop {
+            let read = stream.read(&mut buffer).unwrap();
+            if read == 0 {
+                return all;
+            }
+            all.extend_from_slice(&buffer[..read]);
+        }
+    }
+
+    #[test]
+    fn every_flushed_command_can_be_decompressed_on_its_own() {
+        let mut stream = compressed_stream(Vec::new());
+        let mut server = Decompress::new(false);
+        let append = [&b"a2 APPEND INBOX {300000}\r\n"[..], &message(300_000), b"\r\n"].concat();
+        let commands: [&[u8]; 3] = [b"a1 NOOP\r\n", &append, b"a3 LOGOUT\r\n"];
+        for command in commands {
+            // written in pieces, as imap does
+            for piece in command.chunks(1000) {
+                stream.write_all(piece).unwrap();
+            }
+            stream.flush().unwrap();
+            let sent = std::mem::take(&mut stream.inner.outgoing);
+            assert!(!sent.is_empty());
+            assert_eq!(inflate(&mut server, &sent), command);
+        }
+    }
+
+    #[test]
+    fn reads_larger_than_the_buffer() {
+        let response = message(5 * BUFFER_SIZE);
+        let incoming = deflated(&[&response]);
+        assert!(incoming.len() > BUFFER_SIZE);
+        let mut stream = compressed_stream(incoming);
+        assert_eq!(read_to_end(&mut stream, 8 * BUFFER_SIZE), response);
+    }
+
+    #[test]
+    fn reads_into_a_buffer_smaller_than_the_pending_output() {
+        let responses = [&b"* 1 EXISTS\r\n"[..], b"a1 OK NOOP completed\r\n", &message(100_000)];
+        let mut stream = compressed_stream(deflated(&responses));
+        assert_eq!(read_to_end(&mut stream, 7), responses.concat());
+    }
+
+    #[test]
+    fn counts_raw_and_wire_bytes() {
+        let greeting = b"* OK IMAP4rev1 ready\r\na1 OK COMPRESS active\r\n";
+        let response = message(200_000);
+        let incoming = [&greeting[..], &deflated(&[&response])].concat();
+        let control = StreamControl::new(Arc::new(TrafficCounters::default()));
+        let mut stream = CompressibleStream::new(Pipe { incoming: Cursor::new(incoming.clone()), outgoing: Vec::new() }, Arc::clone(&control));
+
+        // uncompressed until the server has accepted COMPRESS
+        stream.write_all(b"a1 COMPRESS DEFLATE\r\n").unwrap();
+        stream.flush().unwrap();
+        let mut uncompressed = vec![0; greeting.len()];
+        stream.read_exact(&mut uncompressed).unwrap();
+        let traffic = control.counters.to_imap_traffic(false);
+        assert_eq!((traffic.raw_bytes_sent, traffic.wire_bytes_sent), (21, 21));
+        assert_eq!((traffic.raw_bytes_received, traffic.wire_bytes_received), (greeting.len() as u64, greeting.len() as u64));
+
+        control.start_compression();
+        let command = [&b"a2 APPEND INBOX {200000}\r\n"[..], &response, b"\r\n"].concat();
+        stream.write_all(&command).unwrap();
+        stream.flush().unwrap();
+        assert_eq!(read_to_end(&mut stream, 1000), response);
+        let traffic = control.counters.to_imap_traffic(true);
+        assert_eq!(traffic.raw_bytes_sent, 21 + command.len() as u64);
+        assert_eq!(traffic.wire_bytes_sent, stream.inner.outgoing.len() as u64);
+        assert!(traffic.wire_bytes_sent < traffic.raw_bytes_sent);
+        assert_eq!(traffic.raw_bytes_received, (greeting.len() + response.len()) as u64);
+        assert_eq!(traffic.wire_bytes_received, incoming.len() as u64);
+        assert!(traffic.wire_bytes_received < traffic.raw_bytes_received);
+    }
+}
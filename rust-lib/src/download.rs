@@ -0,0 +1,40 @@
+// Downloads of large messages in fixed-size chunks with BODY.PEEK[]<offset.length>, so that only one chunk is held in
+// memory at a time, and a download interrupted by a lost connection continues after the last chunk instead of starting over.
+// cf. https://datatracker.ietf.org/doc/html/rfc3501#section-6.4.5
+
+// Receives the chunks of a message in order, cf. ImapSession::download_message()
+pub trait MessageChunkSink: Send + Sync {
+    // `chunk` starts at byte `offset` of the message, whose size is `size` as reported by the server.
+    // The last chunk is shorter than the chunk size, possibly empty, and its `size` is exact.
+    fn write_chunk(&self, offset: u64, chunk: Vec<u8>, size: u64);
+}
+
+// Told about the progress of ImapSession::download_message_to_file() after every chunk
+pub trait DownloadProgress: Send + Sync {
+    fn on_progress(&self, downloaded: u64, size: u64);
+}
+
+// e.g. "(RFC822.SIZE BODY.PEEK[]<1048576.1048576>)"; PEEK leaves the \Seen flag alone
+pub(crate) fn chunk_query(offset: u64, chunk_size: u32) -> String {
+    format!("(RFC822.SIZE BODY.PEEK[]<{}.{}>)", offset, chunk_size)
+}
+
+// Fetches chunks from `offset` on until the server returns a short (possibly empty) one, handing each to `write`,
+// and returns the size of the message.
+// `fetch` returns the chunk at an offset along with the message's RFC822.SIZE. The latter is only used for the progress,
+// as some servers report a size slightly different from that of the message they send.
+pub(crate) fn download_chunks<E>(mut offset: u64, chunk_size: u32,
+    mut fetch: impl FnMut(u64) -> Result<(Vec<u8>, Option<u32>), E>,
+    mut write: impl FnMut(u64, Vec<u8>, u64) -> Result<(), E>) -> Result<u64, E> {
+    loop {
+        let (chunk, size) = fetch(offset)?;
+        let length = chunk.len() as u64;
+        let complete = length < chunk_size as u64;
+        let size = if complete { offset + length } else { size.map_or(0, u64::from).max(offset + length) };
+        write(offset, chunk, size)?;
+        offset += length;
+        if complete {
+            return Ok(offset);
+        }
+    }
+}
@@ -2,7 +2,22 @@ uniffi::include_scaffolding!("rust-lib");
 
 use thiserror::Error;
 use std::collections::HashMap;
-use std::net::TcpStream;
+use std::fs::{File, OpenOptions};
+use std::io::{self, Read, Write};
+use std::net::{TcpStream, ToSocketAddrs};
+use std::sync::{Arc, Mutex, OnceLock};
+use std::sync::atomic::{AtomicU32, Ordering};
+use std::time::Duration;
+
+// the prefix uniffi gives the names of the FFI functions, as a C string, written by build.rs
+static FFI_NAMESPACE: &[u8] = include_bytes!(concat!(env!("OUT_DIR"), "/ffi_namespace"));
+
+/// Returns the prefix of the names of the FFI functions (e.g. `rust_lib_1a2b`) as a C string.
+/// It contains a checksum of the UDL, so the hand-maintained Python bindings look it up here.
+#[no_mangle]
+pub extern "C" fn rust_lib_ffi_namespace() -> *const std::os::raw::c_char {
+    FFI_NAMESPACE.as_ptr().cast()
+}
 
 // ***** IMAP: *****
 
@@ -12,6 +27,20 @@ use imap::Session;
 extern crate native_tls;
 use native_tls::TlsStream;
 
+mod tls;
+use tls::{simply_configure_tls, tls_connector, TlsConfigError, TlsOptions};
+
+mod metrics;
+use metrics::{simply_metrics_snapshot, simply_reset_metrics, simply_set_metrics_enabled,
+    CountingStream, LatencyHistogram, MetricsPhase, OperationStats, PhaseLatency};
+
+mod compression;
+use compression::{CompressibleStream, ImapTraffic, StreamControl, TrafficCounters};
+
+// the IMAP connection of a Session, counting the bytes that go over it for the metrics,
+// which are the compressed ones once COMPRESS=DEFLATE is active
+type ImapStream = CompressibleStream<CountingStream<TlsStream<TcpStream>>>;
+
 // A simplified wrapper for imap::error::Error
 // cf. https://docs.rs/imap/2.4.1/imap/error/enum.Error.html
 #[derive(Error, Debug)]
@@ -55,18 +84,44 @@ impl From<imap::Error> for ImapError {
     }
 }
 
-fn get_imap_session(domain: &str, port: u16, username: &str, password: &str) -> Result<Session<TlsStream<TcpStream>>, imap::Error> {
-	//let domain = "imap.example.com";
-    let tls = native_tls::TlsConnector::builder().build().unwrap();
+// How long a single read or write may block before the call fails with a timeout, e.g. when the server stopped responding.
+pub(crate) const IO_TIMEOUT: Duration = Duration::from_secs(60);
+
+pub(crate) fn set_io_timeouts(tcp_stream: &TcpStream) -> io::Result<()> {
+    tcp_stream.set_read_timeout(Some(IO_TIMEOUT))?;
+    tcp_stream.set_write_timeout(Some(IO_TIMEOUT))
+}
 
-    // we pass in the domain twice to check that the server's TLS
+// Like imap::connect(), but timing DNS, TCP connect, TLS handshake and greeting separately.
+// `stream_control` can turn on compression later on, cf. start_compression().
+fn connect_imap(domain: &str, port: u16, stream_control: Arc<StreamControl>) -> Result<imap::Client<ImapStream>, imap::Error> {
+    let tls = tls_connector()?;
+    let addresses: Vec<_> = metrics::phase(MetricsPhase::Dns, || (domain, port).to_socket_addrs())?.collect();
+    let tcp_stream = metrics::phase(MetricsPhase::TcpConnect, || TcpStream::connect(&addresses[..]))?;
+    set_io_timeouts(&tcp_stream)?;
+
+    // we pass in the domain to check that the server's TLS
     // certificate is valid for the domain we're connecting to.
-    let client = imap::connect((domain, port), domain, &tls).unwrap();
+    let tls_stream = metrics::phase(MetricsPhase::TlsHandshake, || tls.connect(domain, tcp_stream))
+        .map_err(imap::Error::TlsHandshake)?;
+
+    let mut client = imap::Client::new(CompressibleStream::new(CountingStream::new(tls_stream), stream_control));
+    metrics::phase(MetricsPhase::Greeting, || client.read_greeting())?;
+    Ok(client)
+}
+
+fn get_imap_session(domain: &str, port: u16, username: &str, password: &str) -> Result<Session<ImapStream>, imap::Error> {
+    open_imap_session(domain, port, username, password, StreamControl::new(Arc::default()))
+}
+
+fn open_imap_session(domain: &str, port: u16, username: &str, password: &str,
+    stream_control: Arc<StreamControl>) -> Result<Session<ImapStream>, imap::Error> {
+	//let domain = "imap.example.com";
+    let client = connect_imap(domain, port, stream_control)?;
 
     // the client we have here is unauthenticated.
     // to do anything useful with the e-mails, we need to log in
-    let imap_session = client
-        .login(username, password) // .login("me@example.com", "password")
+    let imap_session = metrics::phase(MetricsPhase::Authenticate, || client.login(username, password)) // .login("me@example.com", "password")
         // .login() returns a Result<Session<T>, (imap::Error, Client<T>)>
         .map_err(|e| e.0);
 
@@ -88,71 +143,714 @@ impl imap::Authenticator for GmailOAuth2 {
         )
     }
 }
-fn get_imap_session_gmail_oauth2(username: &str, access_token: &str) -> Result<Session<TlsStream<TcpStream>>, imap::Error> {
-    let tls = native_tls::TlsConnector::builder().build().unwrap();
-
+fn get_imap_session_gmail_oauth2(username: &str, access_token: &str) -> Result<Session<ImapStream>, imap::Error> {
     //let client = imap::ClientBuilder::new("imap.gmail.com", 993).connect().expect("Could not connect to imap.gmail.com");
-    let domain = "imap.gmail.com";
-    let port = 993;
-    // we pass in the domain twice to check that the server's TLS
-    // certificate is valid for the domain we're connecting to.
-    let client = imap::connect((domain, port), domain, &tls).unwrap();
+    let client = connect_imap("imap.gmail.com", 993, StreamControl::new(Arc::default()))?;
 
 	let gmail_auth = GmailOAuth2 {
 	    user: String::from(username), //user: String::from("sombody@gmail.com"),
 	    access_token: String::from(access_token), //access_token: String::from("<access_token>"),
     };
 
-    let imap_session = client.authenticate("XOAUTH2", &gmail_auth)
+    let imap_session = metrics::phase(MetricsPhase::Authenticate, || client.authenticate("XOAUTH2", &gmail_auth))
     	.map_err(|e| e.0);
 
     return imap_session
 }
 
 pub fn simply_check_imap(domain: &str, port: u16, username: &str, password: &str) -> Result<(), ImapError> {
-    match get_imap_session(domain, port, username, password) {
-    	Ok(mut imap_session) => { // If establishing a session was successful ...
-    		imap_session.logout()?; // ...logout again...
-    		return Ok(()) // ...and return OK.
-    	},
-    	Err(err) => return Err(err.into()), // If not, return the error.
-    }
+    metrics::operation("simply_check_imap", || {
+        match get_imap_session(domain, port, username, password) {
+        	Ok(mut imap_session) => { // If establishing a session was successful ...
+        		metrics::phase(MetricsPhase::Logout, || imap_session.logout())?; // ...logout again...
+        		return Ok(()) // ...and return OK.
+        	},
+        	Err(err) => return Err(err.into()), // If not, return the error.
+        }
+    })
 }
 
 // cf. https://crates.io/crates/imap/2.4.1
+// Emails that aren't valid UTF-8, e.g. 8-bit ones in a legacy charset, have the offending bytes replaced by U+FFFD;
+// use simply_fetch_inbox_top_bytes() to decode them yourself.
 pub fn simply_fetch_inbox_top(domain: &str, port: u16, username: &str, password: &str) -> Result<Option<String>, ImapError> { // -> imap::error::Result<Option<String>>
-    let mut imap_session = get_imap_session(domain, port, username, password)?;
-
-    // we want to fetch the first email in the INBOX mailbox
-    imap_session.select("INBOX")?;
-
-    // fetch message number 1 in this mailbox, along with its RFC822 field.
-    // RFC 822 dictates the format of the body of e-mails
-    let messages = imap_session.fetch("1", "RFC822")?;
-    let message = if let Some(m) = messages.iter().next() {
-        m
-    } else {
-        return Ok(None);
-    };
+    let body = metrics::operation("simply_fetch_inbox_top", || simply_fetch_inbox_top_bytes(domain, port, username, password))?;
+    // String::from_utf8() takes over the buffer of a valid body instead of copying it
+    Ok(body.map(|body| String::from_utf8(body).unwrap_or_else(|err| String::from_utf8_lossy(err.as_bytes()).into_owned())))
+}
+
+// Like simply_fetch_inbox_top(), but returns the raw RFC822 bytes of the email, without any UTF-8 validation.
+pub fn simply_fetch_inbox_top_bytes(domain: &str, port: u16, username: &str, password: &str) -> Result<Option<Vec<u8>>, ImapError> {
+    metrics::operation("simply_fetch_inbox_top_bytes", || {
+        let mut imap_session = get_imap_session(domain, port, username, password)?;
+
+        // we want to fetch the first email in the INBOX mailbox
+        metrics::phase(MetricsPhase::Select, || imap_session.select("INBOX"))?;
+
+        // fetch message number 1 in this mailbox, along with its RFC822 field.
+        // RFC 822 dictates the format of the body of e-mails
+        let messages = metrics::phase(MetricsPhase::Fetch, || imap_session.fetch("1", "RFC822"))?;
+        let message = if let Some(m) = messages.iter().next() {
+            m
+        } else {
+            return Ok(None);
+        };
+
+        // extract the message's body
+        let body = message.body().ok_or(ImapError::ParseError)?.to_vec();
+
+        // be nice to the server and log out
+        metrics::phase(MetricsPhase::Logout, || imap_session.logout())?;
+
+        Ok(Some(body))
+    })
+}
+
+// Fetches many messages with a single FETCH (or UID FETCH) command, all results being returned at once.
+// e.g. simply_fetch_messages(..., "INBOX", "1:500", "(UID FLAGS RFC822.SIZE RFC822)", false)
+pub fn simply_fetch_messages(domain: &str, port: u16, username: &str, password: &str,
+    mailbox: &str, sequence_set: &str, items: &str, uid: bool) -> Result<Vec<ImapMessage>, ImapError> {
+    metrics::operation("simply_fetch_messages", || {
+        let mut imap_session = get_imap_session(domain, port, username, password)?;
+        metrics::phase(MetricsPhase::Select, || imap_session.select(mailbox))?;
+
+        let messages = metrics::phase(MetricsPhase::Fetch, || if uid {
+            imap_session.uid_fetch(sequence_set, items)
+        } else {
+            imap_session.fetch(sequence_set, items)
+        })?;
+        let messages = messages.iter().map(ImapMessage::from).collect();
+
+        metrics::phase(MetricsPhase::Logout, || imap_session.logout())?;
+
+        Ok(messages)
+    })
+}
+
+// Fetches just enough of many messages to render a message list: no bodies are downloaded.
+// `header_fields` are additional header fields to fetch, e.g. ["List-Unsubscribe"].
+// BODY.PEEK[...] is used, so the \Seen flag of the messages is left untouched.
+pub fn simply_fetch_summaries(domain: &str, port: u16, username: &str, password: &str,
+    mailbox: &str, sequence_set: &str, header_fields: Vec<String>, uid: bool) -> Result<Vec<MessageSummary>, ImapError> {
+    metrics::operation("simply_fetch_summaries", || {
+        let mut imap_session = get_imap_session(domain, port, username, password)?;
+        metrics::phase(MetricsPhase::Select, || imap_session.select(mailbox))?;
+
+        let query = summary_query(&header_fields);
+        let messages = metrics::phase(MetricsPhase::Fetch, || if uid {
+            imap_session.uid_fetch(sequence_set, &query)
+        } else {
+            imap_session.fetch(sequence_set, &query)
+        })?;
+        let summaries = messages.iter().map(MessageSummary::from).collect();
+
+        metrics::phase(MetricsPhase::Logout, || imap_session.logout())?;
+
+        Ok(summaries)
+    })
+}
+
+// Packs ascending numbers as consecutive little-endian u32s, 4 bytes per number.
+// Lifting this as a single byte buffer (e.g. into Python's array('I')) is far cheaper than lifting a sequence<u32>.
+fn pack_u32s(numbers: impl IntoIterator<Item = u32>) -> Vec<u8> {
+    let mut numbers: Vec<u32> = numbers.into_iter().collect();
+    numbers.sort_unstable();
+    let mut packed = Vec::with_capacity(numbers.len() * 4);
+    for number in numbers {
+        packed.extend_from_slice(&number.to_le_bytes());
+    }
+    packed
+}
+
+// Searches `mailbox` on the server, e.g. simply_search(..., "INBOX", "UNSEEN SINCE 1-Feb-2024"),
+// and returns the sequence numbers of the matching messages in ascending order, packed as by pack_u32s().
+// cf. https://datatracker.ietf.org/doc/html/rfc3501#section-6.4.4
+pub fn simply_search(domain: &str, port: u16, username: &str, password: &str,
+    mailbox: &str, criteria: &str) -> Result<Vec<u8>, ImapError> {
+    metrics::operation("simply_search", || {
+        let mut imap_session = get_imap_session(domain, port, username, password)?;
+        // read-only, so that searching doesn't clear the \Recent flags
+        metrics::phase(MetricsPhase::Select, || imap_session.examine(mailbox))?;
+        let sequence_numbers = metrics::phase(MetricsPhase::Search, || imap_session.search(criteria))?;
+        metrics::phase(MetricsPhase::Logout, || imap_session.logout())?;
+        Ok(pack_u32s(sequence_numbers))
+    })
+}
+
+// Like simply_search(), but returns UIDs.
+pub fn simply_uid_search(domain: &str, port: u16, username: &str, password: &str,
+    mailbox: &str, criteria: &str) -> Result<Vec<u8>, ImapError> {
+    metrics::operation("simply_uid_search", || {
+        let mut imap_session = get_imap_session(domain, port, username, password)?;
+        metrics::phase(MetricsPhase::Select, || imap_session.examine(mailbox))?;
+        let uids = metrics::phase(MetricsPhase::Search, || imap_session.uid_search(criteria))?;
+        metrics::phase(MetricsPhase::Logout, || imap_session.logout())?;
+        Ok(pack_u32s(uids))
+    })
+}
+
+// ***** IMAP session: *****
+
+// represents an imap::types::Mailbox, as returned by SELECT
+// cf. https://docs.rs/imap/2.4.1/imap/types/struct.Mailbox.html
+pub struct MailboxInfo {
+    pub exists: u32,
+    pub recent: u32,
+    pub unseen: Option<u32>,
+    pub uid_next: Option<u32>,
+    pub uid_validity: Option<u32>,
+    pub flags: Vec<String>,
+}
+
+impl From<imap::types::Mailbox> for MailboxInfo {
+    fn from(mailbox: imap::types::Mailbox) -> Self {
+        MailboxInfo {
+            exists: mailbox.exists,
+            recent: mailbox.recent,
+            unseen: mailbox.unseen,
+            uid_next: mailbox.uid_next,
+            uid_validity: mailbox.uid_validity,
+            flags: mailbox.flags.iter().map(|flag| flag.to_string()).collect(),
+        }
+    }
+}
+
+// represents an imap::types::Fetch, i.e. a single message returned by a FETCH command
+// cf. https://docs.rs/imap/2.4.1/imap/types/struct.Fetch.html
+pub struct ImapMessage {
+    pub message: u32,
+    pub uid: Option<u32>,
+    pub size: Option<u32>,
+    pub flags: Vec<String>,
+    pub body: Option<Vec<u8>>, // the raw RFC822 body, if it was requested
+}
+
+impl From<&imap::types::Fetch> for ImapMessage {
+    fn from(fetch: &imap::types::Fetch) -> Self {
+        ImapMessage {
+            message: fetch.message,
+            uid: fetch.uid,
+            size: fetch.size,
+            flags: fetch.flags().iter().map(|flag| flag.to_string()).collect(),
+            body: fetch.body().map(|body| body.to_vec()),
+        }
+    }
+}
+
+// represents an address of an imap_proto::types::Envelope, e.g. "Jane Doe <jane@example.com>"
+pub struct EmailAddress {
+    pub name: Option<String>,
+    pub mailbox: Option<String>, // the part before the "@"
+    pub host: Option<String>, // the part after the "@"
+}
+
+// A message as it is shown in a message list, cf. simply_fetch_summaries()
+// `subject` and the address names are returned as sent, i.e. possibly still RFC 2047 encoded ("=?UTF-8?Q?...?=").
+pub struct MessageSummary {
+    pub message: u32,
+    pub uid: Option<u32>,
+    pub size: Option<u32>,
+    pub flags: Vec<String>,
+    pub internal_date: Option<i64>, // when the server received the message, in seconds since the Unix epoch
+    pub date: Option<String>, // the Date header
+    pub subject: Option<String>,
+    pub from_addresses: Vec<EmailAddress>,
+    pub reply_to_addresses: Vec<EmailAddress>,
+    pub to_addresses: Vec<EmailAddress>,
+    pub cc_addresses: Vec<EmailAddress>,
+    pub message_id: Option<String>,
+    pub in_reply_to: Option<String>,
+    pub headers: HashMap<String, String>, // the additionally requested header fields, keyed by their lower-cased name
+}
+
+fn summary_query(header_fields: &[String]) -> String {
+    // cf. https://datatracker.ietf.org/doc/html/rfc3501#section-6.4.5
+    let mut query = String::from("(UID FLAGS RFC822.SIZE INTERNALDATE ENVELOPE");
+    if !header_fields.is_empty() {
+        query.push_str(&format!(" BODY.PEEK[HEADER.FIELDS ({})]", header_fields.join(" ")));
+    }
+    query.push(')');
+    query
+}
+
+fn decode_nstring<T: AsRef<[u8]>>(value: &Option<T>) -> Option<String> {
+    value.as_ref().map(|value| String::from_utf8_lossy(value.as_ref()).into_owned())
+}
+
+// Parses "Name: value" lines, unfolding values that span multiple lines, cf. https://datatracker.ietf.org/doc/html/rfc5322#section-2.2.3
+// If a field occurs more than once, its first occurrence is kept.
+fn parse_header_fields(header: &[u8]) -> HashMap<String, String> {
+    let mut fields: Vec<(String, String)> = Vec::new();
+    for line in String::from_utf8_lossy(header).split("\r\n") {
+        if line.starts_with(|c: char| c == ' ' || c == '\t') {
+            if let Some((_, value)) = fields.last_mut() {
+                value.push(' ');
+                value.push_str(line.trim());
+            }
+        } else if let Some((name, value)) = line.split_once(':') {
+            fields.push((name.trim().to_lowercase(), value.trim().to_string()));
+        }
+    }
+    let mut headers = HashMap::with_capacity(fields.len());
+    for (name, value) in fields {
+        headers.entry(name).or_insert(value);
+    }
+    headers
+}
+
+impl From<&imap::types::Fetch> for MessageSummary {
+    fn from(fetch: &imap::types::Fetch) -> Self {
+        let envelope = fetch.envelope();
+        // the address lists of the envelope, e.g. addresses!(from)
+        macro_rules! addresses {
+            ($field:ident) => {
+                envelope.and_then(|envelope| envelope.$field.as_ref()).map_or_else(Vec::new, |addresses| {
+                    addresses.iter().map(|address| EmailAddress {
+                        name: decode_nstring(&address.name),
+                        mailbox: decode_nstring(&address.mailbox),
+                        host: decode_nstring(&address.host),
+                    }).collect()
+                })
+            };
+        }
+
+        MessageSummary {
+            message: fetch.message,
+            uid: fetch.uid,
+            size: fetch.size,
+            flags: fetch.flags().iter().map(|flag| flag.to_string()).collect(),
+            internal_date: fetch.internal_date().map(|date| date.timestamp()),
+            date: envelope.and_then(|envelope| decode_nstring(&envelope.date)),
+            subject: envelope.and_then(|envelope| decode_nstring(&envelope.subject)),
+            from_addresses: addresses!(from),
+            reply_to_addresses: addresses!(reply_to),
+            to_addresses: addresses!(to),
+            cc_addresses: addresses!(cc),
+            message_id: envelope.and_then(|envelope| decode_nstring(&envelope.message_id)),
+            in_reply_to: envelope.and_then(|envelope| decode_nstring(&envelope.in_reply_to)),
+            headers: fetch.header().map(parse_header_fields).unwrap_or_default(),
+        }
+    }
+}
+
+struct ImapSessionState {
+    session: Option<Session<ImapStream>>, // None after a logout or a lost connection
+    stream_control: Arc<StreamControl>, // of the connection of `session`
+    selected_mailbox: Option<String>, // re-selected after reconnecting
+    compression: bool, // negotiated again after reconnecting, cf. ImapSession::enable_compression()
+}
+
+// Turns on COMPRESS=DEFLATE [RFC 4978] if the server advertises it, returning whether the connection is compressed.
+fn start_compression(session: &mut Session<ImapStream>, stream_control: &StreamControl) -> imap::error::Result<bool> {
+    if stream_control.is_compressed() {
+        return Ok(true);
+    }
+    if !session.capabilities()?.has_str("COMPRESS=DEFLATE") {
+        return Ok(false);
+    }
+    session.run_command_and_check_ok("COMPRESS DEFLATE")?;
+    stream_control.start_compression();
+    Ok(true)
+}
+
+// A long-lived, authenticated IMAP connection that can be shared across threads.
+// Unlike simply_check_imap() and simply_fetch_inbox_top(), which connect and log in on every call,
+// all methods of an ImapSession reuse the same connection and transparently reconnect when it was lost.
+pub struct ImapSession {
+    domain: String,
+    port: u16,
+    username: String,
+    password: String,
+    traffic: Arc<TrafficCounters>, // of all connections of the session
+    state: Mutex<ImapSessionState>,
+}
+
+impl ImapSession {
+    pub fn new(domain: String, port: u16, username: String, password: String) -> Result<Self, ImapError> {
+        let traffic = Arc::new(TrafficCounters::default());
+        let stream_control = StreamControl::new(traffic.clone());
+        let session = metrics::operation("ImapSession.new", || open_imap_session(&domain, port, &username, &password, stream_control.clone()))?;
+        Ok(ImapSession {
+            domain,
+            port,
+            username,
+            password,
+            traffic,
+            state: Mutex::new(ImapSessionState {
+                session: Some(session),
+                stream_control,
+                selected_mailbox: None,
+                compression: false,
+            }),
+        })
+    }
+
+    // Logs in again, restoring the compression and the selected mailbox of the lost connection.
+    fn reconnect(&self, state: &mut ImapSessionState) -> Result<(), ImapError> {
+        let stream_control = StreamControl::new(self.traffic.clone());
+        let mut session = open_imap_session(&self.domain, self.port, &self.username, &self.password, stream_control.clone())?;
+        if state.compression {
+            metrics::phase(MetricsPhase::Compress, || start_compression(&mut session, &stream_control))?;
+        }
+        if let Some(mailbox) = &state.selected_mailbox {
+            metrics::phase(MetricsPhase::Select, || session.select(mailbox))?;
+        }
+        state.session = Some(session);
+        state.stream_control = stream_control;
+        Ok(())
+    }
+
+    // Runs `command` on the authenticated session, recording it as the `phase` of the `operation` for the metrics.
+    // If the connection turns out to be lost, we log in again, re-select the previously selected mailbox and retry once.
+    fn run<R, F>(&self, operation: &'static str, phase: MetricsPhase, mut command: F) -> Result<R, ImapError>
+    where F: FnMut(&mut Session<ImapStream>) -> imap::error::Result<R> {
+        metrics::operation(operation, || {
+            let mut state = self.state.lock().unwrap();
+
+            if let Some(session) = state.session.as_mut() {
+                match metrics::phase(phase, || command(session)) {
+                    Err(imap::Error::Io(_)) | Err(imap::Error::ConnectionLost) => state.session = None, // reconnect below
+                    result => return result.map_err(|err| err.into()),
+                }
+            }
+
+            metrics::retry();
+            self.reconnect(&mut state)?;
+            let session = state.session.as_mut().unwrap();
+            metrics::phase(phase, || command(session)).map_err(|err| err.into())
+        })
+    }
+
+    // Compresses the connection with COMPRESS=DEFLATE [RFC 4978] if the server supports it, also after reconnecting.
+    // Returns whether the connection is compressed. This pays off for bulk fetches over slow links, at the cost of some CPU time.
+    pub fn enable_compression(&self) -> Result<bool, ImapError> {
+        metrics::operation("ImapSession.enable_compression", || {
+            let mut state = self.state.lock().unwrap();
+            state.compression = true;
+            let state = &mut *state;
+            match state.session.as_mut() {
+                Some(session) => Ok(metrics::phase(MetricsPhase::Compress, || start_compression(session, &state.stream_control))?),
+                None => {
+                    self.reconnect(state)?;
+                    Ok(state.stream_control.is_compressed())
+                },
+            }
+        })
+    }
+
+    // The bytes sent and received by this session so far, before and after compression
+    pub fn traffic(&self) -> ImapTraffic {
+        let compressed = self.state.lock().unwrap().stream_control.is_compressed();
+        self.traffic.to_imap_traffic(compressed)
+    }
+
+    pub fn select(&self, mailbox: &str) -> Result<MailboxInfo, ImapError> {
+        let mailbox_info = self.run("ImapSession.select", MetricsPhase::Select, |session| session.select(mailbox))?;
+        self.state.lock().unwrap().selected_mailbox = Some(String::from(mailbox));
+        Ok(mailbox_info.into())
+    }
+
+    // e.g. fetch("1:10", "(FLAGS RFC822.SIZE RFC822)")
+    pub fn fetch(&self, sequence_set: &str, query: &str) -> Result<Vec<ImapMessage>, ImapError> {
+        self.run("ImapSession.fetch", MetricsPhase::Fetch, |session| {
+            let messages = session.fetch(sequence_set, query)?;
+            Ok(messages.iter().map(ImapMessage::from).collect())
+        })
+    }
+
+    pub fn uid_fetch(&self, uid_set: &str, query: &str) -> Result<Vec<ImapMessage>, ImapError> {
+        self.run("ImapSession.uid_fetch", MetricsPhase::Fetch, |session| {
+            let messages = session.uid_fetch(uid_set, query)?;
+            Ok(messages.iter().map(ImapMessage::from).collect())
+        })
+    }
+
+    // cf. simply_fetch_summaries()
+    pub fn fetch_summaries(&self, sequence_set: &str, header_fields: Vec<String>) -> Result<Vec<MessageSummary>, ImapError> {
+        let query = summary_query(&header_fields);
+        self.run("ImapSession.fetch_summaries", MetricsPhase::Fetch, |session| {
+            let messages = session.fetch(sequence_set, &query)?;
+            Ok(messages.iter().map(MessageSummary::from).collect())
+        })
+    }
+
+    pub fn uid_fetch_summaries(&self, uid_set: &str, header_fields: Vec<String>) -> Result<Vec<MessageSummary>, ImapError> {
+        let query = summary_query(&header_fields);
+        self.run("ImapSession.uid_fetch_summaries", MetricsPhase::Fetch, |session| {
+            let messages = session.uid_fetch(uid_set, &query)?;
+            Ok(messages.iter().map(MessageSummary::from).collect())
+        })
+    }
+
+    // e.g. search("UNSEEN"), returns the matching sequence numbers in ascending order
+    pub fn search(&self, query: &str) -> Result<Vec<u32>, ImapError> {
+        let mut sequence_numbers: Vec<u32> = self.run("ImapSession.search", MetricsPhase::Search, |session| session.search(query))?.into_iter().collect();
+        sequence_numbers.sort_unstable();
+        Ok(sequence_numbers)
+    }
+
+    pub fn uid_search(&self, query: &str) -> Result<Vec<u32>, ImapError> {
+        let mut uids: Vec<u32> = self.run("ImapSession.uid_search", MetricsPhase::Search, |session| session.uid_search(query))?.into_iter().collect();
+        uids.sort_unstable();
+        Ok(uids)
+    }
+
+    // Logs out and closes the connection. Calling any other method afterwards logs in again.
+    pub fn logout(&self) -> Result<(), ImapError> {
+        let mut state = self.state.lock().unwrap();
+        state.selected_mailbox = None;
+        match state.session.take() {
+            Some(mut session) => metrics::operation("ImapSession.logout", || {
+                Ok(metrics::phase(MetricsPhase::Logout, || session.logout())?)
+            }),
+            None => Ok(()),
+        }
+    }
+}
+
+// ***** Flag synchronization: *****
+
+// What a client has to remember about a mailbox between two calls of ImapSession::sync_flags()
+pub struct FlagSyncState {
+    pub uid_validity: u32,
+    pub uid_next: u32,
+    pub highest_mod_seq: u64, // 0 if the server doesn't support CONDSTORE for this mailbox
+    pub message_count: u32,
+}
+
+pub struct FlagChange {
+    pub uid: u32,
+    pub flags: Vec<String>,
+}
+
+// The result of ImapSession::sync_flags()
+pub struct FlagSync {
+    pub state: FlagSyncState, // to be passed to the next sync_flags() call
+    pub full: bool, // `changed` lists every message, as there was no usable previous state; diff it against what you know
+    pub changed: Vec<FlagChange>, // messages whose flags changed, including new ones
+    // Set if messages were expunged since the previous sync: all UIDs below the previous uid_next that still exist.
+    // Every other UID below it was expunged. None means nothing was expunged (or `full` is set).
+    pub present_uids: Option<Vec<u32>>,
+}
+
+// The parts of a SELECT response we need, e.g. "* OK [HIGHESTMODSEQ 715194045007]"
+struct SelectResponse {
+    exists: u32,
+    uid_validity: u32,
+    uid_next: u32,
+    highest_mod_seq: Option<u64>, // None if the server sent NOMODSEQ or doesn't support CONDSTORE
+}
+
+impl SelectResponse {
+    fn parse(response: &[u8]) -> Self {
+        let response = String::from_utf8_lossy(response);
+        let mut select_response = SelectResponse { exists: 0, uid_validity: 0, uid_next: 0, highest_mod_seq: None };
+        for line in response.lines() {
+            if let Some(event) = MailboxEvent::parse(line) {
+                if let MailboxEventKind::Exists = event.kind {
+                    select_response.exists = event.number;
+                }
+            } else if let Some(uid_validity) = response_code(line, "UIDVALIDITY") {
+                select_response.uid_validity = uid_validity as u32;
+            } else if let Some(uid_next) = response_code(line, "UIDNEXT") {
+                select_response.uid_next = uid_next as u32;
+            } else if let Some(highest_mod_seq) = response_code(line, "HIGHESTMODSEQ") {
+                select_response.highest_mod_seq = Some(highest_mod_seq);
+            }
+        }
+        select_response
+    }
+}
+
+// e.g. response_code("* OK [UIDNEXT 4392] Predicted next UID", "UIDNEXT") == Some(4392)
+fn response_code(line: &str, name: &str) -> Option<u64> {
+    let code = line.strip_prefix("* OK [")?.split(']').next()?;
+    let (code_name, value) = code.split_once(' ')?;
+    if !code_name.eq_ignore_ascii_case(name) {
+        return None;
+    }
+    value.trim().parse().ok()
+}
+
+fn parse_flag_changes(response: &[u8]) -> Vec<FlagChange> {
+    String::from_utf8_lossy(response).lines()
+        .filter_map(MailboxEvent::parse)
+        .filter_map(|event| match event.kind {
+            MailboxEventKind::Fetch => Some(FlagChange { uid: event.uid?, flags: event.flags }),
+            _ => None,
+        })
+        .collect()
+}
+
+impl ImapSession {
+    // Selects `mailbox` and returns which flags changed since the sync that returned `previous`.
+    // With CONDSTORE [RFC 7162], only messages whose flags changed are fetched, and expunges are detected by comparing
+    // message counts, so the cost of a sync depends on the number of changes rather than on the size of the mailbox.
+    // Without CONDSTORE, on the first sync or after the UIDVALIDITY changed, the flags of all messages are returned.
+    // QRESYNC is deliberately not enabled: servers then report expunges as VANISHED responses,
+    // which imap 2.4 can't parse, and which would break the other methods of this session.
+    pub fn sync_flags(&self, mailbox: &str, previous: Option<FlagSyncState>) -> Result<FlagSync, ImapError> {
+        metrics::operation("ImapSession.sync_flags", || self.sync_flags_recorded(mailbox, previous))
+    }
+
+    fn sync_flags_recorded(&self, mailbox: &str, previous: Option<FlagSyncState>) -> Result<FlagSync, ImapError> {
+        // asking for the capabilities is counted towards selecting the mailbox, which depends on them
+        let condstore = self.run("ImapSession.sync_flags", MetricsPhase::Select,
+            |session| Ok(session.capabilities()?.has_str("CONDSTORE")))?;
+        let select_command = if condstore {
+            format!("SELECT {} (CONDSTORE)", mailbox_watcher::quote(mailbox))
+        } else {
+            format!("SELECT {}", mailbox_watcher::quote(mailbox))
+        };
+        let selected = SelectResponse::parse(&self.run("ImapSession.sync_flags", MetricsPhase::Select,
+            |session| session.run_command_and_read_response(&select_command))?);
+        self.state.lock().unwrap().selected_mailbox = Some(String::from(mailbox));
+
+        let state = FlagSyncState {
+            uid_validity: selected.uid_validity,
+            uid_next: selected.uid_next,
+            highest_mod_seq: selected.highest_mod_seq.unwrap_or(0),
+            message_count: selected.exists,
+        };
+        let previous = previous.filter(|previous| {
+            previous.uid_validity == state.uid_validity && previous.highest_mod_seq > 0 && state.highest_mod_seq > 0
+        });
+
+        let previous = match previous {
+            Some(previous) => previous,
+            None => { // a full sync
+                let changed = if state.message_count == 0 {
+                    Vec::new()
+                } else {
+                    self.uid_fetch("1:*", "(UID FLAGS)")?.into_iter()
+                        .filter_map(|message| Some(FlagChange { uid: message.uid?, flags: message.flags }))
+                        .collect()
+                };
+                return Ok(FlagSync { state, full: true, changed, present_uids: None });
+            },
+        };
+
+        let changed = if state.highest_mod_seq == previous.highest_mod_seq {
+            Vec::new() // nothing changed at all
+        } else {
+            let fetch_command = format!("UID FETCH 1:* (UID FLAGS) (CHANGEDSINCE {})", previous.highest_mod_seq);
+            parse_flag_changes(&self.run("ImapSession.sync_flags", MetricsPhase::Fetch,
+                |session| session.run_command_and_read_response(&fetch_command))?)
+        };
+
+        // messages that are neither new nor expunged are still there; if there are fewer, some were expunged
+        let new_messages = if state.uid_next == previous.uid_next {
+            0
+        } else {
+            // "UID n:*" always matches the last message, even if its UID is below n
+            self.uid_search(&format!("UID {}:*", previous.uid_next))?.into_iter()
+                .filter(|uid| *uid >= previous.uid_next)
+                .count() as u32
+        };
+        let present_uids = if state.message_count.saturating_sub(new_messages) == previous.message_count {
+            None
+        } else if previous.uid_next <= 1 {
+            Some(Vec::new())
+        } else {
+            Some(self.uid_search(&format!("UID 1:{}", previous.uid_next - 1))?.into_iter()
+                .filter(|uid| *uid < previous.uid_next)
+                .collect())
+        };
+
+        Ok(FlagSync { state, full: false, changed, present_uids })
+    }
+}
 
-    // extract the message's body
-    let body = message.body().expect("message did not have a body!");
-    let body = std::str::from_utf8(body)
-        .expect("message was not valid utf-8")
-        .to_string();
+// ***** Columnar results: *****
 
-    // be nice to the server and log out
-    imap_session.logout()?;
+mod columnar;
+use columnar::{I64Column, StringColumn, SummaryColumns, U32Column};
 
-    Ok(Some(body))
+impl ImapSession {
+    // Like fetch_summaries(), but in a columnar layout that is far cheaper to lift for thousands of messages.
+    pub fn fetch_summary_columns(&self, sequence_set: &str, header_fields: Vec<String>) -> Result<SummaryColumns, ImapError> {
+        let summaries = metrics::operation("ImapSession.fetch_summary_columns", || self.fetch_summaries(sequence_set, header_fields.clone()))?;
+        Ok(SummaryColumns::new(&summaries, &header_fields))
+    }
+
+    pub fn uid_fetch_summary_columns(&self, uid_set: &str, header_fields: Vec<String>) -> Result<SummaryColumns, ImapError> {
+        let summaries = metrics::operation("ImapSession.uid_fetch_summary_columns", || self.uid_fetch_summaries(uid_set, header_fields.clone()))?;
+        Ok(SummaryColumns::new(&summaries, &header_fields))
+    }
 }
 
+// ***** Ranged downloads: *****
+
+mod download;
+use download::{DownloadProgress, MessageChunkSink};
+
+impl ImapSession {
+    // Downloads message `uid` of the selected mailbox from byte `offset` on, `chunk_size` bytes at a time, handing every chunk
+    // to `sink` as it arrives, and returns the size of the message. A connection lost in the middle of a chunk is re-established
+    // and only that chunk is fetched again; should reconnecting fail, call again with the offset after the last chunk received.
+    pub fn download_message(&self, uid: u32, offset: u64, chunk_size: u32, sink: Box<dyn MessageChunkSink>) -> Result<u64, ImapError> {
+        metrics::operation("ImapSession.download_message", || {
+            self.download_chunks(uid, offset, chunk_size, |offset, chunk, size| {
+                sink.write_chunk(offset, chunk, size);
+                Ok(())
+            })
+        })
+    }
+
+    // Like download_message(), but appends the message to the file at `path`. If the file already holds the start of
+    // the message, e.g. after a call that failed, the download continues after it, so retrying never transfers data twice.
+    pub fn download_message_to_file(&self, uid: u32, path: &str, chunk_size: u32, progress: Box<dyn DownloadProgress>) -> Result<u64, ImapError> {
+        metrics::operation("ImapSession.download_message_to_file", || {
+            let mut file = OpenOptions::new().create(true).append(true).open(path).map_err(|_| ImapError::IoError)?;
+            let offset = file.metadata().map_err(|_| ImapError::IoError)?.len();
+            self.download_chunks(uid, offset, chunk_size, |offset, chunk, size| {
+                file.write_all(&chunk).map_err(|_| ImapError::IoError)?;
+                progress.on_progress(offset + chunk.len() as u64, size);
+                Ok(())
+            })
+        })
+    }
+
+    fn download_chunks(&self, uid: u32, offset: u64, chunk_size: u32,
+        write: impl FnMut(u64, Vec<u8>, u64) -> Result<(), ImapError>) -> Result<u64, ImapError> {
+        if chunk_size == 0 {
+            return Err(ImapError::ValidateError);
+        }
+        let uid_set = uid.to_string();
+        let fetch = |offset| {
+            let query = download::chunk_query(offset, chunk_size);
+            // every chunk is a command of its own, so that run() retries just the one that was cut off
+            self.run("ImapSession.download_message", MetricsPhase::Fetch, |session| {
+                let messages = session.uid_fetch(&uid_set, &query)?;
+                Ok(messages.iter().find(|message| message.uid == Some(uid))
+                    .map(|message| (message.body().unwrap_or_default().to_vec(), message.size)))
+            })?.ok_or(ImapError::NoResponse) // there is no message `uid`
+        };
+        download::download_chunks(offset, chunk_size, fetch, write)
+    }
+}
+
+// ***** IMAP IDLE: *****
+
+mod mailbox_watcher;
+use mailbox_watcher::{MailboxEvent, MailboxEventKind, MailboxWatcher};
+
+// ***** MIME parsing: *****
+
+mod mime;
+use mime::{MimeError, MimeHeader, MimePart, ParsedMessage};
+
 // ***** SMTP: *****
 
-use lettre::message::header::ContentType;
+use lettre::message::header::{ContentTransferEncoding, ContentType, MimeVersion};
 use lettre::transport::smtp::authentication::Credentials;
+use lettre::transport::smtp::{PoolConfig, SmtpTransportBuilder};
+use lettre::transport::smtp::client::Tls;
 use lettre::{Message, SmtpTransport, Transport};
-use lettre::message::MultiPart;
+use lettre::message::{Body, MultiPart, SinglePart};
+
+mod smtp_connection;
+use smtp_connection::{SmtpConnection, SUBMISSIONS_PORT};
 
 // A simplified wrapper for the `Kind` in the `Inner` struct stored inside a lettre::transport::smtp::Error
 // cf. https://docs.rs/lettre/latest/src/lettre/transport/smtp/error.rs.html
@@ -177,6 +875,10 @@ pub enum SmtpError {
     Timeout,
     #[error("SMTP error: other.")]
     OtherError,
+    #[error("SMTP error: Could not read the message body.")]
+    MessageBodyError,
+    #[error("SMTP error: The server supports neither AUTH PLAIN nor AUTH LOGIN, only: {0}.")]
+    UnsupportedAuthMechanism(String), // the mechanisms the server advertised
 }
 
 impl From<lettre::transport::smtp::Error> for SmtpError {
@@ -223,80 +925,504 @@ impl From<lettre::transport::smtp::response::Response> for SmtpResponse {
     }
 }
 
-fn prepare_headers(headers: HashMap<String, String>) -> lettre::message::MessageBuilder {
+// Fails with an InternalClientError if an address can't be parsed or a header is not supported
+fn prepare_headers(headers: HashMap<String, String>) -> Result<lettre::message::MessageBuilder, SmtpError> {
 	let mut email = Message::builder();
 
 	for (header, value) in headers {
 		// cf. https://docs.rs/lettre/latest/lettre/message/struct.MessageBuilder.html
+		let address = || value.parse::<lettre::message::Mailbox>().map_err(|_| SmtpError::InternalClientError);
 		match header.as_ref() {
-			"From" => email = email.from(value.parse().unwrap()), //.from("NoBody <nobody@domain.tld>".parse().unwrap())
-			"Sender" => email = email.sender(value.parse().unwrap()), // "Should be used when providing several From mailboxes."
-			"Reply-To" => email = email.reply_to(value.parse().unwrap()), //.reply_to("Yuin <yuin@domain.tld>".parse().unwrap())
-			"To" => email = email.to(value.parse().unwrap()), //.to("Hei <hei@domain.tld>".parse().unwrap())
-			"Cc" => email = email.cc(value.parse().unwrap()),
-			"Bcc" => email = email.bcc(value.parse().unwrap()),
+			"From" => email = email.from(address()?), //.from("NoBody <nobody@domain.tld>".parse().unwrap())
+			"Sender" => email = email.sender(address()?), // "Should be used when providing several From mailboxes."
+			"Reply-To" => email = email.reply_to(address()?), //.reply_to("Yuin <yuin@domain.tld>".parse().unwrap())
+			"To" => email = email.to(address()?), //.to("Hei <hei@domain.tld>".parse().unwrap())
+			"Cc" => email = email.cc(address()?),
+			"Bcc" => email = email.bcc(address()?),
 			"In-Reply-To" => email = email.in_reply_to(value),
 			"References" => email = email.references(value),
 			"Subject" => email = email.subject(value), //.subject("Happy new year")
 			"User-Agent" => email = email.user_agent(value), // https://datatracker.ietf.org/doc/html/draft-melnikov-email-user-agent-00
-			other => panic!("Unknwon email header: '{other}'")
+			_ => return Err(SmtpError::InternalClientError), // unknown email header
 		}
 	}
 
-	return email
+	return Ok(email)
+}
+
+// The sender and recipients of `email`'s envelope, as given to SmtpConnection::send()
+fn envelope_addresses(email: &lettre::Message) -> (String, Vec<String>) {
+	let from = email.envelope().from().map(|address| address.to_string()).unwrap_or_default();
+	let to = email.envelope().to().iter().map(|address| address.to_string()).collect();
+	(from, to)
+}
+
+// The header section of an email or MIME part formatted by lettre, including the empty line that ends it
+fn header_section(formatted: &[u8]) -> &[u8] {
+	let length = formatted.windows(4).position(|window| window == b"\r\n\r\n").map_or(formatted.len(), |position| position + 4);
+	&formatted[..length]
 }
 
 // cf. https://crates.io/crates/lettre
-fn get_smtp_transport(smtp_server: &str, smtp_username: &str, smtp_password: &str) -> SmtpTransport {
+fn get_smtp_transport_builder(smtp_server: &str, smtp_username: &str, smtp_password: &str) -> Result<SmtpTransportBuilder, SmtpError> {
 	//let creds = Credentials::new("smtp_username".to_owned(), "smtp_password".to_owned());
 	let creds = Credentials::new(smtp_username.to_owned(), smtp_password.to_owned());
 
 	// Open a remote connection to gmail, for example
-	let mailer = SmtpTransport::relay(smtp_server) //let mailer = SmtpTransport::relay("smtp.gmail.com")
-	    .unwrap()
-	    .credentials(creds)
-	    .build();
+	// (like SmtpTransport::relay(smtp_server), but with the process-wide TLS configuration)
+	let builder = SmtpTransport::builder_dangerous(smtp_server) //let mailer = SmtpTransport::relay("smtp.gmail.com")
+	    .port(SUBMISSIONS_PORT)
+	    .tls(Tls::Wrapper(tls::smtp_tls_parameters(smtp_server)?))
+	    .credentials(creds);
 
-	return mailer
+	return Ok(builder)
 }
 
 // cf. https://crates.io/crates/lettre
-fn send_email(smtp_server: &str, smtp_username: &str, smtp_password: &str,
-	email: lettre::Message) -> Result<SmtpResponse, SmtpError> {
-	let mailer = get_smtp_transport(smtp_server, smtp_username, smtp_password);
+fn get_smtp_transport(smtp_server: &str, smtp_username: &str, smtp_password: &str) -> Result<SmtpTransport, SmtpError> {
+	return Ok(get_smtp_transport_builder(smtp_server, smtp_username, smtp_password)?.build())
+}
 
+fn send_with_transport(mailer: &SmtpTransport, email: &lettre::Message) -> Result<SmtpResponse, SmtpError> {
 	// Send the email
-	return match mailer.send(&email) {
+	return match metrics::phase(MetricsPhase::Send, || mailer.send(email)) {
 	    Ok(response) => Ok(response.into()), //println!("Email sent successfully!"), // lettre::transport::smtp::response::Response
 	    Err(e) => Err(e.into()) //panic!("Could not send email: {e:?}"), // lettre::transport::smtp::Error
 	}
 }
 
-pub fn simply_check_smtp(smtp_server: &str, smtp_username: &str, smtp_password: &str) -> Result<bool, SmtpError> {
-    let mailer = get_smtp_transport(smtp_server, smtp_username, smtp_password);
-    return mailer.test_connection().map_err(|err| err.into())
+// cf. https://crates.io/crates/lettre
+fn send_email(smtp_server: &str, smtp_username: &str, smtp_password: &str,
+	email: lettre::Message) -> Result<SmtpResponse, SmtpError> {
+	let mailer = get_smtp_transport(smtp_server, smtp_username, smtp_password)?;
+	return send_with_transport(&mailer, &email)
 }
 
-// cf. https://crates.io/crates/lettre
-pub fn simply_send_plain_text_email(smtp_server: &str, smtp_username: &str, smtp_password: &str,
-	headers: HashMap<String, String>, body: &str) -> Result<SmtpResponse, SmtpError> {
-	let email = prepare_headers(headers)
+fn build_plain_text_email(headers: HashMap<String, String>, body: &str) -> Result<lettre::Message, SmtpError> {
+	return prepare_headers(headers)?
 		.header(ContentType::TEXT_PLAIN)
 		.body(String::from(body)) //.body(String::from("Be happy!"))
-	    .unwrap();
-
-	return send_email(smtp_server, smtp_username, smtp_password, email)
+	    .map_err(|_| SmtpError::InternalClientError) // e.g. no From or To header
 }
 
 // cf. https://docs.rs/lettre/latest/lettre/message/index.html
-pub fn simply_send_html_email(smtp_server: &str, smtp_username: &str, smtp_password: &str,
-	headers: HashMap<String, String>, plain_text_body: &str, html_body: &str) -> Result<SmtpResponse, SmtpError> {
-	let email = prepare_headers(headers)
+fn build_html_email(headers: HashMap<String, String>, plain_text_body: &str, html_body: &str) -> Result<lettre::Message, SmtpError> {
+	return prepare_headers(headers)?
 		.multipart(MultiPart::alternative_plain_html(
 	        String::from(plain_text_body), //String::from("Hello, world! :)"),
 	        String::from(html_body), //String::from("<p><b>Hello</b>, <i>world</i>! <img src=\"cid:123\"></p>"),
 	    ))
-	    .unwrap();
+	    .map_err(|_| SmtpError::InternalClientError) // e.g. no From or To header
+}
+
+pub fn simply_check_smtp(smtp_server: &str, smtp_username: &str, smtp_password: &str) -> Result<bool, SmtpError> {
+    metrics::operation("simply_check_smtp", || {
+        let mailer = get_smtp_transport(smtp_server, smtp_username, smtp_password)?;
+        return metrics::phase(MetricsPhase::Connect, || mailer.test_connection()).map_err(|err| err.into())
+    })
+}
+
+// cf. https://crates.io/crates/lettre
+pub fn simply_send_plain_text_email(smtp_server: &str, smtp_username: &str, smtp_password: &str,
+	headers: HashMap<String, String>, body: &str) -> Result<SmtpResponse, SmtpError> {
+	let email = build_plain_text_email(headers, body)?;
+	return metrics::operation("simply_send_plain_text_email", || send_email(smtp_server, smtp_username, smtp_password, email))
+}
+
+// cf. https://docs.rs/lettre/latest/lettre/message/index.html
+pub fn simply_send_html_email(smtp_server: &str, smtp_username: &str, smtp_password: &str,
+	headers: HashMap<String, String>, plain_text_body: &str, html_body: &str) -> Result<SmtpResponse, SmtpError> {
+	let email = build_html_email(headers, plain_text_body, html_body)?;
+	return metrics::operation("simply_send_html_email", || send_email(smtp_server, smtp_username, smtp_password, email))
+}
+
+// ***** SMTP mailer: *****
+
+// A long-lived SMTP transport that can be shared across threads.
+// It owns a bounded pool of authenticated connections, so that repeated sends skip DNS, TCP, TLS, EHLO and AUTH.
+// cf. https://docs.rs/lettre/0.11.4/lettre/transport/smtp/struct.PoolConfig.html
+pub struct SmtpMailer {
+	transport: SmtpTransport,
+}
+
+impl SmtpMailer {
+	pub fn new(smtp_server: &str, smtp_username: &str, smtp_password: &str,
+		pool_max_size: u32, pool_idle_timeout_secs: u64) -> Result<Self, SmtpError> {
+		let pool_config = PoolConfig::new()
+			.max_size(pool_max_size)
+			.idle_timeout(Duration::from_secs(pool_idle_timeout_secs));
+
+		let transport = get_smtp_transport_builder(smtp_server, smtp_username, smtp_password)?
+			.pool_config(pool_config)
+			.build();
+
+		Ok(SmtpMailer { transport })
+	}
+
+	pub fn check(&self) -> Result<bool, SmtpError> {
+		return metrics::operation("SmtpMailer.check", || {
+			metrics::phase(MetricsPhase::Connect, || self.transport.test_connection()).map_err(|err| err.into())
+		})
+	}
+
+	pub fn send_plain_text_email(&self, headers: HashMap<String, String>, body: &str) -> Result<SmtpResponse, SmtpError> {
+		let email = build_plain_text_email(headers, body)?;
+		return metrics::operation("SmtpMailer.send_plain_text_email", || send_with_transport(&self.transport, &email))
+	}
+
+	pub fn send_html_email(&self, headers: HashMap<String, String>, plain_text_body: &str, html_body: &str) -> Result<SmtpResponse, SmtpError> {
+		let email = build_html_email(headers, plain_text_body, html_body)?;
+		return metrics::operation("SmtpMailer.send_html_email", || send_with_transport(&self.transport, &email))
+	}
+}
+
+// ***** SMTP batches: *****
+
+// A single email of a batch, cf. simply_send_batch()
+pub struct OutgoingEmail {
+	pub headers: HashMap<String, String>,
+	pub plain_text_body: String,
+	pub html_body: Option<String>, // if present, the email is sent as multipart/alternative
+}
+
+// The name of the variant of `error`, e.g. "PermanentSmtpError", without any data it carries
+fn variant_name(error: &impl std::fmt::Debug) -> String {
+	let debug = format!("{error:?}");
+	debug.split(|c: char| !(c.is_alphanumeric() || c == '_')).next().unwrap_or_default().to_string()
+}
+
+// The result of sending a single email of a batch.
+// Either `response` is set or `error`, the latter being the name of an SmtpError variant, e.g. "PermanentSmtpError".
+pub struct BatchSendResult {
+	pub response: Option<SmtpResponse>,
+	pub error: Option<String>,
+	pub rejected_recipients: Vec<String>, // the email was still delivered to all other recipients
+}
+
+impl BatchSendResult {
+	fn failed(error: SmtpError, rejected_recipients: Vec<String>) -> Self {
+		BatchSendResult {
+			response: None,
+			error: Some(variant_name(&error)),
+			rejected_recipients,
+		}
+	}
+}
 
-	return send_email(smtp_server, smtp_username, smtp_password, email)
+// Sends all emails over a single connection, pipelining the commands of each email if the server supports it.
+// Failing emails don't abort the batch; the results are returned in the same order as the emails.
+pub fn simply_send_batch(smtp_server: &str, smtp_username: &str, smtp_password: &str,
+	emails: Vec<OutgoingEmail>) -> Result<Vec<BatchSendResult>, SmtpError> {
+	metrics::operation("simply_send_batch", || send_batch(smtp_server, smtp_username, smtp_password, emails, &[]))
 }
+
+// Sends all emails over a single connection, with `attachments` (if any) attached to each of them, cf. simply_send_batch()
+fn send_batch(smtp_server: &str, smtp_username: &str, smtp_password: &str,
+	emails: Vec<OutgoingEmail>, attachments: &[AttachmentPart]) -> Result<Vec<BatchSendResult>, SmtpError> {
+	let mut connection = Some(SmtpConnection::connect(smtp_server, SUBMISSIONS_PORT, smtp_username, smtp_password)?);
+	let mut results = Vec::with_capacity(emails.len());
+
+	for email in emails {
+		let (from, to, mut message): (String, Vec<String>, Box<dyn Read + '_>) = if attachments.is_empty() {
+			let email = match email.html_body {
+				Some(html_body) => build_html_email(email.headers, &email.plain_text_body, &html_body),
+				None => build_plain_text_email(email.headers, &email.plain_text_body),
+			};
+			let email = match email {
+				Ok(email) => email,
+				Err(err) => {
+					results.push(BatchSendResult::failed(err, Vec::new()));
+					continue;
+				},
+			};
+			let (from, to) = envelope_addresses(&email);
+			(from, to, Box::new(io::Cursor::new(email.formatted())))
+		} else {
+			match multipart_email(email.headers, &email.plain_text_body, email.html_body.as_deref(), attachments) {
+				Ok(multipart) => multipart,
+				Err(err) => {
+					results.push(BatchSendResult::failed(err, Vec::new()));
+					continue;
+				},
+			}
+		};
+
+		// an I/O error during the previous email leaves us without a connection, so we open a new one
+		if connection.is_none() {
+			metrics::retry();
+			match SmtpConnection::connect(smtp_server, SUBMISSIONS_PORT, smtp_username, smtp_password) {
+				Ok(new_connection) => connection = Some(new_connection),
+				Err(err) => {
+					results.push(BatchSendResult::failed(err, Vec::new()));
+					continue;
+				},
+			}
+		}
+
+		match metrics::phase(MetricsPhase::Send, || connection.as_mut().unwrap().send(&from, &to, &mut message)) {
+			Ok(outcome) => results.push(match outcome.result {
+				Ok(response) => BatchSendResult {
+					response: Some(response),
+					error: None,
+					rejected_recipients: outcome.rejected_recipients,
+				},
+				Err(err) => BatchSendResult::failed(err, outcome.rejected_recipients),
+			}),
+			Err(err) => {
+				connection = None;
+				results.push(BatchSendResult::failed(err, Vec::new()));
+			},
+		}
+	}
+
+	if let Some(connection) = connection {
+		metrics::phase(MetricsPhase::Logout, || connection.quit());
+	}
+	Ok(results)
+}
+
+// ***** Streamed SMTP sends: *****
+
+mod message_body;
+use message_body::{Base64Lines, MessageBodySource, MessageBodySourceError, SourceReader};
+
+// An error the foreign MessageBodySource raised without declaring it, e.g. any Python exception
+impl From<uniffi::UnexpectedUniFFICallbackError> for MessageBodySourceError {
+	fn from(error: uniffi::UnexpectedUniFFICallbackError) -> Self {
+		MessageBodySourceError::ReadError { message: error.reason }
+	}
+}
+
+// Formats `headers` for an email whose body is written separately, returning the header section with the envelope's sender and recipients.
+fn streamed_email_headers(headers: HashMap<String, String>, content_type: ContentType,
+	encoding: ContentTransferEncoding) -> Result<(Vec<u8>, String, Vec<String>), SmtpError> {
+	// lettre formats the headers, the body being left empty
+	let empty_body = Body::new_with_encoding(Vec::new(), encoding).map_err(|_| SmtpError::InternalClientError)?;
+	let email = prepare_headers(headers)?
+		.header(MimeVersion::VERSION_1_0)
+		.header(content_type)
+		.body(empty_body)
+		.map_err(|_| SmtpError::InternalClientError)?;
+	let (from, to) = envelope_addresses(&email);
+	Ok((header_section(&email.formatted()).to_vec(), from, to))
+}
+
+// Sends `message` over an SmtpConnection, i.e. in BDAT chunks if the server supports them, rather than building it in memory.
+// Recipients that the server rejects are skipped, as in simply_send_batch().
+fn send_message(smtp_server: &str, smtp_username: &str, smtp_password: &str,
+	from: &str, to: &[String], message: &mut dyn Read) -> Result<SmtpResponse, SmtpError> {
+	let mut connection = SmtpConnection::connect(smtp_server, SUBMISSIONS_PORT, smtp_username, smtp_password)?;
+	let outcome = metrics::phase(MetricsPhase::Send, || connection.send(from, to, message))?;
+	metrics::phase(MetricsPhase::Logout, || connection.quit());
+	outcome.result
+}
+
+// Sends an email whose body is streamed from `body`, base64-encoded.
+fn send_streamed_email(smtp_server: &str, smtp_username: &str, smtp_password: &str,
+	headers: HashMap<String, String>, content_type: &str, body: impl Read) -> Result<SmtpResponse, SmtpError> {
+	let content_type = ContentType::parse(content_type).map_err(|_| SmtpError::InternalClientError)?;
+	let (header, from, to) = streamed_email_headers(headers, content_type, ContentTransferEncoding::Base64)?;
+	let mut message = header.as_slice().chain(Base64Lines::new(body));
+	send_message(smtp_server, smtp_username, smtp_password, &from, &to, &mut message)
+}
+
+// Sends the file at `path` as the body of an email of type `content_type`, e.g. "text/html; charset=utf-8",
+// reading it a block at a time, so that even files of tens of megabytes take little memory.
+pub fn simply_send_file_email(smtp_server: &str, smtp_username: &str, smtp_password: &str,
+	headers: HashMap<String, String>, content_type: &str, path: &str) -> Result<SmtpResponse, SmtpError> {
+	metrics::operation("simply_send_file_email", || {
+		let file = File::open(path).map_err(|_| SmtpError::MessageBodyError)?;
+		send_streamed_email(smtp_server, smtp_username, smtp_password, headers, content_type, file)
+	})
+}
+
+// Like simply_send_file_email(), with the body being handed over chunk by chunk by `body`.
+pub fn simply_send_streamed_email(smtp_server: &str, smtp_username: &str, smtp_password: &str,
+	headers: HashMap<String, String>, content_type: &str, body: Box<dyn MessageBodySource>) -> Result<SmtpResponse, SmtpError> {
+	metrics::operation("simply_send_streamed_email", || {
+		send_streamed_email(smtp_server, smtp_username, smtp_password, headers, content_type, SourceReader::new(body))
+	})
+}
+
+// ***** Attachments: *****
+
+mod attachments;
+use attachments::{Attachment, AttachmentPart};
+
+// The email as multipart/mixed: first the plain text (or the plain text and HTML as multipart/alternative), then the attachments.
+// Returns the envelope's sender and recipients and the formatted email, whose attachments are only encoded as it is read.
+fn multipart_email<'a>(headers: HashMap<String, String>, plain_text_body: &str, html_body: Option<&str>,
+	attachments: &'a [AttachmentPart]) -> Result<(String, Vec<String>, Box<dyn Read + 'a>), SmtpError> {
+	let text = match html_body {
+		Some(html_body) => MultiPart::alternative_plain_html(String::from(plain_text_body), String::from(html_body)).formatted(),
+		None => SinglePart::plain(String::from(plain_text_body)).formatted(),
+	};
+	let boundary = MultiPart::mixed().build().boundary(); // a random one
+	let content_type = ContentType::parse(&format!("multipart/mixed; boundary=\"{boundary}\"")).map_err(|_| SmtpError::InternalClientError)?;
+	let (header, from, to) = streamed_email_headers(headers, content_type, ContentTransferEncoding::SevenBit)?;
+
+	// cf. https://datatracker.ietf.org/doc/html/rfc2046#section-5.1.1
+	let delimiter = format!("--{boundary}\r\n").into_bytes();
+	let mut message: Box<dyn Read + 'a> = Box::new(io::Cursor::new([header, delimiter.clone(), text].concat()));
+	for attachment in attachments {
+		message = Box::new(message.chain(io::Cursor::new(delimiter.clone())).chain(attachment.reader()));
+	}
+	message = Box::new(message.chain(io::Cursor::new(format!("--{boundary}--\r\n").into_bytes())));
+	Ok((from, to, message))
+}
+
+// Sends an email with the files of `attachments` attached. Each file is memory-mapped and base64-encoded onto the wire
+// a block at a time, so that attaching files of hundreds of megabytes takes little memory.
+pub fn simply_send_email_with_attachments(smtp_server: &str, smtp_username: &str, smtp_password: &str,
+	headers: HashMap<String, String>, plain_text_body: &str, html_body: Option<String>,
+	attachments: Vec<Attachment>) -> Result<SmtpResponse, SmtpError> {
+	metrics::operation("simply_send_email_with_attachments", || {
+		let parts = attachments.iter().map(AttachmentPart::open).collect::<Result<Vec<_>, _>>()?;
+		let (from, to, mut message) = multipart_email(headers, plain_text_body, html_body.as_deref(), &parts)?;
+		send_message(smtp_server, smtp_username, smtp_password, &from, &to, &mut message)
+	})
+}
+
+// Like simply_send_batch(), with the same files attached to every email, e.g. a newsletter sent to each recipient separately.
+// The files are encoded once for the whole batch instead of once per email.
+pub fn simply_send_batch_with_attachments(smtp_server: &str, smtp_username: &str, smtp_password: &str,
+	emails: Vec<OutgoingEmail>, attachments: Vec<Attachment>) -> Result<Vec<BatchSendResult>, SmtpError> {
+	metrics::operation("simply_send_batch_with_attachments", || {
+		let mut parts = attachments.iter().map(AttachmentPart::open).collect::<Result<Vec<_>, _>>()?;
+		if emails.len() > 1 {
+			parts.iter_mut().for_each(AttachmentPart::encode);
+		}
+		send_batch(smtp_server, smtp_username, smtp_password, emails, &parts)
+	})
+}
+
+// ***** Asynchronous calls: *****
+
+mod worker_pool;
+use worker_pool::WorkerPool;
+
+static ASYNC_WORKER_THREADS: AtomicU32 = AtomicU32::new(64);
+static ASYNC_WORKER_POOL: OnceLock<WorkerPool> = OnceLock::new();
+
+// Sets how many blocking operations the *_async functions run at the same time (64 by default); more calls are queued.
+// The I/O is not non-blocking: every operation occupies one OS thread until it has finished, network waits included,
+// so this is also the maximum number of operations in flight. 0 is taken as 1, as the queued calls would never run
+// otherwise. May be called at any time; surplus threads exit once idle.
+pub fn simply_set_async_worker_threads(threads: u32) {
+    let threads = threads.max(1);
+    ASYNC_WORKER_THREADS.store(threads, Ordering::Relaxed);
+    if let Some(pool) = ASYNC_WORKER_POOL.get() {
+        pool.resize(threads as usize);
+    }
+}
+
+// The outcome of a *_async call, handed to CompletionHandler::on_complete().
+// If the call failed, `error` is the name of the ImapError/SmtpError variant and `error_message` its description.
+// Otherwise, the field matching the return type of the corresponding blocking function is set.
+#[derive(Default)]
+pub struct AsyncResult {
+    pub error: Option<String>,
+    pub error_message: Option<String>,
+    pub flag: Option<bool>,
+    pub text: Option<String>,
+    pub data: Option<Vec<u8>>,
+    pub response: Option<SmtpResponse>,
+    pub messages: Option<Vec<ImapMessage>>,
+    pub batch: Option<Vec<BatchSendResult>>,
+}
+
+impl AsyncResult {
+    fn from_result<T, E>(result: Result<T, E>, into_async_result: impl FnOnce(T) -> AsyncResult) -> Self
+    where E: std::fmt::Debug + std::fmt::Display {
+        match result {
+            Ok(value) => into_async_result(value),
+            Err(err) => AsyncResult {
+                error: Some(variant_name(&err)),
+                error_message: Some(err.to_string()),
+                ..Default::default()
+            },
+        }
+    }
+}
+
+// implemented by the foreign language, e.g. to resolve a future
+pub trait CompletionHandler: Send + Sync + std::fmt::Debug {
+    fn on_complete(&self, result: AsyncResult);
+}
+
+// Runs `call` on the worker pool and hands its outcome to `handler`, so that the calling thread never blocks.
+fn run_async(handler: Box<dyn CompletionHandler>, call: impl FnOnce() -> AsyncResult + Send + 'static) {
+    let pool = ASYNC_WORKER_POOL.get_or_init(|| {
+        WorkerPool::new("simply-async", ASYNC_WORKER_THREADS.load(Ordering::Relaxed) as usize)
+    });
+    pool.execute(move || {
+        let result = std::panic::catch_unwind(std::panic::AssertUnwindSafe(call))
+            .unwrap_or_else(|_| AsyncResult {
+                error: Some(String::from("Panic")),
+                error_message: Some(String::from("Unknown rust panic")),
+                ..Default::default()
+            });
+        handler.on_complete(result);
+    });
+}
+
+pub fn simply_check_imap_async(domain: String, port: u16, username: String, password: String,
+    handler: Box<dyn CompletionHandler>) {
+    run_async(handler, move || AsyncResult::from_result(
+        simply_check_imap(&domain, port, &username, &password),
+        |()| AsyncResult::default()));
+}
+
+pub fn simply_fetch_inbox_top_async(domain: String, port: u16, username: String, password: String,
+    handler: Box<dyn CompletionHandler>) {
+    run_async(handler, move || AsyncResult::from_result(
+        simply_fetch_inbox_top(&domain, port, &username, &password),
+        |text| AsyncResult { text, ..Default::default() }));
+}
+
+pub fn simply_fetch_inbox_top_bytes_async(domain: String, port: u16, username: String, password: String,
+    handler: Box<dyn CompletionHandler>) {
+    run_async(handler, move || AsyncResult::from_result(
+        simply_fetch_inbox_top_bytes(&domain, port, &username, &password),
+        |data| AsyncResult { data, ..Default::default() }));
+}
+
+pub fn simply_fetch_messages_async(domain: String, port: u16, username: String, password: String,
+    mailbox: String, sequence_set: String, items: String, uid: bool, handler: Box<dyn CompletionHandler>) {
+    run_async(handler, move || AsyncResult::from_result(
+        simply_fetch_messages(&domain, port, &username, &password, &mailbox, &sequence_set, &items, uid),
+        |messages| AsyncResult { messages: Some(messages), ..Default::default() }));
+}
+
+pub fn simply_check_smtp_async(smtp_server: String, smtp_username: String, smtp_password: String,
+    handler: Box<dyn CompletionHandler>) {
+    run_async(handler, move || AsyncResult::from_result(
+        simply_check_smtp(&smtp_server, &smtp_username, &smtp_password),
+        |flag| AsyncResult { flag: Some(flag), ..Default::default() }));
+}
+
+pub fn simply_send_plain_text_email_async(smtp_server: String, smtp_username: String, smtp_password: String,
+    headers: HashMap<String, String>, body: String, handler: Box<dyn CompletionHandler>) {
+    run_async(handler, move || AsyncResult::from_result(
+        simply_send_plain_text_email(&smtp_server, &smtp_username, &smtp_password, headers, &body),
+        |response| AsyncResult { response: Some(response), ..Default::default() }));
+}
+
+pub fn simply_send_html_email_async(smtp_server: String, smtp_username: String, smtp_password: String,
+    headers: HashMap<String, String>, plain_text_body: String, html_body: String, handler: Box<dyn CompletionHandler>) {
+    run_async(handler, move || AsyncResult::from_result(
+        simply_send_html_email(&smtp_server, &smtp_username, &smtp_password, headers, &plain_text_body, &html_body),
+        |response| AsyncResult { response: Some(response), ..Default::default() }));
+}
+
+pub fn simply_send_batch_async(smtp_server: String, smtp_username: String, smtp_password: String,
+    emails: Vec<OutgoingEmail>, handler: Box<dyn CompletionHandler>) {
+    run_async(handler, move || AsyncResult::from_result(
+        simply_send_batch(&smtp_server, &smtp_username, &smtp_password, emails),
+        |batch| AsyncResult { batch: Some(batch), ..Default::default() }));
+}
+
+// ***** Multi-account sweeps: *****
+
+mod account_sweep;
+use account_sweep::{AccountSweep, SweepAccount, SweepKind, SweepResult, SweepTask};
@@ -0,0 +1,301 @@
+// Push notifications for a single mailbox using the IMAP IDLE command.
+// imap::extensions::idle::Handle only tells whether *something* happened and drops the response that woke it up,
+// so this talks to the server directly to be able to report what changed.
+// cf. https://datatracker.ietf.org/doc/html/rfc2177
+
+use std::io::{BufRead, BufReader, ErrorKind, Read, Write};
+use std::net::{Shutdown, TcpStream};
+use std::sync::Mutex;
+use std::sync::atomic::{AtomicBool, Ordering};
+use std::time::{Duration, Instant};
+
+use native_tls::TlsStream;
+
+use crate::{set_io_timeouts, tls_connector, ImapError, IO_TIMEOUT};
+
+pub enum MailboxEventKind {
+    Exists, // `number` is the new number of messages in the mailbox
+    Recent, // `number` is the new number of messages with the \Recent flag
+    Expunge, // `number` is the sequence number of the removed message
+    Fetch, // `number` is the sequence number of the message whose flags changed
+}
+
+// An untagged response received while idling, e.g. "* 23 EXISTS" or "* 5 FETCH (FLAGS (\Seen) UID 42)"
+pub struct MailboxEvent {
+    pub kind: MailboxEventKind,
+    pub number: u32,
+    pub uid: Option<u32>, // only for Fetch, if the server sent it
+    pub flags: Vec<String>, // only for Fetch
+}
+
+impl MailboxEvent {
+    pub(crate) fn parse(line: &str) -> Option<Self> {
+        let mut words = line.strip_prefix("* ")?.splitn(3, ' ');
+        let number = words.next()?.parse().ok()?;
+        let kind = match words.next()?.to_uppercase().as_str() {
+            "EXISTS" => MailboxEventKind::Exists,
+            "RECENT" => MailboxEventKind::Recent,
+            "EXPUNGE" => MailboxEventKind::Expunge,
+            "FETCH" => MailboxEventKind::Fetch,
+            _ => return None,
+        };
+        let attributes = words.next().unwrap_or("");
+        Some(MailboxEvent {
+            kind,
+            number,
+            uid: fetch_attribute(attributes, "UID ").and_then(|uid| uid.split(|c: char| !c.is_ascii_digit()).next()?.parse().ok()),
+            flags: fetch_attribute(attributes, "FLAGS (")
+                .and_then(|flags| flags.split(')').next())
+                .map_or_else(Vec::new, |flags| flags.split_whitespace().map(String::from).collect()),
+        })
+    }
+}
+
+// the text following `name` in a FETCH response, e.g. fetch_attribute("(FLAGS (\Seen) UID 42)", "UID ") == Some("42)")
+fn fetch_attribute<'a>(attributes: &'a str, name: &str) -> Option<&'a str> {
+    let start = attributes.to_ascii_uppercase().find(name)? + name.len();
+    attributes.get(start..)
+}
+
+// cf. https://datatracker.ietf.org/doc/html/rfc3501#section-4.3
+pub(crate) fn quote(string: &str) -> String {
+    format!("\"{}\"", string.replace('\\', "\\\\").replace('"', "\\\""))
+}
+
+struct IdleConnection {
+    stream: BufReader<TlsStream<TcpStream>>,
+    next_tag: u32,
+    idle_since: Instant,
+    partial_line: Vec<u8>, // kept across read timeouts
+}
+
+impl IdleConnection {
+    // Logs in, selects `mailbox` and returns the connection along with the number of messages in the mailbox.
+    fn open(domain: &str, port: u16, username: &str, password: &str, mailbox: &str) -> Result<(Self, TcpStream, u32), ImapError> {
+        let tcp_stream = TcpStream::connect((domain, port)).map_err(|_| ImapError::IoError)?;
+        // only while waiting for updates in wait() is the read timeout set to the time left to wait instead
+        set_io_timeouts(&tcp_stream).map_err(|_| ImapError::IoError)?;
+        let shutdown_handle = tcp_stream.try_clone().map_err(|_| ImapError::IoError)?;
+        let tls = tls_connector().map_err(|_| ImapError::TlsError)?;
+        let tls_stream = tls.connect(domain, tcp_stream).map_err(|_| ImapError::TlsHandshakeError)?;
+
+        let mut connection = IdleConnection {
+            stream: BufReader::new(tls_stream),
+            next_tag: 1,
+            idle_since: Instant::now(),
+            partial_line: Vec::new(),
+        };
+        connection.read_line()?.ok_or(ImapError::IoError)?; // the greeting
+        connection.command(&format!("LOGIN {} {}", quote(username), quote(password)))?;
+        let exists = connection.command(&format!("SELECT {}", quote(mailbox)))?.into_iter()
+            .filter_map(|line| MailboxEvent::parse(&line))
+            .filter(|event| matches!(event.kind, MailboxEventKind::Exists))
+            .last()
+            .map_or(0, |event| event.number);
+        Ok((connection, shutdown_handle, exists))
+    }
+
+    // Reads one line; returns Ok(None) if no complete line arrived before the read timeout.
+    fn read_line(&mut self) -> Result<Option<String>, ImapError> {
+        match self.stream.read_until(b'\n', &mut self.partial_line) {
+            Ok(0) => return Err(ImapError::ConnectionLost),
+            Ok(_) => {},
+            Err(error) if matches!(error.kind(), ErrorKind::WouldBlock | ErrorKind::TimedOut) => return Ok(None),
+            Err(_) => return Err(ImapError::IoError),
+        }
+        if !self.partial_line.ends_with(b"\n") {
+            return Err(ImapError::ConnectionLost);
+        }
+        let mut line = std::mem::take(&mut self.partial_line);
+        // a line ending in a literal, e.g. "{12}\r\n", continues after the literal's 12 bytes
+        if let Some(length) = literal_length(&line) {
+            self.stream.get_ref().get_ref().set_read_timeout(Some(IO_TIMEOUT)).map_err(|_| ImapError::IoError)?;
+            let mut literal = vec![0; length];
+            self.stream.read_exact(&mut literal).map_err(|_| ImapError::IoError)?;
+            line.extend(literal);
+            self.partial_line = line;
+            return self.read_line();
+        }
+        Ok(Some(String::from_utf8_lossy(&line).trim_end().to_string()))
+    }
+
+    fn write_line(&mut self, line: &str) -> Result<(), ImapError> {
+        let stream = self.stream.get_mut();
+        stream.write_all(format!("{line}\r\n").as_bytes()).map_err(|_| ImapError::IoError)?;
+        stream.flush().map_err(|_| ImapError::IoError)
+    }
+
+    // Runs a tagged command and returns the untagged responses it produced.
+    fn command(&mut self, command: &str) -> Result<Vec<String>, ImapError> {
+        let tag = format!("w{}", self.next_tag);
+        self.next_tag += 1;
+        self.write_line(&format!("{tag} {command}"))?;
+        self.read_until_tagged(&tag)
+    }
+
+    fn read_until_tagged(&mut self, tag: &str) -> Result<Vec<String>, ImapError> {
+        let mut untagged = Vec::new();
+        self.stream.get_ref().get_ref().set_read_timeout(Some(IO_TIMEOUT)).map_err(|_| ImapError::IoError)?;
+        loop {
+            let line = self.read_line()?.ok_or(ImapError::IoError)?;
+            match line.strip_prefix(&format!("{tag} ")).and_then(|status| status.split(' ').next()) {
+                Some(status) if status.eq_ignore_ascii_case("OK") => return Ok(untagged),
+                Some(status) if status.eq_ignore_ascii_case("NO") => return Err(ImapError::NoResponse),
+                Some(_) => return Err(ImapError::BadResponse),
+                None => untagged.push(line),
+            }
+        }
+    }
+
+    fn start_idle(&mut self) -> Result<Vec<MailboxEvent>, ImapError> {
+        let tag = format!("w{}", self.next_tag);
+        self.next_tag += 1;
+        self.write_line(&format!("{tag} IDLE"))?;
+        self.stream.get_ref().get_ref().set_read_timeout(Some(IO_TIMEOUT)).map_err(|_| ImapError::IoError)?;
+        let mut events = Vec::new();
+        loop {
+            let line = self.read_line()?.ok_or(ImapError::IoError)?;
+            if line.starts_with('+') { // the server is idling now
+                self.idle_since = Instant::now();
+                return Ok(events);
+            }
+            if line.starts_with(&format!("{tag} ")) { // IDLE is not supported
+                return Err(ImapError::BadResponse);
+            }
+            events.extend(MailboxEvent::parse(&line));
+        }
+    }
+
+    fn stop_idle(&mut self) -> Result<Vec<MailboxEvent>, ImapError> {
+        let tag = format!("w{}", self.next_tag - 1);
+        self.write_line("DONE")?;
+        Ok(self.read_until_tagged(&tag)?.iter().filter_map(|line| MailboxEvent::parse(line)).collect())
+    }
+
+    // Waits for events until `deadline`, re-issuing IDLE every `keepalive`.
+    fn wait(&mut self, deadline: Instant, keepalive: Duration) -> Result<Vec<MailboxEvent>, ImapError> {
+        let mut events = Vec::new();
+        loop {
+            let now = Instant::now();
+            let reissue_at = self.idle_since + keepalive;
+            if now >= reissue_at {
+                events.extend(self.stop_idle()?);
+                events.extend(self.start_idle()?);
+                continue;
+            }
+            if now >= deadline || (!events.is_empty() && self.stream.buffer().is_empty()) {
+                return Ok(events);
+            }
+            let timeout = deadline.min(reissue_at) - now;
+            self.stream.get_ref().get_ref().set_read_timeout(Some(timeout.max(Duration::from_millis(1))))
+                .map_err(|_| ImapError::IoError)?;
+            if let Some(line) = self.read_line()? {
+                events.extend(MailboxEvent::parse(&line));
+            }
+        }
+    }
+}
+
+fn literal_length(line: &[u8]) -> Option<usize> {
+    let line = line.strip_suffix(b"}\r\n")?;
+    let start = line.iter().rposition(|byte| *byte == b'{')?;
+    std::str::from_utf8(&line[start + 1..]).ok()?.parse().ok()
+}
+
+// Watches a mailbox over its own connection, which is kept in the IDLE state between calls to wait().
+// IDLE is re-issued every `keepalive_secs`, 29 minutes by default, as servers may log out clients after 30 minutes of inactivity.
+// A `keepalive_secs` of 0 is rejected with a ValidateError, as IDLE would be re-issued over and over without a pause.
+// May be shared across threads: stop() unblocks a wait() running on another thread.
+pub struct MailboxWatcher {
+    domain: String,
+    port: u16,
+    username: String,
+    password: String,
+    mailbox: String,
+    keepalive: Duration,
+    connection: Mutex<Option<IdleConnection>>, // None after the connection was lost
+    shutdown_handle: Mutex<Option<TcpStream>>,
+    stopped: AtomicBool,
+}
+
+impl MailboxWatcher {
+    pub fn new(domain: String, port: u16, username: String, password: String, mailbox: String,
+        keepalive_secs: u64) -> Result<Self, ImapError> {
+        if keepalive_secs == 0 {
+            return Err(ImapError::ValidateError);
+        }
+        let watcher = MailboxWatcher {
+            domain,
+            port,
+            username,
+            password,
+            mailbox,
+            keepalive: Duration::from_secs(keepalive_secs),
+            connection: Mutex::new(None),
+            shutdown_handle: Mutex::new(None),
+            stopped: AtomicBool::new(false),
+        };
+        let connection = watcher.connect()?.0;
+        *watcher.connection.lock().unwrap() = Some(connection);
+        Ok(watcher)
+    }
+
+    fn connect(&self) -> Result<(IdleConnection, u32), ImapError> {
+        let (mut connection, shutdown_handle, exists) =
+            IdleConnection::open(&self.domain, self.port, &self.username, &self.password, &self.mailbox)?;
+        *self.shutdown_handle.lock().unwrap() = Some(shutdown_handle);
+        if self.stopped.load(Ordering::SeqCst) { // stop() was called while we were connecting
+            return Err(ImapError::ConnectionLost);
+        }
+        connection.start_idle()?;
+        Ok((connection, exists))
+    }
+
+    // Blocks until the mailbox changes or `timeout_secs` have passed and returns what changed, possibly nothing.
+    // Returns None once stop() was called.
+    // If the connection was lost, we reconnect and report the current number of messages as an Exists event,
+    // since changes in the meantime went unnoticed.
+    pub fn wait(&self, timeout_secs: u32) -> Result<Option<Vec<MailboxEvent>>, ImapError> {
+        let deadline = Instant::now() + Duration::from_secs(timeout_secs.into());
+        let mut connection = self.connection.lock().unwrap();
+        if self.stopped.load(Ordering::SeqCst) {
+            return Ok(None);
+        }
+
+        let mut events = Vec::new();
+        if connection.is_none() {
+            match self.connect() {
+                Ok((reconnected, exists)) => {
+                    *connection = Some(reconnected);
+                    events.push(MailboxEvent { kind: MailboxEventKind::Exists, number: exists, uid: None, flags: Vec::new() });
+                },
+                Err(_) if self.stopped.load(Ordering::SeqCst) => return Ok(None),
+                Err(error) => return Err(error),
+            }
+        }
+        let result = connection.as_mut().unwrap().wait(deadline, self.keepalive);
+        if self.stopped.load(Ordering::SeqCst) {
+            return Ok(None);
+        }
+        match result {
+            Ok(new_events) => events.extend(new_events),
+            Err(ImapError::IoError) | Err(ImapError::ConnectionLost) => *connection = None, // reconnect on the next call
+            Err(error) => return Err(error),
+        }
+        Ok(Some(events))
+    }
+
+    // Ends watching: a concurrent wait() returns None right away, as do all later calls.
+    pub fn stop(&self) {
+        self.stopped.store(true, Ordering::SeqCst);
+        if let Some(shutdown_handle) = self.shutdown_handle.lock().unwrap().take() {
+            let _ = shutdown_handle.shutdown(Shutdown::Both);
+        }
+    }
+}
+
+impl Drop for MailboxWatcher {
+    fn drop(&mut self) {
+        self.stop();
+    }
+}
@@ -0,0 +1,284 @@
+// Streams the body of an email into an SMTP transaction without ever holding all of it in memory:
+// read from a file or handed over chunk by chunk by the caller, and base64-encoded on the fly,
+// so that sending a message of any size takes a few fixed-size buffers.
+// cf. https://datatracker.ietf.org/doc/html/rfc2045#section-6.8
+
+use std::io::{self, ErrorKind, Read};
+
+use base64::Engine;
+use base64::engine::general_purpose::STANDARD as BASE64;
+use thiserror::Error;
+
+// 57 bytes encode to 76 characters, the longest line base64 allows
+const LINE_BYTES: usize = 57;
+const BLOCK_LINES: usize = 16 * 1024; // i.e. about 1 MB is read and encoded at a time
+
+// Raised by a MessageBodySource that can't supply the rest of the body; the send then fails with a MessageBodyError.
+#[derive(Error, Debug)]
+pub enum MessageBodySourceError {
+    #[error("Could not read the message body: {message}")]
+    ReadError { message: String },
+}
+
+// Supplies the body of an email chunk by chunk, cf. simply_send_streamed_email()
+pub trait MessageBodySource: Send + Sync {
+    fn read_chunk(&self) -> Result<Option<Vec<u8>>, MessageBodySourceError>; // None once the body is complete
+}
+
+// Reads the chunks of a MessageBodySource, keeping only the current one in memory.
+pub struct SourceReader {
+    source: Box<dyn MessageBodySource>,
+    chunk: Vec<u8>,
+    position: usize,
+    done: bool,
+}
+
+impl SourceReader {
+    pub fn new(source: Box<dyn MessageBodySource>) -> Self {
+        SourceReader { source, chunk: Vec::new(), position: 0, done: false }
+    }
+}
+
+impl Read for SourceReader {
+    fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+        while self.position == self.chunk.len() {
+            if self.done {
+                return Ok(0);
+            }
+            match self.source.read_chunk() {
+                Ok(Some(chunk)) => {
+                    self.chunk = chunk;
+                    self.position = 0;
+                },
+                Ok(None) => self.done = true,
+                Err(error) => return Err(io::Error::new(ErrorKind::Other, error)),
+            }
+        }
+        let length = buf.len().min(self.chunk.len() - self.position);
+        buf[..length].copy_from_slice(&self.chunk[self.position..self.position + length]);
+        self.position += length;
+        Ok(length)
+    }
+}
+
+// Encodes everything read from `inner` as base64 in CRLF-terminated lines, a block of lines at a time.
+pub struct Base64Lines<R> {
+    inner: R,
+    block: Vec<u8>,
+    encoded: String,
+    position: usize, // in `encoded`
+    done: bool,
+}
+
+impl<R: Read> Base64Lines<R> {
+    pub fn new(inner: R) -> Self {
+        Base64Lines {
+            inner,
+            block: vec![0; LINE_BYTES * BLOCK_LINES],
+            encoded: String::with_capacity((LINE_BYTES / 3 * 4 + 2) * BLOCK_LINES),
+            position: 0,
+            done: false,
+        }
+    }
+
+    fn encode_block(&mut self) -> io::Result<()> {
+        // only the last line of the last block may be shorter, so a block is filled unless the input ends
+        let mut length = 0;
+        while length < self.block.len() {
+            match self.inner.read(&mut self.block[length..]) {
+                Ok(0) => {
+                    self.done = true;
+                    break;
+                },
+                Ok(read) => length += read,
+                Err(error) if error.kind() == ErrorKind::Interrupted => {},
+                Err(error) => return Err(error),
+            }
+        }
+        self.encoded.clear();
+        self.position = 0;
+        encode_lines(&self.block[..length], &mut self.encoded);
+        Ok(())
+    }
+}
+
+impl<R: Read> Read for Base64Lines<R> {
+    fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+        while self.position == self.encoded.len() {
+            if self.done {
+                return Ok(0);
+            }
+            self.encode_block()?;
+        }
+        Ok(copy_encoded(&self.encoded, &mut self.position, buf))
+    }
+}
+
+// Like Base64Lines, for input that is in memory already (e.g. a memory-mapped file):
+// each block is encoded straight from `input` instead of being copied into a buffer first.
+pub struct Base64Slice<'a> {
+    input: &'a [u8],
+    encoded: String,
+    position: usize, // in `encoded`
+}
+
+impl<'a> Base64Slice<'a> {
+    pub fn new(input: &'a [u8]) -> Self {
+        Base64Slice {
+            input,
+            encoded: String::with_capacity((LINE_BYTES / 3 * 4 + 2) * BLOCK_LINES),
+            position: 0,
+        }
+    }
+}
+
+impl Read for Base64Slice<'_> {
+    fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+        if self.position == self.encoded.len() {
+            let (block, rest) = self.input.split_at(self.input.len().min(LINE_BYTES * BLOCK_LINES));
+            self.input = rest;
+            self.encoded.clear();
+            self.position = 0;
+            encode_lines(block, &mut self.encoded);
+        }
+        Ok(copy_encoded(&self.encoded, &mut self.position, buf))
+    }
+}
+
+// The length of `input` once encoded by encode_lines()
+pub fn encoded_length(input: usize) -> usize {
+    let lines = (input + LINE_BYTES - 1) / LINE_BYTES;
+    (input + 2) / 3 * 4 + lines * 2
+}
+
+// Appends `input` to `encoded` as base64, in CRLF-terminated lines of 76 characters.
+pub fn encode_lines(input: &[u8], encoded: &mut String) {
+    for line in input.chunks(LINE_BYTES) {
+        BASE64.encode_string(line, encoded);
+        encoded.push_str("\r\n");
+    }
+}
+
+fn copy_encoded(encoded: &str, position: &mut usize, buf: &mut [u8]) -> usize {
+    let encoded = &encoded.as_bytes()[*position..];
+    let length = buf.len().min(encoded.len());
+    buf[..length].copy_from_slice(&encoded[..length]);
+    *position += length;
+    length
+}
+
+#[cfg(test)]
+mod tests {
+    use std::sync::Mutex;
+
+    use super::*;
+
+    // Hands out `chunks` one after the other
+    struct Chunks(Mutex<Vec<Vec<u8>>>);
+
+    impl MessageBodySource for Chunks {
+        fn read_chunk(&self) -> Result<Option<Vec<u8>>, MessageBodySourceError> {
+            let mut chunks = self.0.lock().unwrap();
+            Ok(if chunks.is_empty() { None } else { Some(chunks.remove(0)) })
+        }
+    }
+
+    // Hands out one chunk, then fails
+    struct Failing(Mutex<bool>);
+
+    impl MessageBodySource for Failing {
+        fn read_chunk(&self) -> Result<Option<Vec<u8>>, MessageBodySourceError> {
+            let mut failed = self.0.lock().unwrap();
+            if *failed {
+                return Err(MessageBodySourceError::ReadError { message: String::from("disk on fire") });
+            }
+            *failed = true;
+            Ok(Some(b"Hello".to_vec()))
+        }
+    }
+
+    fn source_reader(chunks: &[&[u8]]) -> SourceReader {
+        SourceReader::new(Box::new(Chunks(Mutex::new(chunks.iter().map(|chunk| chunk.to_vec()).collect()))))
+    }
+
+    // Reads all of `reader`, `buffer_size` bytes at a time at most
+    fn read_all(mut reader: impl Read, buffer_size: usize) -> Vec<u8> {
+        let mut buffer = vec![0; buffer_size];
+        let mut all = Vec::new();
+        loop {
+            let read = reader.read(&mut buffer).unwrap();
+            if read == 0 {
+                return all;
+            }
+            all.extend_from_slice(&buffer[..read]);
+        }
+    }
+
+    fn encoded(input: &[u8]) -> Vec<u8> {
+        let mut encoded = String::new();
+        encode_lines(input, &mut encoded);
+        encoded.into_bytes()
+    }
+
+    #[test]
+    fn source_reader_joins_the_chunks() {
+        let reader = source_reader(&[b"Hello", b"", b", ", b"world!"]);
+        assert_eq!(read_all(reader, 3), b"Hello, world!");
+        assert_eq!(read_all(source_reader(&[]), 3), b"");
+        assert_eq!(read_all(source_reader(&[b"", b""]), 3), b"");
+    }
+
+    #[test]
+    fn source_reader_fails_when_the_source_does() {
+        let mut reader = SourceReader::new(Box::new(Failing(Mutex::new(false))));
+        let mut buffer = [0; 16];
+        assert_eq!(reader.read(&mut buffer).unwrap(), 5);
+        let error = reader.read(&mut buffer).unwrap_err();
+        assert!(error.to_string().contains("disk on fire"));
+        assert!(Base64Lines::new(SourceReader::new(Box::new(Failing(Mutex::new(false))))).read(&mut buffer).is_err());
+    }
+
+    #[test]
+    fn lines_are_crlf_terminated_and_76_characters_long() {
+        let input: Vec<u8> = (0..1000u32).map(|index| index as u8).collect();
+        let output = encoded(&input);
+        let lines: Vec<_> = output.split_inclusive(|byte| *byte == b'\n').collect();
+        assert_eq!(lines.len(), (input.len() + LINE_BYTES - 1) / LINE_BYTES);
+        for (index, line) in lines.iter().enumerate() {
+            assert!(line.ends_with(b"\r\n"));
+            if index < lines.len() - 1 {
+                assert_eq!(line.len(), 76 + 2);
+            }
+        }
+        let joined: Vec<u8> = lines.iter().flat_map(|line| &line[..line.len() - 2]).copied().collect();
+        assert_eq!(BASE64.decode(joined).unwrap(), input);
+    }
+
+    #[test]
+    fn streamed_encoding_matches_encoding_at_once() {
+        let block = LINE_BYTES * BLOCK_LINES;
+        for length in [0, 1, 2, 3, LINE_BYTES - 1, LINE_BYTES, LINE_BYTES + 1, block - 1, block, block + 1, 2 * block + 58] {
+            let input: Vec<u8> = (0..length).map(|index| (index % 251) as u8).collect();
+            let expected = encoded(&input);
+            assert_eq!(expected.len(), encoded_length(length), "length {length}");
+            assert_eq!(read_all(Base64Lines::new(&input[..]), 1000), expected, "length {length}");
+            assert_eq!(read_all(Base64Slice::new(&input), 1000), expected, "length {length}");
+        }
+    }
+
+    #[test]
+    fn encoding_a_chunked_body_without_trailing_newline() {
+        // chunk boundaries don't fall on line or 3-byte boundaries and the body doesn't end with a CRLF
+        let reader = source_reader(&[b"Line one\r\nLine", b" two", b"\r\nno newline at the end"]);
+        let expected = encoded(b"Line one\r\nLine two\r\nno newline at the end");
+        assert_eq!(read_all(Base64Lines::new(reader), 7), expected);
+        assert!(expected.ends_with(b"\r\n"));
+    }
+
+    #[test]
+    fn encoding_an_empty_body() {
+        assert_eq!(read_all(Base64Lines::new(source_reader(&[])), 16), b"");
+        assert_eq!(read_all(Base64Slice::new(b""), 16), b"");
+        assert_eq!(encoded_length(0), 0);
+    }
+}
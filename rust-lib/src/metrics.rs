@@ -0,0 +1,243 @@
+// Optional instrumentation of every IMAP and SMTP operation: how long each of its phases took (DNS, TCP connect,
+// TLS handshake, authentication, SELECT, FETCH, ...), how many bytes it sent and received and how often it had to reconnect.
+// Metrics are disabled by default. While disabled, the only cost is a relaxed atomic load per operation, phase and read or write.
+// The phases and bytes of an operation are collected in a thread-local recorder, as all of them happen on the calling thread.
+
+use std::cell::RefCell;
+use std::collections::BTreeMap;
+use std::io::{self, Read, Write};
+use std::sync::Mutex;
+use std::sync::atomic::{AtomicBool, Ordering};
+use std::time::Instant;
+
+#[derive(Clone, Copy)]
+pub enum MetricsPhase {
+    Dns,
+    TcpConnect,
+    TlsHandshake,
+    Greeting, // waiting for the server's greeting, and EHLO for SMTP
+    Authenticate,
+    Connect, // all of the above, where lettre doesn't let us tell them apart (SmtpMailer::check(), simply_check_smtp())
+    Select, // SELECT or EXAMINE
+    Fetch,
+    Search,
+    Send, // sending an email, including connecting and authenticating if lettre had no pooled connection
+    Logout, // LOGOUT or QUIT
+    Compress, // COMPRESS DEFLATE
+}
+
+const PHASES: [MetricsPhase; 12] = [
+    MetricsPhase::Dns, MetricsPhase::TcpConnect, MetricsPhase::TlsHandshake, MetricsPhase::Greeting, MetricsPhase::Authenticate,
+    MetricsPhase::Connect, MetricsPhase::Select, MetricsPhase::Fetch, MetricsPhase::Search, MetricsPhase::Send, MetricsPhase::Logout,
+    MetricsPhase::Compress,
+];
+
+// Bucket 0 counts durations below 1 µs, bucket i > 0 those from 2^(i-1) up to 2^i µs, the last bucket all longer ones (above 67 s).
+pub const HISTOGRAM_BUCKETS: usize = 28;
+
+pub struct LatencyHistogram {
+    pub count: u64,
+    pub total_micros: u64,
+    pub buckets: Vec<u64>, // HISTOGRAM_BUCKETS counts
+}
+
+pub struct PhaseLatency {
+    pub phase: MetricsPhase,
+    pub latency: LatencyHistogram, // of the total time an operation spent in this phase, for all operations that went through it
+}
+
+// All calls of one operation since metrics were enabled or last reset, e.g. of "simply_fetch_inbox_top" or "ImapSession.fetch".
+pub struct OperationStats {
+    pub operation: String,
+    pub calls: u64,
+    pub failures: u64,
+    pub retries: u64, // reconnects after a lost connection
+    pub bytes_sent: u64, // on the IMAP or SMTP level, i.e. not counting TLS overhead; 0 for lettre sends
+    pub bytes_received: u64,
+    pub latency: LatencyHistogram, // of whole calls
+    pub phases: Vec<PhaseLatency>, // only the phases the operation went through
+}
+
+#[derive(Default)]
+struct Histogram {
+    count: u64,
+    total_micros: u64,
+    buckets: [u64; HISTOGRAM_BUCKETS],
+}
+
+impl Histogram {
+    fn record(&mut self, micros: u64) {
+        let bucket = (u64::BITS - micros.leading_zeros()) as usize;
+        self.count += 1;
+        self.total_micros += micros;
+        self.buckets[bucket.min(HISTOGRAM_BUCKETS - 1)] += 1;
+    }
+
+    fn to_latency_histogram(&self) -> LatencyHistogram {
+        LatencyHistogram { count: self.count, total_micros: self.total_micros, buckets: self.buckets.to_vec() }
+    }
+}
+
+#[derive(Default)]
+struct Stats {
+    calls: u64,
+    failures: u64,
+    retries: u64,
+    bytes_sent: u64,
+    bytes_received: u64,
+    latency: Histogram,
+    phases: [Histogram; PHASES.len()],
+}
+
+// what a single, still running operation went through
+#[derive(Default)]
+struct Recorder {
+    phase_micros: [Option<u64>; PHASES.len()],
+    retries: u64,
+    bytes_sent: u64,
+    bytes_received: u64,
+}
+
+static ENABLED: AtomicBool = AtomicBool::new(false);
+static STATS: Mutex<BTreeMap<&'static str, Stats>> = Mutex::new(BTreeMap::new());
+
+thread_local! {
+    static RECORDER: RefCell<Option<Recorder>> = RefCell::new(None);
+}
+
+fn enabled() -> bool {
+    ENABLED.load(Ordering::Relaxed)
+}
+
+fn with_recorder<F: FnOnce(&mut Recorder)>(f: F) {
+    RECORDER.with(|recorder| {
+        if let Some(recorder) = recorder.borrow_mut().as_mut() {
+            f(recorder);
+        }
+    });
+}
+
+// clears the recorder even if the operation panics, so that later operations on this thread are recorded again
+struct RecorderGuard;
+
+impl Drop for RecorderGuard {
+    fn drop(&mut self) {
+        RECORDER.with(|recorder| recorder.borrow_mut().take());
+    }
+}
+
+// Runs the operation `name` and records its metrics.
+// An operation run by another one, e.g. ImapSession.fetch_summaries by ImapSession.fetch_summary_columns, counts towards the outer one.
+pub(crate) fn operation<T, E, F: FnOnce() -> Result<T, E>>(name: &'static str, f: F) -> Result<T, E> {
+    if !enabled() || RECORDER.with(|recorder| recorder.borrow().is_some()) {
+        return f();
+    }
+    RECORDER.with(|recorder| *recorder.borrow_mut() = Some(Recorder::default()));
+    let _guard = RecorderGuard;
+
+    let start = Instant::now();
+    let result = f();
+    let micros = start.elapsed().as_micros() as u64;
+
+    if let Some(recorder) = RECORDER.with(|recorder| recorder.borrow_mut().take()) {
+        let mut stats = STATS.lock().unwrap();
+        let stats = stats.entry(name).or_default();
+        stats.calls += 1;
+        stats.failures += result.is_err() as u64;
+        stats.retries += recorder.retries;
+        stats.bytes_sent += recorder.bytes_sent;
+        stats.bytes_received += recorder.bytes_received;
+        stats.latency.record(micros);
+        for (histogram, phase_micros) in stats.phases.iter_mut().zip(recorder.phase_micros) {
+            if let Some(phase_micros) = phase_micros {
+                histogram.record(phase_micros);
+            }
+        }
+    }
+    result
+}
+
+// Runs one phase of the current operation; a phase that is run several times, e.g. a FETCH per chunk, is added up.
+pub(crate) fn phase<T, F: FnOnce() -> T>(phase: MetricsPhase, f: F) -> T {
+    if !enabled() {
+        return f();
+    }
+    let start = Instant::now();
+    let result = f();
+    let micros = start.elapsed().as_micros() as u64;
+    with_recorder(|recorder| {
+        let phase_micros = &mut recorder.phase_micros[phase as usize];
+        *phase_micros = Some(phase_micros.unwrap_or(0) + micros);
+    });
+    result
+}
+
+// Notes that the current operation lost its connection and connects again.
+pub(crate) fn retry() {
+    if enabled() {
+        with_recorder(|recorder| recorder.retries += 1);
+    }
+}
+
+// Counts the bytes read from and written to `inner` towards the current operation.
+pub(crate) struct CountingStream<S> {
+    inner: S,
+}
+
+impl<S> CountingStream<S> {
+    pub(crate) fn new(inner: S) -> Self {
+        CountingStream { inner }
+    }
+}
+
+impl<S: Read> Read for CountingStream<S> {
+    fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+        let read = self.inner.read(buf)?;
+        if enabled() {
+            with_recorder(|recorder| recorder.bytes_received += read as u64);
+        }
+        Ok(read)
+    }
+}
+
+impl<S: Write> Write for CountingStream<S> {
+    fn write(&mut self, buf: &[u8]) -> io::Result<usize> {
+        let written = self.inner.write(buf)?;
+        if enabled() {
+            with_recorder(|recorder| recorder.bytes_sent += written as u64);
+        }
+        Ok(written)
+    }
+
+    fn flush(&mut self) -> io::Result<()> {
+        self.inner.flush()
+    }
+}
+
+// Turns the recording of metrics on or off; metrics recorded so far are kept.
+pub fn simply_set_metrics_enabled(enabled: bool) {
+    ENABLED.store(enabled, Ordering::Relaxed);
+}
+
+// The metrics of all operations that were called at least once, sorted by operation name.
+pub fn simply_metrics_snapshot() -> Vec<OperationStats> {
+    STATS.lock().unwrap().iter()
+        .map(|(name, stats)| OperationStats {
+            operation: String::from(*name),
+            calls: stats.calls,
+            failures: stats.failures,
+            retries: stats.retries,
+            bytes_sent: stats.bytes_sent,
+            bytes_received: stats.bytes_received,
+            latency: stats.latency.to_latency_histogram(),
+            phases: PHASES.iter().zip(&stats.phases)
+                .filter(|(_, histogram)| histogram.count > 0)
+                .map(|(phase, histogram)| PhaseLatency { phase: *phase, latency: histogram.to_latency_histogram() })
+                .collect(),
+        })
+        .collect()
+}
+
+pub fn simply_reset_metrics() {
+    STATS.lock().unwrap().clear();
+}
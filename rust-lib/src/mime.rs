@@ -0,0 +1,145 @@
+// Parsing fetched emails into their MIME parts, so that callers don't have to parse the raw RFC822 bytes themselves.
+// Only the structure is parsed up front; the content of a part is transfer- and charset-decoded when it is asked for.
+// cf. https://datatracker.ietf.org/doc/html/rfc2045 and https://docs.rs/mailparse/0.14
+
+use std::ops::Range;
+
+use mailparse::{DispositionType, MailHeaderMap, ParsedMail};
+use thiserror::Error;
+
+#[derive(Error, Debug)]
+pub enum MimeError {
+    #[error("MIME error: the email could not be parsed.")]
+    ParseError,
+    #[error("MIME error: the email has no part with this index.")]
+    NoSuchPart,
+}
+
+impl From<mailparse::MailParseError> for MimeError {
+    fn from(_: mailparse::MailParseError) -> Self {
+        Self::ParseError
+    }
+}
+
+#[derive(Clone)]
+pub struct MimeHeader {
+    pub name: String,
+    pub value: String, // with RFC 2047 encoded words decoded
+}
+
+// A single part of an email; the email itself is the first one.
+#[derive(Clone)]
+pub struct MimePart {
+    pub index: u32, // of this part in ParsedMessage::parts(), in depth-first order
+    pub parent: Option<u32>, // the index of the enclosing multipart, None for the email itself
+    pub headers: Vec<MimeHeader>,
+    pub mime_type: String, // e.g. "text/plain", lowercase; "text/plain" if there is no Content-Type header
+    pub charset: String, // e.g. "utf-8", lowercase; "us-ascii" if none was given
+    pub transfer_encoding: String, // e.g. "base64", lowercase; "7bit" if there is no Content-Transfer-Encoding header
+    pub is_attachment: bool, // Content-Disposition: attachment
+    pub filename: Option<String>, // from the Content-Disposition or, failing that, the Content-Type header
+    pub offset: u64, // of the (still encoded) body of this part in the raw email
+    pub length: u64, // of the (still encoded) body of this part
+}
+
+fn byte_offset(inner: &[u8], outer: &[u8]) -> usize {
+    // mailparse hands out the parts as subslices of the raw email
+    inner.as_ptr() as usize - outer.as_ptr() as usize
+}
+
+fn collect_parts(raw: &[u8], mail: &ParsedMail, parent: Option<u32>,
+    parts: &mut Vec<MimePart>, spans: &mut Vec<Range<usize>>) -> Result<(), MimeError> {
+    let index = parts.len() as u32;
+    let start = byte_offset(mail.raw_bytes, raw);
+    let (_, body_start) = mailparse::parse_headers(mail.raw_bytes)?;
+    let disposition = mail.get_content_disposition();
+    let filename = disposition.params.get("filename")
+        .or_else(|| mail.ctype.params.get("name"))
+        .cloned();
+
+    parts.push(MimePart {
+        index,
+        parent,
+        headers: mail.headers.iter().map(|header| MimeHeader { name: header.get_key(), value: header.get_value() }).collect(),
+        mime_type: mail.ctype.mimetype.to_lowercase(),
+        charset: mail.ctype.charset.to_lowercase(),
+        transfer_encoding: mail.headers.get_first_value("Content-Transfer-Encoding")
+            .map_or_else(|| String::from("7bit"), |encoding| encoding.trim().to_lowercase()),
+        is_attachment: disposition.disposition == DispositionType::Attachment,
+        filename,
+        offset: (start + body_start) as u64,
+        length: mail.raw_bytes.len().saturating_sub(body_start) as u64,
+    });
+    spans.push(start..start + mail.raw_bytes.len());
+
+    for subpart in &mail.subparts {
+        collect_parts(raw, subpart, Some(index), parts, spans)?;
+    }
+    Ok(())
+}
+
+// A parsed email. It keeps its raw bytes to decode the content of a part from when it is asked for.
+pub struct ParsedMessage {
+    raw: Vec<u8>,
+    parts: Vec<MimePart>,
+    spans: Vec<Range<usize>>, // of each part, headers included, in `raw`
+}
+
+impl ParsedMessage {
+    pub fn new(raw: Vec<u8>) -> Result<Self, MimeError> {
+        let mut parts = Vec::new();
+        let mut spans = Vec::new();
+        collect_parts(&raw, &mailparse::parse_mail(&raw)?, None, &mut parts, &mut spans)?;
+        Ok(ParsedMessage { raw, parts, spans })
+    }
+
+    // Parses just the given part again, which is cheap compared to decoding all parts up front.
+    fn parse_part(&self, index: u32) -> Result<ParsedMail, MimeError> {
+        let span = self.spans.get(index as usize).ok_or(MimeError::NoSuchPart)?;
+        Ok(mailparse::parse_mail(&self.raw[span.clone()])?)
+    }
+
+    // the headers of the email itself
+    pub fn headers(&self) -> Vec<MimeHeader> {
+        self.parts[0].headers.clone()
+    }
+
+    pub fn parts(&self) -> Vec<MimePart> {
+        self.parts.clone()
+    }
+
+    // the parts that are meant to be saved rather than displayed, i.e. those with Content-Disposition: attachment or a filename
+    pub fn attachments(&self) -> Vec<MimePart> {
+        self.parts.iter()
+            .filter(|part| part.is_attachment || (part.filename.is_some() && !part.mime_type.starts_with("multipart/")))
+            .cloned()
+            .collect()
+    }
+
+    // the first text/plain part that isn't an attachment, decoded to a string
+    pub fn text_body(&self) -> Result<Option<String>, MimeError> {
+        self.body_of_type("text/plain")
+    }
+
+    // the first text/html part that isn't an attachment, decoded to a string
+    pub fn html_body(&self) -> Result<Option<String>, MimeError> {
+        self.body_of_type("text/html")
+    }
+
+    fn body_of_type(&self, mime_type: &str) -> Result<Option<String>, MimeError> {
+        match self.parts.iter().find(|part| part.mime_type == mime_type && !part.is_attachment) {
+            Some(part) => Ok(Some(self.part_text(part.index)?)),
+            None => Ok(None),
+        }
+    }
+
+    // the content of a part with its Content-Transfer-Encoding (base64, quoted-printable) undone, e.g. the bytes of an attachment
+    pub fn part_content(&self, index: u32) -> Result<Vec<u8>, MimeError> {
+        Ok(self.parse_part(index)?.get_body_raw()?)
+    }
+
+    // like part_content(), but also decoded from the part's charset
+    pub fn part_text(&self, index: u32) -> Result<String, MimeError> {
+        Ok(self.parse_part(index)?.get_body()?)
+    }
+}
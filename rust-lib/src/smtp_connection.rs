@@ -0,0 +1,505 @@
+// A minimal SMTP client that talks to the server directly over implicit TLS, just like SmtpTransport::relay() does.
+// lettre hides its connections behind `send()`, so this is used wherever we need control over the wire protocol,
+// e.g. to pipeline MAIL/RCPT/DATA commands [RFC 2920] when sending many messages over one connection,
+// or to stream a message of any size in BDAT chunks [RFC 3030].
+// cf. https://datatracker.ietf.org/doc/html/rfc5321
+
+use std::io::{BufRead, BufReader, ErrorKind, Read, Write};
+use std::net::{IpAddr, TcpStream, ToSocketAddrs};
+
+use base64::Engine;
+use base64::engine::general_purpose::STANDARD as BASE64;
+use native_tls::TlsStream;
+
+use crate::metrics::{self, CountingStream, MetricsPhase};
+use crate::{set_io_timeouts, tls_connector, SmtpError, SmtpResponse};
+
+// the "submissions" port used by SmtpTransport::relay(), cf. https://datatracker.ietf.org/doc/html/rfc8314
+pub const SUBMISSIONS_PORT: u16 = 465;
+
+// how much of a message is read, and written to the server, at a time
+const BDAT_CHUNK_SIZE: usize = 1024 * 1024;
+const DATA_BLOCK_SIZE: usize = 64 * 1024;
+
+impl From<std::io::Error> for SmtpError {
+    fn from(error: std::io::Error) -> Self {
+        match error.kind() {
+            ErrorKind::TimedOut | ErrorKind::WouldBlock => Self::Timeout, // cf. IO_TIMEOUT
+            _ => Self::NetworkError,
+        }
+    }
+}
+
+impl SmtpResponse {
+    fn is_positive(&self) -> bool {
+        self.severity == 2 || self.severity == 3
+    }
+
+    fn into_result(self) -> Result<SmtpResponse, SmtpError> {
+        match self.severity {
+            2 | 3 => Ok(self),
+            4 => Err(SmtpError::TransientSmtpError),
+            _ => Err(SmtpError::PermanentSmtpError),
+        }
+    }
+}
+
+// The outcome of a single pipelined transaction, cf. SmtpConnection::send()
+pub struct SendOutcome {
+    pub result: Result<SmtpResponse, SmtpError>,
+    pub rejected_recipients: Vec<String>,
+}
+
+// S is only ever something else than a TLS connection in the tests
+pub struct SmtpConnection<S = TlsStream<TcpStream>> {
+    stream: BufReader<CountingStream<S>>,
+    extensions: Vec<String>, // the upper-cased EHLO keywords, e.g. "PIPELINING" or "AUTH PLAIN LOGIN"
+}
+
+impl SmtpConnection {
+    pub fn connect(smtp_server: &str, port: u16, smtp_username: &str, smtp_password: &str) -> Result<Self, SmtpError> {
+        let addresses: Vec<_> = metrics::phase(MetricsPhase::Dns, || (smtp_server, port).to_socket_addrs())
+            .map_err(|_| SmtpError::ConnectionError)?.collect();
+        let tcp_stream = metrics::phase(MetricsPhase::TcpConnect, || TcpStream::connect(&addresses[..]))
+            .map_err(|_| SmtpError::ConnectionError)?;
+        set_io_timeouts(&tcp_stream)?;
+        let local_ip = tcp_stream.local_addr()?.ip();
+        let tls = tls_connector().map_err(|_| SmtpError::TlsError)?;
+        let tls_stream = metrics::phase(MetricsPhase::TlsHandshake, || tls.connect(smtp_server, tcp_stream))
+            .map_err(|_| SmtpError::TlsError)?;
+
+        let mut connection = SmtpConnection {
+            stream: BufReader::new(CountingStream::new(tls_stream)),
+            extensions: Vec::new(),
+        };
+        metrics::phase(MetricsPhase::Greeting, || {
+            connection.read_response()?.into_result()?; // the 220 greeting
+            connection.ehlo(local_ip)
+        })?;
+        metrics::phase(MetricsPhase::Authenticate, || connection.authenticate(smtp_username, smtp_password))?;
+        Ok(connection)
+    }
+}
+
+impl<S: Read + Write> SmtpConnection<S> {
+    fn ehlo(&mut self, local_ip: IpAddr) -> Result<(), SmtpError> {
+        // cf. https://datatracker.ietf.org/doc/html/rfc5321#section-4.1.3
+        let address_literal = match local_ip {
+            IpAddr::V4(ip) => format!("[{ip}]"),
+            IpAddr::V6(ip) => format!("[IPv6:{ip}]"),
+        };
+        let response = self.command(&format!("EHLO {address_literal}"))?;
+        // the first line is the server's greeting, every other line names an extension
+        self.extensions = response.message.lines().skip(1).map(|line| line.trim().to_uppercase()).collect();
+        Ok(())
+    }
+
+    fn authenticate(&mut self, smtp_username: &str, smtp_password: &str) -> Result<(), SmtpError> {
+        // cf. https://datatracker.ietf.org/doc/html/rfc4616 and https://datatracker.ietf.org/doc/html/draft-murchison-sasl-login-00
+        if self.supports_auth("PLAIN") {
+            let credentials = BASE64.encode(format!("\0{smtp_username}\0{smtp_password}"));
+            self.command(&format!("AUTH PLAIN {credentials}"))?;
+        } else if self.supports_auth("LOGIN") {
+            self.command("AUTH LOGIN")?;
+            self.command(&BASE64.encode(smtp_username))?;
+            self.command(&BASE64.encode(smtp_password))?;
+        } else {
+            let advertised = self.auth_mechanisms().join(" ");
+            return Err(SmtpError::UnsupportedAuthMechanism(if advertised.is_empty() { String::from("none") } else { advertised }));
+        }
+        Ok(())
+    }
+
+    fn auth_mechanisms(&self) -> Vec<&str> {
+        self.extensions.iter()
+            .filter_map(|extension| extension.strip_prefix("AUTH "))
+            .flat_map(str::split_whitespace)
+            .collect()
+    }
+
+    fn supports_auth(&self, mechanism: &str) -> bool {
+        self.auth_mechanisms().contains(&mechanism)
+    }
+
+    pub fn supports(&self, extension: &str) -> bool {
+        self.extensions.iter().any(|e| e.split_whitespace().next() == Some(extension))
+    }
+
+    // Reads a (possibly multiline) reply, e.g. "250-First line\r\n250 Last line\r\n"
+    pub fn read_response(&mut self) -> Result<SmtpResponse, SmtpError> {
+        let mut lines = Vec::new();
+        loop {
+            let mut line = String::new();
+            if self.stream.read_line(&mut line)? == 0 {
+                return Err(SmtpError::ConnectionError);
+            }
+            let line = line.trim_end_matches(&['\r', '\n'][..]);
+            let digits = line.as_bytes();
+            if digits.len() < 3 || !digits[..3].iter().all(u8::is_ascii_digit) {
+                return Err(SmtpError::ResponseParseError);
+            }
+            lines.push(line.get(4..).unwrap_or("").to_string());
+            if digits.get(3) != Some(&b'-') {
+                return Ok(SmtpResponse {
+                    severity: digits[0] - b'0',
+                    category: digits[1] - b'0',
+                    detail: digits[2] - b'0',
+                    message: lines.join("\n"),
+                });
+            }
+        }
+    }
+
+    pub fn write_all(&mut self, data: &[u8]) -> Result<(), SmtpError> {
+        Ok(self.stream.get_mut().write_all(data)?)
+    }
+
+    pub fn flush(&mut self) -> Result<(), SmtpError> {
+        Ok(self.stream.get_mut().flush()?)
+    }
+
+    // Sends a single command and fails unless the server replied with a 2xx or 3xx code.
+    pub fn command(&mut self, command: &str) -> Result<SmtpResponse, SmtpError> {
+        self.write_all(format!("{command}\r\n").as_bytes())?;
+        self.flush()?;
+        self.read_response()?.into_result()
+    }
+
+    // Sends one message, streaming it from `message`. If the server advertises PIPELINING, MAIL, all RCPTs and DATA go out in a single write.
+    // If it advertises CHUNKING, the message is sent in BDAT chunks instead of after DATA, so it needs no dot-stuffing.
+    // Recipients that are rejected are reported in the outcome; the message is still delivered to all the others.
+    // Only I/O errors (including MessageBodyError when reading `message` fails) are returned as Err(_),
+    // after which this connection must not be used anymore.
+    pub fn send(&mut self, from: &str, to: &[String], message: &mut dyn Read) -> Result<SendOutcome, SmtpError> {
+        let pipelining = self.supports("PIPELINING");
+        let chunking = self.supports("CHUNKING");
+        let mut commands = vec![format!("MAIL FROM:<{from}>\r\n")];
+        commands.extend(to.iter().map(|recipient| format!("RCPT TO:<{recipient}>\r\n")));
+        if !chunking {
+            commands.push(String::from("DATA\r\n"));
+        }
+
+        if pipelining {
+            self.write_all(commands.concat().as_bytes())?;
+            self.flush()?;
+        }
+        let mut responses: Vec<SmtpResponse> = Vec::with_capacity(commands.len());
+        for (index, command) in commands.iter().enumerate() {
+            if !pipelining {
+                // without pipelining, we stop as soon as MAIL failed or when no recipient was accepted before DATA
+                let mail_failed = responses.first().map_or(false, |response| !response.is_positive());
+                let no_recipient_accepted = !chunking && index == commands.len() - 1 && !responses[1..].iter().any(SmtpResponse::is_positive);
+                if mail_failed || no_recipient_accepted {
+                    break;
+                }
+                self.write_all(command.as_bytes())?;
+                self.flush()?;
+            }
+            responses.push(self.read_response()?);
+        }
+
+        let mail_accepted = responses.first().map_or(false, SmtpResponse::is_positive);
+        let rejected_recipients = to.iter().zip(responses.iter().skip(1))
+            .filter(|(_, response)| mail_accepted && !response.is_positive())
+            .map(|(recipient, _)| recipient.clone())
+            .collect();
+
+        let ready = responses.len() == commands.len() && if chunking {
+            mail_accepted && responses[1..].iter().any(SmtpResponse::is_positive)
+        } else {
+            responses[commands.len() - 1].severity == 3 // 354 Start mail input
+        };
+        let result = if ready && chunking {
+            self.write_chunks(message, pipelining)?
+        } else if ready {
+            self.write_data(message)?;
+            self.read_response()?.into_result()
+        } else {
+            self.command("RSET")?;
+            // report the reply that made the transaction fail: the MAIL reply, DATA's or that of the last rejected recipient
+            let failure = responses.into_iter().rev().find(|response| !response.is_positive());
+            match failure {
+                Some(failure) => failure.into_result(),
+                None => Err(SmtpError::ResponseParseError),
+            }
+        };
+        Ok(SendOutcome { result, rejected_recipients })
+    }
+
+    // Writes the message content followed by the "." terminator, dot-stuffing lines that start with a "."
+    // cf. https://datatracker.ietf.org/doc/html/rfc5321#section-4.5.2
+    fn write_data(&mut self, message: &mut dyn Read) -> Result<(), SmtpError> {
+        let mut block = vec![0; DATA_BLOCK_SIZE];
+        let mut stuffed = Vec::with_capacity(DATA_BLOCK_SIZE + DATA_BLOCK_SIZE / 64);
+        let mut at_line_start = true;
+        let mut tail = *b"\r\n"; // the last two bytes written, so that an empty message gets no CRLF
+        loop {
+            let length = read_message(message, &mut block)?;
+            if length == 0 {
+                break;
+            }
+            stuffed.clear();
+            for line in block[..length].split_inclusive(|byte| *byte == b'\n') {
+                if at_line_start && line[0] == b'.' {
+                    stuffed.push(b'.');
+                }
+                stuffed.extend_from_slice(line);
+                at_line_start = line.ends_with(b"\n");
+            }
+            tail = if length >= 2 { [block[length - 2], block[length - 1]] } else { [tail[1], block[0]] };
+            self.write_all(&stuffed)?;
+        }
+        if &tail != b"\r\n" {
+            self.write_all(b"\r\n")?;
+        }
+        self.write_all(b".\r\n")?;
+        self.flush()
+    }
+
+    // Writes the message in BDAT chunks, the last one being marked as such, and returns the reply to the last chunk.
+    // With pipelining, the next chunk is written while the reply to the previous one is still outstanding.
+    // cf. https://datatracker.ietf.org/doc/html/rfc3030#section-2
+    fn write_chunks(&mut self, message: &mut dyn Read, pipelining: bool) -> Result<Result<SmtpResponse, SmtpError>, SmtpError> {
+        let mut chunk = vec![0; BDAT_CHUNK_SIZE];
+        let mut outstanding = 0;
+        loop {
+            let length = read_message(message, &mut chunk)?;
+            let last = length < chunk.len();
+            let command = if last { format!("BDAT {length} LAST\r\n") } else { format!("BDAT {length}\r\n") };
+            self.write_all(command.as_bytes())?;
+            self.write_all(&chunk[..length])?;
+            self.flush()?;
+            outstanding += 1;
+
+            let allowed_outstanding = if pipelining && !last { 1 } else { 0 };
+            while outstanding > allowed_outstanding {
+                let response = self.read_response()?;
+                outstanding -= 1;
+                if !response.is_positive() {
+                    // no more chunks may be sent after a failed one, which ends the transaction unless it was the last
+                    for _ in 0..outstanding {
+                        self.read_response()?;
+                    }
+                    if !last {
+                        self.command("RSET")?;
+                    }
+                    return Ok(response.into_result());
+                }
+                if last && outstanding == 0 {
+                    return Ok(Ok(response));
+                }
+            }
+        }
+    }
+
+    // Politely closes the connection; errors don't matter anymore at this point.
+    pub fn quit(mut self) {
+        let _ = self.command("QUIT");
+    }
+}
+
+// Fills `buffer` from `message`, unless the message ends before, and returns the number of bytes read.
+fn read_message(message: &mut dyn Read, buffer: &mut [u8]) -> Result<usize, SmtpError> {
+    let mut length = 0;
+    while length < buffer.len() {
+        match message.read(&mut buffer[length..]) {
+            Ok(0) => break,
+            Ok(read) => length += read,
+            Err(error) if error.kind() == ErrorKind::Interrupted => {},
+            Err(_) => return Err(SmtpError::MessageBodyError),
+        }
+    }
+    Ok(length)
+}
+
+#[cfg(test)]
+mod tests {
+    use std::cell::RefCell;
+    use std::io::{self, Cursor, Read, Write};
+    use std::rc::Rc;
+
+    use super::*;
+
+    // A server that sends `replies` and records everything written to it.
+    struct FakeServer {
+        replies: Cursor<Vec<u8>>,
+        written: Rc<RefCell<Vec<u8>>>,
+    }
+
+    impl Read for FakeServer {
+        fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+            self.replies.read(buf)
+        }
+    }
+
+    impl Write for FakeServer {
+        fn write(&mut self, buf: &[u8]) -> io::Result<usize> {
+            self.written.borrow_mut().extend_from_slice(buf);
+            Ok(buf.len())
+        }
+
+        fn flush(&mut self) -> io::Result<()> {
+            Ok(())
+        }
+    }
+
+    fn connection(replies: &str) -> (SmtpConnection<FakeServer>, Rc<RefCell<Vec<u8>>>) {
+        let written = Rc::new(RefCell::new(Vec::new()));
+        let server = FakeServer { replies: Cursor::new(replies.as_bytes().to_vec()), written: Rc::clone(&written) };
+        let connection = SmtpConnection { stream: BufReader::new(CountingStream::new(server)), extensions: Vec::new() };
+        (connection, written)
+    }
+
+    // What write_data() should send for `message`, dot-stuffing it line by line
+    fn stuffed(message: &[u8]) -> Vec<u8> {
+        let mut expected = Vec::new();
+        for line in message.split_inclusive(|byte| *byte == b'\n') {
+            if line[0] == b'.' {
+                expected.push(b'.');
+            }
+            expected.extend_from_slice(line);
+        }
+        if !message.is_empty() && !message.ends_with(b"\r\n") {
+            expected.extend_from_slice(b"\r\n");
+        }
+        expected.extend_from_slice(b".\r\n");
+        expected
+    }
+
+    fn write_data(message: &[u8]) -> Vec<u8> {
+        let (mut connection, written) = connection("");
+        connection.write_data(&mut &message[..]).unwrap();
+        let written = written.borrow().clone();
+        written
+    }
+
+    #[test]
+    fn authentication_fails_without_a_supported_mechanism() {
+        let (mut connection, written) = connection("");
+        connection.extensions = vec![String::from("PIPELINING"), String::from("AUTH CRAM-MD5 XOAUTH2")];
+        let result = connection.authenticate("john.doe@example.com", "123456");
+        assert!(matches!(result, Err(SmtpError::UnsupportedAuthMechanism(mechanisms)) if mechanisms == "CRAM-MD5 XOAUTH2"));
+        assert!(written.borrow().is_empty());
+
+        connection.extensions.clear();
+        let result = connection.authenticate("john.doe@example.com", "123456");
+        assert!(matches!(result, Err(SmtpError::UnsupportedAuthMechanism(mechanisms)) if mechanisms == "none"));
+    }
+
+    #[test]
+    fn authentication_prefers_plain() {
+        let (mut connection, written) = connection("235 Authenticated\r\n");
+        connection.extensions = vec![String::from("AUTH LOGIN PLAIN")];
+        connection.authenticate("john", "secret").unwrap();
+        assert_eq!(&written.borrow()[..], format!("AUTH PLAIN {}\r\n", BASE64.encode("\0john\0secret")).as_bytes());
+    }
+
+    #[test]
+    fn data_stuffs_dots_at_line_starts() {
+        let message = b"Subject: test\r\n\r\n.hidden\r\n..two\r\nnot.first\r\n.";
+        assert_eq!(write_data(message), stuffed(message));
+        assert!(write_data(message).starts_with(b"Subject: test\r\n\r\n..hidden\r\n...two\r\nnot.first\r\n..\r\n"));
+    }
+
+    #[test]
+    fn data_stuffs_dots_at_line_starts_across_blocks() {
+        // a line starting with a "." right at the start of the second block
+        let mut message = vec![b'a'; DATA_BLOCK_SIZE - 2];
+        message.extend_from_slice(b"\r\n.first\r\n");
+        assert_eq!(write_data(&message), stuffed(&message));
+
+        // the CRLF before it split between the blocks
+        let mut message = vec![b'a'; DATA_BLOCK_SIZE - 1];
+        message.extend_from_slice(b"\r\n.second\r\n");
+        assert_eq!(write_data(&message), stuffed(&message));
+
+        // a "." at the end of a block that doesn't start a line
+        let mut message = vec![b'a'; DATA_BLOCK_SIZE - 1];
+        message.extend_from_slice(b".\r\n");
+        assert_eq!(write_data(&message), stuffed(&message));
+    }
+
+    #[test]
+    fn data_terminates_a_message_without_trailing_crlf() {
+        assert_eq!(write_data(b"Hello"), b"Hello\r\n.\r\n");
+        assert_eq!(write_data(b"Hello\r\n"), b"Hello\r\n.\r\n");
+        assert_eq!(write_data(b"Hello\n"), b"Hello\n\r\n.\r\n");
+
+        // the last CRLF split between the blocks
+        let mut message = vec![b'a'; DATA_BLOCK_SIZE - 1];
+        message.extend_from_slice(b"\r\n");
+        assert_eq!(write_data(&message), stuffed(&message));
+
+        // the last block being a single byte
+        let mut message = vec![b'a'; DATA_BLOCK_SIZE];
+        message.push(b'b');
+        assert_eq!(write_data(&message), stuffed(&message));
+    }
+
+    #[test]
+    fn data_of_an_empty_message() {
+        assert_eq!(write_data(b""), b".\r\n");
+    }
+
+    // Splits what write_chunks() sent into its BDAT commands and chunks.
+    fn bdat_chunks(mut written: &[u8]) -> Vec<(String, Vec<u8>)> {
+        let mut chunks = Vec::new();
+        while !written.is_empty() {
+            let end = written.windows(2).position(|window| window == b"\r\n").unwrap();
+            let command = String::from_utf8(written[..end].to_vec()).unwrap();
+            let length: usize = command.split(' ').nth(1).unwrap().parse().unwrap();
+            chunks.push((command, written[end + 2..end + 2 + length].to_vec()));
+            written = &written[end + 2 + length..];
+        }
+        chunks
+    }
+
+    fn write_chunks(message: &[u8], replies: &str, pipelining: bool) -> (Result<SmtpResponse, SmtpError>, Vec<u8>) {
+        let (mut connection, written) = connection(replies);
+        let result = connection.write_chunks(&mut &message[..], pipelining).unwrap();
+        let written = written.borrow().clone();
+        (result, written)
+    }
+
+    #[test]
+    fn chunks_are_full_but_for_the_last() {
+        let message: Vec<u8> = (0..2 * BDAT_CHUNK_SIZE + 5).map(|index| index as u8).collect();
+        for pipelining in [false, true] {
+            let (result, written) = write_chunks(&message, "250 OK\r\n250 OK\r\n250 Queued\r\n", pipelining);
+            assert_eq!(result.unwrap().message, "Queued");
+            let chunks = bdat_chunks(&written);
+            let commands: Vec<_> = chunks.iter().map(|(command, _)| command.as_str()).collect();
+            let full = format!("BDAT {BDAT_CHUNK_SIZE}");
+            assert_eq!(commands, [full.as_str(), full.as_str(), "BDAT 5 LAST"]);
+            assert_eq!(chunks.into_iter().flat_map(|(_, chunk)| chunk).collect::<Vec<_>>(), message);
+        }
+    }
+
+    #[test]
+    fn chunks_end_with_an_empty_last_one_after_a_full_one() {
+        let message = vec![b'.'; BDAT_CHUNK_SIZE];
+        let (result, written) = write_chunks(&message, "250 OK\r\n250 Queued\r\n", false);
+        assert!(result.is_ok());
+        let chunks = bdat_chunks(&written);
+        assert_eq!(chunks.len(), 2);
+        assert_eq!(chunks[0], (format!("BDAT {BDAT_CHUNK_SIZE}"), message)); // no dot-stuffing
+        assert_eq!(chunks[1], (String::from("BDAT 0 LAST"), Vec::new()));
+    }
+
+    #[test]
+    fn chunks_of_an_empty_message() {
+        let (result, written) = write_chunks(b"", "250 Queued\r\n", true);
+        assert!(result.is_ok());
+        assert_eq!(written, b"BDAT 0 LAST\r\n");
+    }
+
+    #[test]
+    fn chunks_stop_after_a_rejected_one() {
+        let message = vec![b'a'; 2 * BDAT_CHUNK_SIZE];
+        let (result, written) = write_chunks(&message, "552 Too big\r\n250 Reset\r\n", false);
+        assert!(matches!(result, Err(SmtpError::PermanentSmtpError)));
+        assert!(written.starts_with(format!("BDAT {BDAT_CHUNK_SIZE}\r\n").as_bytes()));
+        assert!(written.ends_with(b"RSET\r\n"));
+        assert_eq!(written.len(), format!("BDAT {BDAT_CHUNK_SIZE}\r\n").len() + BDAT_CHUNK_SIZE + "RSET\r\n".len());
+    }
+}
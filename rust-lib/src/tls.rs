@@ -0,0 +1,108 @@
+// One TLS configuration shared by all IMAP and SMTP connections of the process.
+// Building a native_tls::TlsConnector loads the system's trust store, which is far slower than the handshake itself,
+// so it is built once and then cloned for every connection, which is cheap.
+
+use std::collections::HashMap;
+use std::sync::Mutex;
+
+use lettre::transport::smtp::client::{Certificate as SmtpCertificate, TlsParameters, TlsVersion};
+use native_tls::{Certificate, Protocol, TlsConnector};
+use thiserror::Error;
+
+use crate::SmtpError;
+
+#[derive(Error, Debug)]
+pub enum TlsConfigError {
+    #[error("TLS configuration error: the minimum protocol version must be \"1.0\", \"1.1\" or \"1.2\".")]
+    InvalidProtocolVersion,
+    #[error("TLS configuration error: a root certificate is not a valid PEM certificate.")]
+    InvalidCertificate,
+    #[error("TLS configuration error: the TLS library rejected the configuration.")]
+    BackendError,
+}
+
+pub struct TlsOptions {
+    pub min_protocol_version: Option<String>, // e.g. "1.2"; the TLS library's default if None
+    pub root_certificates_pem: Vec<String>, // trusted in addition to the system's trust store, e.g. for a company CA
+}
+
+struct TlsContext {
+    connector: TlsConnector,
+    min_protocol_version: Option<(Protocol, TlsVersion)>,
+    root_certificates_pem: Vec<String>,
+    smtp_parameters: HashMap<String, TlsParameters>, // per SMTP server, as lettre verifies the domain name itself
+}
+
+impl TlsContext {
+    fn new(options: TlsOptions) -> Result<Self, TlsConfigError> {
+        let min_protocol_version = match options.min_protocol_version.as_deref() {
+            None => None,
+            Some("1.0") => Some((Protocol::Tlsv10, TlsVersion::Tlsv10)),
+            Some("1.1") => Some((Protocol::Tlsv11, TlsVersion::Tlsv11)),
+            Some("1.2") => Some((Protocol::Tlsv12, TlsVersion::Tlsv12)),
+            Some(_) => return Err(TlsConfigError::InvalidProtocolVersion),
+        };
+
+        let mut builder = TlsConnector::builder();
+        builder.min_protocol_version(min_protocol_version.map(|(protocol, _)| protocol));
+        for pem in &options.root_certificates_pem {
+            let certificate = Certificate::from_pem(pem.as_bytes()).map_err(|_| TlsConfigError::InvalidCertificate)?;
+            builder.add_root_certificate(certificate);
+        }
+        let connector = builder.build().map_err(|_| TlsConfigError::BackendError)?;
+
+        Ok(TlsContext {
+            connector,
+            min_protocol_version,
+            root_certificates_pem: options.root_certificates_pem,
+            smtp_parameters: HashMap::new(),
+        })
+    }
+}
+
+// None until the first connection or simply_configure_tls(), whichever comes first
+static TLS_CONTEXT: Mutex<Option<TlsContext>> = Mutex::new(None);
+
+// The default configuration can only fail if the system's trust store can't be loaded.
+fn with_context<R>(f: impl FnOnce(&mut TlsContext) -> R) -> Result<R, native_tls::Error> {
+    let mut context = TLS_CONTEXT.lock().unwrap();
+    if context.is_none() {
+        *context = Some(TlsContext {
+            connector: TlsConnector::new()?,
+            min_protocol_version: None,
+            root_certificates_pem: Vec::new(),
+            smtp_parameters: HashMap::new(),
+        });
+    }
+    Ok(f(context.as_mut().unwrap()))
+}
+
+// Replaces the TLS configuration of all connections opened from now on; existing connections keep theirs.
+pub fn simply_configure_tls(options: TlsOptions) -> Result<(), TlsConfigError> {
+    let context = TlsContext::new(options)?;
+    *TLS_CONTEXT.lock().unwrap() = Some(context);
+    Ok(())
+}
+
+pub(crate) fn tls_connector() -> Result<TlsConnector, native_tls::Error> {
+    with_context(|context| context.connector.clone())
+}
+
+// lettre builds a connector of its own for every TlsParameters, so these are cached per server as well.
+pub(crate) fn smtp_tls_parameters(smtp_server: &str) -> Result<TlsParameters, SmtpError> {
+    with_context(|context| {
+        if let Some(parameters) = context.smtp_parameters.get(smtp_server) {
+            return Ok(parameters.clone());
+        }
+        let mut builder = TlsParameters::builder(smtp_server.to_owned());
+        if let Some((_, version)) = &context.min_protocol_version {
+            builder = builder.set_min_tls_version(version.clone());
+        }
+        for pem in &context.root_certificates_pem {
+            builder = builder.add_root_certificate(SmtpCertificate::from_pem(pem.as_bytes())?);
+        }
+        let parameters = builder.build_native()?;
+        context.smtp_parameters.insert(smtp_server.to_owned(), parameters.clone());
+        Ok(parameters)
+    }).map_err(|_| SmtpError::TlsError)?
+}
@@ -0,0 +1,69 @@
+// A fixed number of threads working through a shared queue of jobs.
+// It lets callers submit any number of blocking IMAP/SMTP operations, while bounding how many threads run them.
+// The I/O of the jobs stays blocking: every job occupies its thread until it returns, network waits included,
+// so no more jobs run at the same time than there are threads; the others wait in the queue.
+
+use std::panic::{self, AssertUnwindSafe};
+use std::sync::mpsc::{channel, Receiver, Sender};
+use std::sync::{Arc, Mutex};
+use std::thread;
+
+type Job = Box<dyn FnOnce() + Send + 'static>;
+
+enum Message {
+    Run(Job),
+    Exit, // ends the worker that receives it, to shrink the pool
+}
+
+pub struct WorkerPool {
+    name: String,
+    sender: Mutex<Sender<Message>>,
+    receiver: Arc<Mutex<Receiver<Message>>>,
+    threads: Mutex<usize>,
+}
+
+impl WorkerPool {
+    pub fn new(name: &str, threads: usize) -> Self {
+        let (sender, receiver) = channel::<Message>();
+        let pool = WorkerPool {
+            name: String::from(name),
+            sender: Mutex::new(sender),
+            receiver: Arc::new(Mutex::new(receiver)),
+            threads: Mutex::new(0),
+        };
+        pool.resize(threads);
+        pool
+    }
+
+    pub fn execute<F: FnOnce() + Send + 'static>(&self, job: F) {
+        self.sender.lock().unwrap().send(Message::Run(Box::new(job))).expect("all worker threads have died");
+    }
+
+    // Sets the number of threads (at least 1). Surplus threads exit once they are done with the jobs queued so far.
+    pub fn resize(&self, threads: usize) {
+        let threads = threads.max(1);
+        let mut current = self.threads.lock().unwrap();
+        for index in *current..threads {
+            self.spawn_worker(index);
+        }
+        for _ in threads..*current {
+            self.sender.lock().unwrap().send(Message::Exit).expect("all worker threads have died");
+        }
+        *current = threads;
+    }
+
+    fn spawn_worker(&self, index: usize) {
+        let receiver = Arc::clone(&self.receiver);
+        thread::Builder::new()
+            .name(format!("{}-{index}", self.name))
+            .spawn(move || loop {
+                let message = receiver.lock().unwrap().recv();
+                match message {
+                    // a panicking job must not take the worker down with it
+                    Ok(Message::Run(job)) => { let _ = panic::catch_unwind(AssertUnwindSafe(job)); },
+                    Ok(Message::Exit) | Err(_) => break, // the pool shrank or was dropped
+                }
+            })
+            .expect("could not spawn worker thread");
+    }
+}